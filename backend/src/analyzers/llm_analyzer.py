@@ -1,39 +1,149 @@
 import os
-from typing import List, Dict, Optional
-import google.generativeai as genai
+import re
+import time
+import asyncio
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from pathlib import Path
-import yaml
+from typing import List, Dict, Optional, Tuple
 import json
+import hashlib
+import orjson
 from ..utils.logger import logger
+from ..utils.config_loader import load_config
+
+# JSON payload in a model response: a fenced block, else the outermost object/array
+_JSON_BLOCK = re.compile(r'```(?:json)?\s*([\[{].*?[\]}])\s*```|([\[{].*[\]}])', re.DOTALL)
+
+@dataclass
+class FindingAggregates:
+    """Per-scan aggregates derived from a single pass over the findings."""
+    total: int = 0
+    grouped: Dict[str, List[Dict]] = field(default_factory=lambda: defaultdict(list))
+    severity_counts: Counter = field(default_factory=Counter)
+    severity_score_by_control: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    critical_by_control: Dict[str, List[Dict]] = field(default_factory=lambda: defaultdict(list))
+    high_by_control: Dict[str, List[Dict]] = field(default_factory=lambda: defaultdict(list))
+    
+    @property
+    def critical(self) -> List[Tuple[str, Dict]]:
+        """Critical findings with their control, grouped by control in first-seen order."""
+        return self._by_control(self.critical_by_control)
+    
+    @property
+    def high(self) -> List[Tuple[str, Dict]]:
+        """High findings with their control, grouped by control in first-seen order."""
+        return self._by_control(self.high_by_control)
+    
+    def _by_control(self, buckets: Dict[str, List[Dict]]) -> List[Tuple[str, Dict]]:
+        return [
+            (control, finding)
+            for control in self.grouped if control in buckets
+            for finding in buckets[control]
+        ]
 
 class LLMAnalyzer:
     """Uses Gemini to analyze security findings and map to SOC 2 controls."""
     
-    def __init__(self, api_key: Optional[str] = None, config_path: Optional[str] = None):
+    # Maximum number of cached Gemini responses kept in memory
+    RESPONSE_CACHE_SIZE = 128
+    
+    # Directory persisting parsed responses across restarts and API workers
+    DEFAULT_CACHE_DIR = './.cache/llm'
+    
+    # Bounds of the on-disk response cache: entries older than the TTL are
+    # ignored and the oldest are deleted beyond the entry cap, checked every
+    # DISK_CACHE_PRUNE_INTERVAL writes
+    DISK_CACHE_MAX_ENTRIES = 1000
+    DISK_CACHE_TTL_SECONDS = 7 * 24 * 3600
+    DISK_CACHE_PRUNE_INTERVAL = 50
+    
+    # Static part of the analysis prompt; kept as a stable prefix for prompt caching
+    ANALYSIS_PROMPT_PREFIX = """You are a SOC 2 compliance expert analyzing security scan results.
+
+Provide a comprehensive analysis covering:
+1. Overall security posture assessment
+2. Critical risks that need immediate attention
+3. SOC 2 compliance gaps
+4. Top 5 recommended actions prioritized by impact
+5. Long-term security improvements
+
+Format your response as JSON with keys: posture, critical_risks, compliance_gaps, top_actions, long_term_improvements
+
+The security scan results to analyze follow.
+"""
+    
+    # Prompt size bounds for the findings summary
+    SUMMARY_MAX_CONTROLS = 20
+    SUMMARY_SAMPLES_PER_CONTROL = 3
+    SUMMARY_MAX_MESSAGE_LENGTH = 200
+    
+    # Control status thresholds: a control is 'partial' while it has at most
+    # PARTIAL_MAX_FINDINGS findings and a severity score below PARTIAL_MAX_SEVERITY
+    PARTIAL_MAX_FINDINGS = 2
+    PARTIAL_MAX_SEVERITY = 10
+    PARTIAL_SCORE = 70
+    
+    # Micro-batching of concurrent analyses into a single Gemini request
+    BATCH_WINDOW_SECONDS = 0.05
+    MAX_BATCH_SIZE = 32
+    
+    def __init__(self, api_key: Optional[str] = None, config_path: Optional[str] = None,
+                 max_concurrent_requests: int = 4, cache_dir: Optional[str] = None):
         """
         Initialize the LLM analyzer.
         
         Args:
             api_key: Gemini API key (defaults to env var)
             config_path: Path to SOC2 controls config
+            max_concurrent_requests: Maximum in-flight Gemini calls (rate limiting)
+            cache_dir: Directory for persisted responses (defaults to the
+                LLM_CACHE_DIR env var, else ./.cache/llm)
         """
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
         
+        # Deferred: the Gemini SDK pulls in grpc/protobuf and is only needed here
+        import google.generativeai as genai
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel('gemini-2.5-flash')
         
-        # Load SOC2 controls
-        if config_path is None:
-            config_path = Path(__file__).parent.parent / "config" / "soc2_controls.yaml"
+        # Bound concurrent Gemini calls to respect API rate limits
+        # Created on first use, inside the event loop that runs the calls
+        self._max_concurrent_requests = max_concurrent_requests
+        self._semaphore: Optional[asyncio.Semaphore] = None
         
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        # Exact-match response cache keyed on SHA-256 of the prompt
+        self._response_cache: Dict[str, Dict] = {}
+        # Identical findings give identical prompts, so repeat scans of an
+        # unchanged repository reuse the stored analysis from disk
+        self.cache_dir: Optional[Path] = Path(cache_dir or os.getenv('LLM_CACHE_DIR') or self.DEFAULT_CACHE_DIR)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"LLM response disk cache disabled: {e}")
+            self.cache_dir = None
+        # Responses persisted since the last prune of the cache directory
+        self._writes_since_prune = 0
+        
+        # Pending (summary, future) pairs drained by the batch worker task
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_worker: Optional[asyncio.Task] = None
+        
+        # Load SOC2 controls
+        self.config = load_config(config_path)
         
         self.controls = self.config.get('controls', {})
+        
+        # Static per-control fields, resolved once instead of on every scan
+        self._control_meta = [
+            (control_id, info.get('name', ''), info.get('description', ''))
+            for control_id, info in self.controls.items()
+        ]
     
-    def analyze_findings(self, findings: List[Dict]) -> Dict:
+    async def analyze_findings(self, findings: List[Dict]) -> Dict:
         """
         Analyze all findings and generate comprehensive SOC 2 compliance report.
         
@@ -53,97 +163,216 @@ class LLMAnalyzer:
         
         logger.info(f"Analyzing {len(findings)} findings with Gemini...")
         
-        # Group findings by control
-        control_findings = self._group_by_control(findings)
+        # Derive every per-control / per-severity structure in one pass
+        aggregates = self._aggregate_findings(findings)
         
         # Prepare summary for LLM
-        summary = self._prepare_summary(findings, control_findings)
+        summary = self._prepare_summary(aggregates)
         
         # Get LLM analysis
-        llm_analysis = self._get_llm_analysis(summary)
+        llm_analysis = await self._get_llm_analysis(summary)
+        
+        return self._build_analysis(aggregates, llm_analysis)
+    
+    async def analyze_findings_batch(self, findings_batches: List[List[Dict]]) -> List[Dict]:
+        """
+        Analyze several independent findings lists with a single Gemini request.
+        
+        Args:
+            findings_batches: One list of findings per scan
+            
+        Returns:
+            Analysis results, in the same order as the input lists
+        """
+        results: List[Optional[Dict]] = [None] * len(findings_batches)
+        pending = []
         
+        for idx, findings in enumerate(findings_batches):
+            if not findings:
+                results[idx] = await self.analyze_findings(findings)
+                continue
+            aggregates = self._aggregate_findings(findings)
+            pending.append((idx, aggregates, self._prepare_summary(aggregates)))
+        
+        if pending:
+            logger.info(f"Analyzing {len(pending)} findings sets in one Gemini request...")
+            insights = await self._request_analyses([item[2] for item in pending])
+            for (idx, aggregates, _), llm_analysis in zip(pending, insights):
+                results[idx] = self._build_analysis(aggregates, llm_analysis)
+        
+        return results
+    
+    def _build_analysis(self, aggregates: FindingAggregates, llm_analysis: Dict) -> Dict:
+        """Combine LLM insights with locally computed coverage and recommendations."""
         # Map findings to controls
-        control_coverage = self._calculate_control_coverage(control_findings)
+        control_coverage = self._calculate_control_coverage(aggregates)
         
         return {
             'control_coverage': control_coverage,
             'llm_insights': llm_analysis,
-            'recommendations': self._generate_recommendations(control_findings),
-            'risk_assessment': self._assess_risk(findings)
+            'recommendations': self._generate_recommendations(aggregates),
+            'risk_assessment': self._assess_risk(aggregates)
         }
     
-    def _group_by_control(self, findings: List[Dict]) -> Dict[str, List[Dict]]:
-        """Group findings by SOC 2 control."""
-        grouped = {}
+    def _aggregate_findings(self, findings: List[Dict]) -> FindingAggregates:
+        """Group findings by control and tally severities in a single pass."""
+        aggregates = FindingAggregates(total=len(findings))
+        
+        # Local rebinds keep attribute lookups out of the per-finding loop
+        weight_of = self.config.get('severity_weights', {}).get
+        grouped = aggregates.grouped
+        severity_counts = aggregates.severity_counts
+        score_by_control = aggregates.severity_score_by_control
+        critical = aggregates.critical_by_control
+        high = aggregates.high_by_control
         
         for finding in findings:
-            control = finding.get('control', 'Unknown')
-            if control not in grouped:
-                grouped[control] = []
+            get = finding.get
+            control = get('control', 'Unknown')
+            severity = get('severity')
+            
             grouped[control].append(finding)
+            severity_counts['unknown' if severity is None else severity] += 1
+            score_by_control[control] += weight_of('info' if severity is None else severity, 1)
+            
+            if severity == 'critical':
+                critical[control].append(finding)
+            elif severity == 'high':
+                high[control].append(finding)
         
-        return grouped
+        return aggregates
     
-    def _prepare_summary(self, findings: List[Dict], control_findings: Dict) -> str:
+    def _prepare_summary(self, aggregates: FindingAggregates) -> str:
         """Prepare a summary of findings for LLM analysis."""
-        severity_counts = {}
-        for finding in findings:
-            severity = finding.get('severity', 'unknown')
-            severity_counts[severity] = severity_counts.get(severity, 0) + 1
-        
-        summary = f"""
+        parts = [f"""
 Security Scan Results Summary:
-Total Findings: {len(findings)}
+Total Findings: {aggregates.total}
 
 Severity Distribution:
-{json.dumps(severity_counts, indent=2)}
+{json.dumps(dict(aggregates.severity_counts), indent=2)}
 
 Findings by SOC 2 Control:
-"""
+"""]
         
-        for control_id, control_items in sorted(control_findings.items()):
+        # Keep the prompt bounded: only the most severely affected controls are listed
+        score_by_control = aggregates.severity_score_by_control
+        ranked_controls = sorted(
+            aggregates.grouped.items(),
+            key=lambda item: (-score_by_control.get(item[0], 0), str(item[0]))
+        )
+        max_len = self.SUMMARY_MAX_MESSAGE_LENGTH
+        
+        for control_id, control_items in ranked_controls[:self.SUMMARY_MAX_CONTROLS]:
             control_info = self.controls.get(control_id, {})
             control_name = control_info.get('name', control_id)
-            summary += f"\n{control_id} - {control_name}: {len(control_items)} findings\n"
+            parts.append(f"\n{control_id} - {control_name}: {len(control_items)} findings\n")
             
             # Add sample findings
-            for finding in control_items[:3]:  # First 3 as examples
-                summary += f"  - {finding.get('type', 'unknown')}: {finding.get('message', '')}\n"
+            for finding in control_items[:self.SUMMARY_SAMPLES_PER_CONTROL]:
+                message = finding.get('message', '')[:max_len]
+                parts.append(f"  - {finding.get('type', 'unknown')}: {message}\n")
+        
+        omitted = len(ranked_controls) - self.SUMMARY_MAX_CONTROLS
+        if omitted > 0:
+            parts.append(f"\n(+{omitted} lower-severity controls omitted)\n")
         
-        return summary
+        return ''.join(parts)
     
-    def _get_llm_analysis(self, summary: str) -> Dict:
-        """Get analysis from Gemini."""
-        prompt = f"""
-You are a SOC 2 compliance expert analyzing security scan results.
-
-{summary}
-
-Provide a comprehensive analysis covering:
-1. Overall security posture assessment
-2. Critical risks that need immediate attention
-3. SOC 2 compliance gaps
-4. Top 5 recommended actions prioritized by impact
-5. Long-term security improvements
-
-Format your response as JSON with keys: posture, critical_risks, compliance_gaps, top_actions, long_term_improvements
-"""
+    async def _get_llm_analysis(self, summary: str) -> Dict:
+        """Get analysis from Gemini, coalescing concurrent requests into batches."""
+        cache_key = self._cache_key(summary)
+        cached = self._response_cache.get(cache_key)
+        if cached is None:
+            cached = await asyncio.to_thread(self._load_cached_response, cache_key)
+            if cached is not None:
+                self._remember_response(cache_key, cached)
+        if cached is not None:
+            logger.info("Using cached LLM analysis")
+            return cached
+        
+        loop = asyncio.get_running_loop()
+        if (self._batch_worker is None or self._batch_worker.done()
+                or self._batch_worker.get_loop() is not loop):
+            self._batch_queue = asyncio.Queue()
+            self._batch_worker = loop.create_task(self._run_batch_worker(self._batch_queue))
+        
+        future = loop.create_future()
+        self._batch_queue.put_nowait((summary, future))
+        return await future
+    
+    async def _run_batch_worker(self, queue: asyncio.Queue):
+        """Drain queued summaries, waiting briefly so near-simultaneous scans share a request."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.BATCH_WINDOW_SECONDS
+            
+            while len(batch) < self.MAX_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                results = await self._request_analyses([summary for summary, _ in batch])
+            except Exception as e:
+                results = [self._error_analysis(e)] * len(batch)
+            
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+    
+    async def _request_analyses(self, summaries: List[str]) -> List[Dict]:
+        """Request analyses for one or more summaries, batching when there are several."""
+        if len(summaries) == 1:
+            return [await self._request_single_analysis(summaries[0])]
+        
+        sections = '\n'.join(
+            f"### Scan {i}\n{summary}" for i, summary in enumerate(summaries, 1)
+        )
+        prompt = (
+            f"{self.ANALYSIS_PROMPT_PREFIX}\n"
+            f"There are {len(summaries)} independent scan results below, each introduced by "
+            f"'### Scan <number>'. Respond with a JSON array containing exactly one analysis "
+            f"object per scan, in the same order.\n\n{sections}"
+        )
         
         try:
-            response = self.model.generate_content(prompt)
+            response_text = await self._generate_text(prompt)
             
-            # Extract JSON from response
-            response_text = response.text
+            analyses = json.loads(self._extract_json_text(response_text), strict=False)
+            if (not isinstance(analyses, list) or len(analyses) != len(summaries)
+                    or not all(isinstance(a, dict) for a in analyses)):
+                raise ValueError("Batched response does not match the number of scans")
+            
+            for summary, analysis in zip(summaries, analyses):
+                await self._cache_response(self._cache_key(summary), analysis)
+            
+            logger.info(f"Batched LLM analysis completed for {len(summaries)} scans")
+            return analyses
+        
+        except Exception as e:
+            # Fall back to one request per summary rather than losing the analyses
+            logger.warning(f"Batched LLM analysis failed ({e}), retrying individually")
+            return list(await asyncio.gather(
+                *(self._request_single_analysis(summary) for summary in summaries)
+            ))
+    
+    async def _request_single_analysis(self, summary: str) -> Dict:
+        """Get analysis for a single summary from Gemini."""
+        # Invariant instructions first so the provider can reuse the cached prefix
+        prompt = f"{self.ANALYSIS_PROMPT_PREFIX}\n{summary}"
+        
+        try:
+            response_text = await self._generate_text(prompt)
             
             # Try to parse as JSON
             try:
-                # Remove markdown code blocks if present
-                if '```json' in response_text:
-                    response_text = response_text.split('```json')[1].split('```')[0].strip()
-                elif '```' in response_text:
-                    response_text = response_text.split('```')[1].split('```')[0].strip()
-                
-                analysis = json.loads(response_text)
+                analysis = json.loads(self._extract_json_text(response_text), strict=False)
+                await self._cache_response(self._cache_key(summary), analysis)
             except json.JSONDecodeError:
                 # If not valid JSON, structure the response
                 analysis = {
@@ -159,43 +388,159 @@ Format your response as JSON with keys: posture, critical_risks, compliance_gaps
         
         except Exception as e:
             logger.error(f"Error getting LLM analysis: {e}")
-            return {
-                'posture': 'Analysis unavailable',
-                'critical_risks': [],
-                'compliance_gaps': [],
-                'top_actions': [],
-                'long_term_improvements': [],
-                'error': str(e)
-            }
+            return self._error_analysis(e)
+    
+    async def _generate_text(self, prompt: str) -> str:
+        """Stream a Gemini completion, stopping as soon as a complete JSON payload has arrived."""
+        parts = []
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrent_requests)
+        async with self._semaphore:
+            response = await self.model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                parts.append(chunk.text)
+                if self._has_complete_json(''.join(parts)):
+                    break
+        
+        return ''.join(parts)
+    
+    @classmethod
+    def _has_complete_json(cls, text: str) -> bool:
+        """Check whether streamed text already contains a parseable JSON payload."""
+        stripped = text.rstrip().removesuffix('```').rstrip()
+        if not stripped.endswith(('}', ']')):
+            return False
+        try:
+            json.loads(cls._extract_json_text(text), strict=False)
+        except ValueError:
+            return False
+        return True
+    
+    @staticmethod
+    def _extract_json_text(response_text: str) -> str:
+        """Extract the JSON payload from a response, ignoring code fences and stray prose."""
+        match = _JSON_BLOCK.search(response_text)
+        if match:
+            return match.group(1) or match.group(2)
+        return response_text
+    
+    @staticmethod
+    def _error_analysis(error: Exception) -> Dict:
+        """Placeholder analysis returned when Gemini cannot be reached."""
+        return {
+            'posture': 'Analysis unavailable',
+            'critical_risks': [],
+            'compliance_gaps': [],
+            'top_actions': [],
+            'long_term_improvements': [],
+            'error': str(error)
+        }
+    
+    def _cache_key(self, summary: str) -> str:
+        """Cache key for a summary: SHA-256 of the single-scan prompt."""
+        prompt = f"{self.ANALYSIS_PROMPT_PREFIX}\n{summary}"
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
     
-    def _calculate_control_coverage(self, control_findings: Dict) -> Dict:
+    async def _cache_response(self, cache_key: str, analysis: Dict):
+        """Store a parsed LLM response in memory and, off the event loop, on disk."""
+        self._remember_response(cache_key, analysis)
+        if self.cache_dir is None:
+            return
+        
+        self._writes_since_prune += 1
+        prune = self._writes_since_prune >= self.DISK_CACHE_PRUNE_INTERVAL
+        if prune:
+            self._writes_since_prune = 0
+        await asyncio.to_thread(self._persist_response, cache_key, analysis, prune)
+    
+    def _persist_response(self, cache_key: str, analysis: Dict, prune: bool):
+        """Write a parsed response to the disk cache, then optionally prune it."""
+        # Responses are a few KB; write to a per-process temp name so readers
+        # (and other API workers) never see partial files
+        path = self.cache_dir / f"{cache_key}.json"
+        tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            tmp_path.write_bytes(orjson.dumps(analysis))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            logger.warning(f"Could not persist LLM response: {e}")
+            return
+        if prune:
+            self._prune_disk_cache()
+    
+    def _prune_disk_cache(self):
+        """Delete expired persisted responses and the oldest beyond DISK_CACHE_MAX_ENTRIES."""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.json'):
+                        try:
+                            entries.append((entry.stat().st_mtime, entry.path))
+                        except OSError:
+                            continue
+        except OSError as e:
+            logger.warning(f"Could not prune LLM response cache: {e}")
+            return
+        
+        entries.sort(reverse=True)
+        expired_before = time.time() - self.DISK_CACHE_TTL_SECONDS
+        for i, (mtime, path) in enumerate(entries):
+            if i >= self.DISK_CACHE_MAX_ENTRIES or mtime < expired_before:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+    
+    def _remember_response(self, cache_key: str, analysis: Dict):
+        """Keep a parsed response in memory, evicting the oldest entry when full."""
+        if len(self._response_cache) >= self.RESPONSE_CACHE_SIZE:
+            self._response_cache.pop(next(iter(self._response_cache)))
+        self._response_cache[cache_key] = analysis
+    
+    def _load_cached_response(self, cache_key: str) -> Optional[Dict]:
+        """Load a persisted response, or None if absent, expired or unreadable."""
+        if self.cache_dir is None:
+            return None
+        path = self.cache_dir / f"{cache_key}.json"
+        try:
+            if path.stat().st_mtime < time.time() - self.DISK_CACHE_TTL_SECONDS:
+                return None
+            return orjson.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable cached LLM response {cache_key}: {e}")
+            return None
+    
+    def _calculate_control_coverage(self, aggregates: FindingAggregates) -> Dict:
         """Calculate coverage and compliance for each control."""
         coverage = {}
+        grouped_get = aggregates.grouped.get
+        score_get = aggregates.severity_score_by_control.get
+        max_findings = self.PARTIAL_MAX_FINDINGS
+        max_severity = self.PARTIAL_MAX_SEVERITY
         
-        for control_id, control_info in self.controls.items():
-            findings_count = len(control_findings.get(control_id, []))
+        for control_id, name, description in self._control_meta:
+            findings_count = len(grouped_get(control_id, ()))
             
-            # Calculate severity score for this control
-            severity_score = 0
-            findings_list = control_findings.get(control_id, [])
-            for finding in findings_list:
-                severity = finding.get('severity', 'info')
-                severity_score += self.config.get('severity_weights', {}).get(severity, 1)
+            # Severity score for this control was summed during aggregation
+            severity_score = score_get(control_id, 0)
             
             # Determine status
             if findings_count == 0:
                 status = 'compliant'
                 score = 100
-            elif findings_count <= 2 and severity_score < 10:
+            elif findings_count <= max_findings and severity_score < max_severity:
                 status = 'partial'
-                score = 70
+                score = self.PARTIAL_SCORE
             else:
                 status = 'non_compliant'
                 score = max(0, 100 - (findings_count * 10) - severity_score)
             
             coverage[control_id] = {
-                'name': control_info.get('name', ''),
-                'description': control_info.get('description', ''),
+                'name': name,
+                'description': description,
                 'findings_count': findings_count,
                 'severity_score': severity_score,
                 'status': status,
@@ -204,23 +549,12 @@ Format your response as JSON with keys: posture, critical_risks, compliance_gaps
         
         return coverage
     
-    def _generate_recommendations(self, control_findings: Dict) -> List[Dict]:
+    def _generate_recommendations(self, aggregates: FindingAggregates) -> List[Dict]:
         """Generate prioritized recommendations."""
         recommendations = []
         
-        # Group by severity
-        critical_findings = []
-        high_findings = []
-        
-        for control_id, findings in control_findings.items():
-            for finding in findings:
-                if finding.get('severity') == 'critical':
-                    critical_findings.append((control_id, finding))
-                elif finding.get('severity') == 'high':
-                    high_findings.append((control_id, finding))
-        
         # Add critical recommendations
-        for control_id, finding in critical_findings[:5]:  # Top 5 critical
+        for control_id, finding in aggregates.critical[:5]:  # Top 5 critical
             recommendations.append({
                 'priority': 'critical',
                 'control': control_id,
@@ -230,7 +564,7 @@ Format your response as JSON with keys: posture, critical_risks, compliance_gaps
             })
         
         # Add high priority recommendations
-        for control_id, finding in high_findings[:5]:  # Top 5 high
+        for control_id, finding in aggregates.high[:5]:  # Top 5 high
             recommendations.append({
                 'priority': 'high',
                 'control': control_id,
@@ -241,10 +575,10 @@ Format your response as JSON with keys: posture, critical_risks, compliance_gaps
         
         return recommendations
     
-    def _assess_risk(self, findings: List[Dict]) -> str:
+    def _assess_risk(self, aggregates: FindingAggregates) -> str:
         """Assess overall risk level."""
-        critical_count = sum(1 for f in findings if f.get('severity') == 'critical')
-        high_count = sum(1 for f in findings if f.get('severity') == 'high')
+        critical_count = aggregates.severity_counts['critical']
+        high_count = aggregates.severity_counts['high']
         
         if critical_count > 5:
             return 'Critical - Multiple critical security issues require immediate attention'
@@ -1,18 +1,18 @@
-from typing import List, Dict
-import yaml
-from pathlib import Path
+import heapq
+from collections import Counter, defaultdict
+from typing import Iterable, List, Dict
 from ..utils.logger import logger
+from ..utils.config_loader import load_config
+
+# Sort rank for each severity (lower is more urgent)
+_SEVERITY_ORDER = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3, 'info': 4}
 
 class ScoringEngine:
     """Calculate compliance scores and metrics."""
     
     def __init__(self, config_path: str = None):
         """Initialize scoring engine with SOC2 controls config."""
-        if config_path is None:
-            config_path = Path(__file__).parent.parent / "config" / "soc2_controls.yaml"
-        
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
         
         self.severity_weights = self.config.get('severity_weights', {
             'critical': 10,
@@ -24,19 +24,30 @@ class ScoringEngine:
         
         self.controls = self.config.get('controls', {})
     
-    def calculate_readiness_score(self, findings: List[Dict], 
+    def calculate_readiness_score(self, findings: Iterable[Dict], 
                                   control_coverage: Dict) -> Dict:
         """
         Calculate overall SOC 2 readiness score.
         
         Args:
-            findings: List of all findings
+            findings: All findings (any iterable; traversed once)
             control_coverage: Control coverage data from analyzer
             
         Returns:
             Scoring metrics and breakdown
         """
-        if not findings:
+        # Calculate severity impact
+        severity_counts = Counter()
+        total_severity_score = 0
+        weight_of = self.severity_weights.get
+        
+        for finding in findings:
+            severity = finding.get('severity', 'info')
+            severity_counts[severity] += 1
+            total_severity_score += weight_of(severity, 1)
+        
+        total_issues = sum(severity_counts.values())
+        if not total_issues:
             return {
                 'overall_score': 100,
                 'grade': 'A',
@@ -44,15 +55,7 @@ class ScoringEngine:
                 'control_scores': {},
                 'total_issues': 0
             }
-        
-        # Calculate severity impact
-        severity_counts = {}
-        total_severity_score = 0
-        
-        for finding in findings:
-            severity = finding.get('severity', 'info')
-            severity_counts[severity] = severity_counts.get(severity, 0) + 1
-            total_severity_score += self.severity_weights.get(severity, 1)
+        severity_counts = dict(severity_counts)
         
         # Calculate base score (100 - severity impact)
         # Max possible deduction is 100 points
@@ -66,15 +69,16 @@ class ScoringEngine:
         compliant_controls = 0
         
         for control_id, coverage in control_coverage.items():
-            control_score = coverage.get('score', 0)
+            get = coverage.get
+            status = get('status')
             control_scores[control_id] = {
-                'score': control_score,
-                'status': coverage.get('status', 'unknown'),
-                'name': coverage.get('name', ''),
-                'findings': coverage.get('findings_count', 0)
+                'score': get('score', 0),
+                'status': 'unknown' if status is None else status,
+                'name': get('name', ''),
+                'findings': get('findings_count', 0)
             }
             
-            if coverage.get('status') == 'compliant':
+            if status == 'compliant':
                 compliant_controls += 1
         
         coverage_percentage = (compliant_controls / total_controls * 100) if total_controls > 0 else 0
@@ -99,7 +103,7 @@ class ScoringEngine:
                 'deduction': severity_deduction
             },
             'control_scores': control_scores,
-            'total_issues': len(findings),
+            'total_issues': total_issues,
             'controls_compliant': compliant_controls,
             'controls_total': total_controls
         }
@@ -127,10 +131,11 @@ class ScoringEngine:
         Returns:
             Risk assessment metrics
         """
-        critical_count = sum(1 for f in findings if f.get('severity') == 'critical')
-        high_count = sum(1 for f in findings if f.get('severity') == 'high')
-        medium_count = sum(1 for f in findings if f.get('severity') == 'medium')
-        low_count = sum(1 for f in findings if f.get('severity') == 'low')
+        severity_counts = Counter(f.get('severity') for f in findings)
+        critical_count = severity_counts['critical']
+        high_count = severity_counts['high']
+        medium_count = severity_counts['medium']
+        low_count = severity_counts['low']
         
         # Calculate risk score (0-100, higher is worse)
         risk_score = (
@@ -175,18 +180,15 @@ class ScoringEngine:
         Returns:
             Prioritized list of findings
         """
-        # Sort by severity weight (descending)
-        severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3, 'info': 4}
-        
-        sorted_findings = sorted(
+        # Partial sort by severity weight (descending); O(N log limit)
+        return heapq.nsmallest(
+            limit,
             findings,
             key=lambda x: (
-                severity_order.get(x.get('severity', 'info'), 5),
+                _SEVERITY_ORDER.get(x.get('severity', 'info'), 5),
                 x.get('file', '')
             )
         )
-        
-        return sorted_findings[:limit]
     
     def calculate_control_impact(self, findings: List[Dict]) -> Dict[str, int]:
         """
@@ -198,13 +200,11 @@ class ScoringEngine:
         Returns:
             Dictionary of control IDs to impact scores
         """
-        control_impact = {}
+        control_impact = defaultdict(int)
+        weight_of = self.severity_weights.get
         
         for finding in findings:
-            control = finding.get('control', 'Unknown')
-            severity = finding.get('severity', 'info')
-            weight = self.severity_weights.get(severity, 1)
-            
-            control_impact[control] = control_impact.get(control, 0) + weight
+            get = finding.get
+            control_impact[get('control', 'Unknown')] += weight_of(get('severity', 'info'), 1)
         
         return dict(sorted(control_impact.items(), key=lambda x: x[1], reverse=True))
@@ -1,23 +1,58 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import asyncio
+import hashlib
 import os
+import aiofiles
+import orjson
 from dotenv import load_dotenv
 
 from .main import ScanEngine
 from .utils.logger import logger
-from .reports.pdf_generator import generate_pdf_report
+from .utils.config_loader import load_config, config_version
 from .integrations.github_issues import GitHubIssueCreator
 
 # Load environment variables
 load_dotenv()
 
+# Chunk size used when streaming PDF reports
+PDF_CHUNK_SIZE = 64 * 1024
+
+# Threads available to asyncio.to_thread for blocking report I/O
+IO_THREAD_POOL_SIZE = 100
+
+# Longest a /report/{job_id}?wait= long-poll may hold the request open
+REPORT_MAX_WAIT_SECONDS = 60
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the scanner process pool on startup and shut it down on exit."""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=IO_THREAD_POOL_SIZE, thread_name_prefix='io')
+    )
+    scan_engine.start()
+    try:
+        yield
+    finally:
+        scan_engine.shutdown()
+        await scan_engine.job_store.close()
+        for creator in _issue_creators.values():
+            await creator.aclose()
+        _issue_creators.clear()
+
 app = FastAPI(
     title="CompliantByDefault API",
     description="SOC 2 Readiness Agent - Analyze repositories for compliance gaps",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -25,13 +60,83 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:3001"],  # Frontend URLs
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Only the verbs and headers the frontend uses; browsers cache preflights for a day
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization", "if-none-match"],
+    expose_headers=["etag"],
+    max_age=86400,
 )
 
 # Initialize scan engine
 scan_engine = ScanEngine()
 
+# Issue creators reused across requests, keyed by a hash of their token and
+# evicted least recently used first beyond ISSUE_CREATOR_CACHE_SIZE
+ISSUE_CREATOR_CACHE_SIZE = 32
+_issue_creators: "OrderedDict[str, GitHubIssueCreator]" = OrderedDict()
+# Requests currently using each issue creator
+_issue_creator_users: Counter = Counter()
+
+@asynccontextmanager
+async def use_issue_creator(token: str):
+    """
+    Use a cached GitHubIssueCreator (and its HTTP client) for a token.
+    
+    Evicted creators are closed once no request is using them.
+    
+    Args:
+        token: GitHub token
+    
+    Yields:
+        GitHubIssueCreator for the token
+    """
+    key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    creator = _issue_creators.pop(key, None) or GitHubIssueCreator(token=token)
+    _issue_creators[key] = creator
+    _issue_creator_users[creator] += 1
+    
+    evicted = []
+    while len(_issue_creators) > ISSUE_CREATOR_CACHE_SIZE:
+        _, stale = _issue_creators.popitem(last=False)
+        if not _issue_creator_users[stale]:
+            evicted.append(stale)
+    for stale in evicted:
+        await stale.aclose()
+    
+    try:
+        yield creator
+    finally:
+        _issue_creator_users[creator] -= 1
+        if not _issue_creator_users[creator]:
+            del _issue_creator_users[creator]
+            if _issue_creators.get(key) is not creator:
+                await creator.aclose()
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches an ETag."""
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+    candidates = (tag.strip() for tag in if_none_match.split(','))
+    return any(tag == '*' or tag.removeprefix('W/') == etag for tag in candidates)
+
+@lru_cache(maxsize=4)
+def _controls_etag(version: int) -> str:
+    """Content hash of the SOC 2 controls for a given config version."""
+    controls = load_config().get('controls', {})
+    digest = hashlib.sha256(
+        orjson.dumps(controls, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    ).hexdigest()
+    return f'"{digest}"'
+
+def controls_etag() -> str:
+    """ETag for the SOC 2 controls, recomputed only when the config file changes."""
+    return _controls_etag(config_version())
+
+def sse_event(data: Dict) -> bytes:
+    """Format a dict as a Server-Sent Events data frame."""
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
 # Request/Response Models
 class LocalScanRequest(BaseModel):
     path: str = Field(..., description="Absolute path to local directory")
@@ -87,12 +192,16 @@ async def health_check():
     }
 
 @app.post("/scan/local", response_model=ScanResponse)
-async def scan_local(request: LocalScanRequest):
+async def scan_local(request: LocalScanRequest, background_tasks: BackgroundTasks):
     """
     Scan a local directory.
     
+    The scan runs as a background task after the response is sent; follow
+    its progress at /scan/{job_id}/events.
+    
     Args:
         request: Local scan request with path
+        background_tasks: FastAPI background task queue
         
     Returns:
         Job ID and status
@@ -105,7 +214,8 @@ async def scan_local(request: LocalScanRequest):
         if not os.path.isdir(request.path):
             raise HTTPException(status_code=400, detail="Path is not a directory")
         
-        job_id = await scan_engine.scan_local(request.path)
+        job_id = await scan_engine.create_job()
+        background_tasks.add_task(scan_engine.run_local_scan, job_id, request.path)
         
         return ScanResponse(
             job_id=job_id,
@@ -113,17 +223,23 @@ async def scan_local(request: LocalScanRequest):
             message=f"Scan initiated for {request.path}"
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error starting local scan: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/scan/github", response_model=ScanResponse)
-async def scan_github(request: GitHubScanRequest):
+async def scan_github(request: GitHubScanRequest, background_tasks: BackgroundTasks):
     """
     Scan a GitHub repository.
     
+    Cloning and scanning run as a background task after the response is
+    sent; follow their progress at /scan/{job_id}/events.
+    
     Args:
         request: GitHub scan request with repo URL and optional token
+        background_tasks: FastAPI background task queue
         
     Returns:
         Job ID and status
@@ -132,9 +248,12 @@ async def scan_github(request: GitHubScanRequest):
         # Strip whitespace from repo_url
         repo_url = request.repo_url.strip()
         
-        job_id = await scan_engine.scan_github(
-            repo_url,
-            request.token
+        if not scan_engine.github_loader.validate_url(repo_url):
+            raise ValueError("Invalid GitHub repository URL")
+        
+        job_id = await scan_engine.create_job()
+        background_tasks.add_task(
+            scan_engine.run_github_scan, job_id, repo_url, request.token
         )
         
         return ScanResponse(
@@ -149,23 +268,87 @@ async def scan_github(request: GitHubScanRequest):
         logger.error(f"Error starting GitHub scan: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/scan/{job_id}/events")
+async def scan_events(job_id: str):
+    """
+    Stream progress of a scan as Server-Sent Events.
+    
+    Each event is a JSON object with the job ID and a status of cloning,
+    scanning, analyzing, scoring, reporting, completed or failed. The stream
+    ends after completed or failed.
+    
+    Args:
+        job_id: Scan job identifier
+        
+    Returns:
+        text/event-stream response
+    """
+    events = await scan_engine.job_events(job_id)
+    
+    if events is None:
+        # Scan unknown to the job store (e.g. finished before a restart);
+        # a saved report means it completed
+        if await asyncio.to_thread(scan_engine.get_report_etag, job_id) is None:
+            raise HTTPException(status_code=404, detail="Scan not found")
+        
+        async def finished():
+            yield sse_event({'job_id': job_id, 'status': 'completed'})
+        
+        return StreamingResponse(finished(), media_type='text/event-stream')
+    
+    async def event_generator():
+        try:
+            async for event in events:
+                yield sse_event(event)
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_generator(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache'}
+    )
+
 @app.get("/report/{job_id}")
-async def get_report(job_id: str):
+async def get_report(
+    job_id: str,
+    request: Request,
+    wait: float = Query(0, ge=0, le=REPORT_MAX_WAIT_SECONDS,
+                        description="Seconds to wait for a running scan to finish")
+):
     """
     Get scan report by job ID.
     
+    With wait > 0 this long-polls: the request is held until the scan
+    finishes or wait seconds pass, in which case 204 asks the client to retry.
+    
     Args:
         job_id: Scan job identifier
+        request: Incoming request (for If-None-Match)
+        wait: Seconds to wait for a running scan
         
     Returns:
-        Full report data
+        Full report data, 304 if the client copy is current, or 204 if the
+        scan is still running after wait seconds
     """
-    report = scan_engine.get_report(job_id)
+    etag = await asyncio.to_thread(scan_engine.get_report_etag, job_id)
+    
+    if etag is None and wait:
+        try:
+            await scan_engine.wait_for_job(job_id, timeout=wait)
+        except asyncio.TimeoutError:
+            return Response(status_code=204)
+        etag = await asyncio.to_thread(scan_engine.get_report_etag, job_id)
+    
+    if etag and etag_matches(request, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    
+    report = await asyncio.to_thread(scan_engine.get_report, job_id)
     
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    return report
+    return ORJSONResponse(report, headers={'ETag': etag} if etag else None)
 
 @app.get("/reports", response_model=List[ReportSummary])
 async def list_reports():
@@ -176,29 +359,28 @@ async def list_reports():
         List of report summaries
     """
     try:
-        reports = scan_engine.list_reports()
+        reports = await asyncio.to_thread(scan_engine.list_reports)
         return reports
     except Exception as e:
         logger.error(f"Error listing reports: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/controls")
-async def get_controls():
+async def get_controls(request: Request):
     """
     Get SOC 2 controls information.
     
+    Args:
+        request: Incoming request (for If-None-Match)
+    
     Returns:
-        SOC 2 controls configuration
+        SOC 2 controls configuration, or 304 if the client copy is current
     """
-    import yaml
-    from pathlib import Path
-    
-    config_path = Path(__file__).parent / "config" / "soc2_controls.yaml"
+    etag = controls_etag()
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={'ETag': etag})
     
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
-    
-    return config.get('controls', {})
+    return ORJSONResponse(load_config().get('controls', {}), headers={'ETag': etag})
 
 @app.get("/report/{job_id}/pdf")
 async def download_pdf_report(job_id: str):
@@ -213,27 +395,40 @@ async def download_pdf_report(job_id: str):
     """
     try:
         # Get report data
-        report = scan_engine.get_report(job_id)
+        report = await asyncio.to_thread(scan_engine.get_report, job_id)
         
         if not report:
             raise HTTPException(status_code=404, detail="Report not found")
         
-        # Generate PDF
-        pdf_path = generate_pdf_report(job_id, report)
+        # Deferred: reportlab is only needed when a PDF is requested
+        from .reports.pdf_generator import generate_pdf_report
+        
+        # Generate PDF in a worker process, off the event loop and the GIL
+        pdf_path = await generate_pdf_report(job_id, report)
         
         if not pdf_path.exists():
             raise HTTPException(status_code=500, detail="Failed to generate PDF")
         
-        return FileResponse(
-            path=str(pdf_path),
+        async def iter_pdf():
+            async with aiofiles.open(pdf_path, 'rb') as f:
+                while chunk := await f.read(PDF_CHUNK_SIZE):
+                    yield chunk
+        
+        return StreamingResponse(
+            iter_pdf(),
             media_type='application/pdf',
-            filename=f"compliance_report_{job_id}.pdf"
+            headers={
+                'Content-Disposition': f'attachment; filename="compliance_report_{job_id}.pdf"',
+                'Content-Length': str(pdf_path.stat().st_size)
+            }
         )
     
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error generating PDF: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/issue/create", response_model=CreateIssueResponse)
 async def create_github_issue(request: CreateIssueRequest):
     """
@@ -255,11 +450,10 @@ async def create_github_issue(request: CreateIssueRequest):
                 detail="GitHub token is required. Provide in request or set GITHUB_TOKEN environment variable."
             )
         
-        # Create issue creator
-        issue_creator = GitHubIssueCreator(token=token)
-        
-        # Create the issue
-        result = issue_creator.create_issue(request.repo_url, request.finding)
+        # Reuse the issue creator for this token
+        async with use_issue_creator(token) as issue_creator:
+            # Create the issue
+            result = await issue_creator.create_issue(request.repo_url, request.finding)
         
         if result:
             return CreateIssueResponse(
@@ -282,5 +476,15 @@ async def create_github_issue(request: CreateIssueRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # With the default in-memory job store a scan must be watched from the
+    # worker that started it; set JOBSTORE_URL to a Redis URL before scaling out.
+    uvicorn.run(
+        f"{__spec__.name}:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=int(os.getenv("UVICORN_WORKERS", "1"))
+    )
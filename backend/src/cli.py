@@ -7,20 +7,35 @@ import asyncio
 import sys
 from pathlib import Path
 from typing import Optional
-import json
+import orjson
 from dotenv import load_dotenv
 
-from .main import ScanEngine
 from .utils.logger import logger
 
-# Load environment variables
-load_dotenv()
-
 class CLI:
     """Command-line interface for CompliantByDefault."""
     
     def __init__(self):
-        self.scan_engine = ScanEngine()
+        self._scan_engine = None
+        self._report_generator = None
+    
+    @property
+    def scan_engine(self):
+        """Scan engine, built on first use since it imports the full scanner stack."""
+        if self._scan_engine is None:
+            from .main import ScanEngine
+            self._scan_engine = ScanEngine()
+        return self._scan_engine
+    
+    @property
+    def report_generator(self):
+        """Report generator for commands that only read saved reports."""
+        if self._scan_engine is not None:
+            return self._scan_engine.report_generator
+        if self._report_generator is None:
+            from .reports.report_generator import ReportGenerator
+            self._report_generator = ReportGenerator()
+        return self._report_generator
     
     async def scan_local(self, path: str, output: Optional[str] = None):
         """Scan a local directory."""
@@ -36,26 +51,7 @@ class CLI:
             print(f"✅ Scan started with job ID: {job_id}")
             print("⏳ Running scanners...\n")
             
-            # Wait for scan to complete (in CLI, we wait synchronously)
-            await asyncio.sleep(2)  # Give it a moment to start
-            
-            # Poll for completion
-            max_attempts = 60  # 60 seconds max
-            for i in range(max_attempts):
-                report = self.scan_engine.get_report(job_id)
-                if report:
-                    self._display_report(report)
-                    
-                    if output:
-                        self._save_output(report, output)
-                    
-                    return
-                
-                await asyncio.sleep(1)
-                if i % 5 == 0:
-                    print(f"⏳ Still scanning... ({i}s)")
-            
-            print("⏰ Scan timed out. Check reports later with: cli.py report <job_id>")
+            await self._wait_and_display(job_id, 60, output)
         
         except Exception as e:
             print(f"❌ Error: {e}")
@@ -72,34 +68,32 @@ class CLI:
             print("📥 Cloning repository...")
             print("⏳ Running scanners...\n")
             
-            # Wait for scan to complete
-            await asyncio.sleep(5)  # Give it time to clone and scan
-            
-            # Poll for completion
-            max_attempts = 120  # 2 minutes max
-            for i in range(max_attempts):
-                report = self.scan_engine.get_report(job_id)
-                if report:
-                    self._display_report(report)
-                    
-                    if output:
-                        self._save_output(report, output)
-                    
-                    return
-                
-                await asyncio.sleep(1)
-                if i % 10 == 0 and i > 0:
-                    print(f"⏳ Still scanning... ({i}s)")
-            
-            print("⏰ Scan timed out. Check reports later with: cli.py report <job_id>")
+            await self._wait_and_display(job_id, 120, output)
         
         except Exception as e:
             print(f"❌ Error: {e}")
             sys.exit(1)
     
+    async def _wait_and_display(self, job_id: str, timeout: float, output: Optional[str]):
+        """Wait for a scan to finish, then display and optionally save its report."""
+        try:
+            report = await self.scan_engine.await_report(job_id, timeout=timeout)
+        except asyncio.TimeoutError:
+            print("⏰ Scan timed out. Check reports later with: cli.py report <job_id>")
+            return
+        
+        if not report:
+            print(f"❌ Scan {job_id} finished without a report. Check the logs for details.")
+            sys.exit(1)
+        
+        self._display_report(report)
+        
+        if output:
+            self._save_output(report, output)
+    
     def get_report(self, job_id: str, output: Optional[str] = None):
         """Get an existing report."""
-        report = self.scan_engine.get_report(job_id)
+        report = self.report_generator.load_report(job_id)
         
         if not report:
             print(f"❌ Report not found: {job_id}")
@@ -112,15 +106,17 @@ class CLI:
     
     def list_reports(self):
         """List all reports."""
-        reports = self.scan_engine.list_reports()
+        reports = self.report_generator.list_reports()
         
         if not reports:
             print("📭 No reports found.")
             return
         
-        print(f"📊 Found {len(reports)} report(s):\n")
-        print(f"{'Job ID':<40} {'Score':<8} {'Findings':<10} {'Generated At':<20}")
-        print("-" * 80)
+        lines = [
+            f"📊 Found {len(reports)} report(s):\n",
+            f"{'Job ID':<40} {'Score':<8} {'Findings':<10} {'Generated At':<20}",
+            "-" * 80
+        ]
         
         for report in reports:
             job_id = report.get('id', 'N/A')
@@ -128,7 +124,9 @@ class CLI:
             findings = report.get('findings', 'N/A')
             generated = report.get('generated_at', 'N/A')[:19]  # Truncate timestamp
             
-            print(f"{job_id:<40} {score:<8} {findings:<10} {generated:<20}")
+            lines.append(f"{job_id:<40} {score:<8} {findings:<10} {generated:<20}")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def _display_report(self, report: dict):
         """Display report summary in terminal."""
@@ -136,61 +134,66 @@ class CLI:
         score = report.get('score', {})
         analysis = report.get('analysis', {})
         
-        print("\n" + "="*80)
-        print("📊 SOC 2 COMPLIANCE REPORT")
-        print("="*80 + "\n")
+        # Collect the whole report and write it to the terminal at once
+        lines = [
+            "\n" + "="*80,
+            "📊 SOC 2 COMPLIANCE REPORT",
+            "="*80 + "\n"
+        ]
         
         # Summary
-        print(f"🎯 Overall Score: {summary.get('readiness_score', 0)}/100 (Grade: {summary.get('grade', 'N/A')})")
-        print(f"⚠️  Total Findings: {summary.get('total_findings', 0)}")
-        print(f"🔐 Risk Level: {summary.get('risk_level', 'Unknown')}")
-        print(f"✅ Controls Compliant: {score.get('controls_compliant', 0)}/{score.get('controls_total', 0)}")
-        print()
+        lines.append(f"🎯 Overall Score: {summary.get('readiness_score', 0)}/100 (Grade: {summary.get('grade', 'N/A')})")
+        lines.append(f"⚠️  Total Findings: {summary.get('total_findings', 0)}")
+        lines.append(f"🔐 Risk Level: {summary.get('risk_level', 'Unknown')}")
+        lines.append(f"✅ Controls Compliant: {score.get('controls_compliant', 0)}/{score.get('controls_total', 0)}")
+        lines.append("")
         
         # Severity breakdown
         severity_counts = score.get('severity_impact', {}).get('counts', {})
-        print("📈 Severity Distribution:")
+        lines.append("📈 Severity Distribution:")
         for severity in ['critical', 'high', 'medium', 'low', 'info']:
             count = severity_counts.get(severity, 0)
             if count > 0:
-                print(f"   {severity.upper()}: {count}")
-        print()
+                lines.append(f"   {severity.upper()}: {count}")
+        lines.append("")
         
         # LLM insights
         if analysis:
             posture = analysis.get('posture', '')
             if posture:
-                print("🤖 AI Analysis:")
-                print(f"   {posture[:200]}...")
-                print()
+                lines.append("🤖 AI Analysis:")
+                lines.append(f"   {posture[:200]}...")
+                lines.append("")
         
         # Top recommendations
         recommendations = report.get('recommendations', [])
         if recommendations:
-            print("💡 Top Recommendations:")
+            lines.append("💡 Top Recommendations:")
             for i, rec in enumerate(recommendations[:5], 1):
-                print(f"   {i}. [{rec.get('priority', 'medium').upper()}] {rec.get('issue', 'N/A')}")
-                print(f"      → {rec.get('action', 'Review and remediate')}")
-            print()
+                lines.append(f"   {i}. [{rec.get('priority', 'medium').upper()}] {rec.get('issue', 'N/A')}")
+                lines.append(f"      → {rec.get('action', 'Review and remediate')}")
+            lines.append("")
         
         # Report files
         report_files = report.get('report_files', {})
         if report_files:
-            print("📄 Report Files:")
+            lines.append("📄 Report Files:")
             if report_files.get('json'):
-                print(f"   JSON: {report_files['json']}")
+                lines.append(f"   JSON: {report_files['json']}")
             if report_files.get('markdown'):
-                print(f"   Markdown: {report_files['markdown']}")
+                lines.append(f"   Markdown: {report_files['markdown']}")
         
-        print("\n" + "="*80 + "\n")
+        lines.append("\n" + "="*80 + "\n")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def _save_output(self, report: dict, output_path: str):
         """Save report to specified output file."""
         output = Path(output_path)
         
         try:
-            with open(output, 'w') as f:
-                json.dump(report, f, indent=2)
+            with open(output, 'wb') as f:
+                f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
             print(f"💾 Report saved to: {output}")
         except Exception as e:
             print(f"❌ Error saving output: {e}")
@@ -229,6 +232,9 @@ def main():
         parser.print_help()
         sys.exit(1)
     
+    # Load environment variables
+    load_dotenv()
+    
     cli = CLI()
     
     try:
@@ -2,6 +2,7 @@
 Expertise mapping configuration for SOC 2 controls.
 Maps control IDs to GitHub usernames for automatic issue assignment.
 """
+from functools import lru_cache
 
 CONTROL_EXPERTISE_MAPPING = {
     # RachitMalik12: CC1-CC3
@@ -22,7 +23,11 @@ CONTROL_EXPERTISE_MAPPING = {
     "CC9": "swassingh",      # Risk Mitigation
 }
 
+# Distinct experts in mapping order
+_ALL_EXPERTS = tuple(dict.fromkeys(CONTROL_EXPERTISE_MAPPING.values()))
 
+
+@lru_cache(maxsize=32)
 def get_assignee_for_control(control: str) -> str:
     """
     Get the GitHub username to assign for a given SOC 2 control.
@@ -37,5 +42,5 @@ def get_assignee_for_control(control: str) -> str:
 
 
 def get_all_experts():
-    """Get list of all expert GitHub usernames."""
-    return list(set(CONTROL_EXPERTISE_MAPPING.values()))
+    """Get all expert GitHub usernames (distinct, in mapping order)."""
+    return _ALL_EXPERTS
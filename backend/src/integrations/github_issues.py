@@ -2,15 +2,62 @@
 GitHub issue creation utility for SOC 2 compliance findings.
 """
 import os
-import requests
-from typing import Dict, Optional
+import re
+import time
+import asyncio
+import httpx
+from typing import Dict, Optional, Set
 from ..utils.logger import logger
 from ..config.expertise_mapping import get_assignee_for_control
 
+# Owner/repo patterns for GitHub URLs, tried in order
+_REPO_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'github\.com[/:]([^/]+)/([^/\.]+?)(?:\.git)?$',
+    r'github\.com[/:]([^/]+)/([^/]+?)/?$'
+))
+
+_SEVERITY_EMOJI = {
+    'critical': '🔴',
+    'high': '🟠',
+    'medium': '🟡',
+    'low': '🔵',
+    'info': '⚪'
+}
+
+_CONTROL_NAMES = {
+    'CC1': 'Control Environment',
+    'CC2': 'Communication and Information',
+    'CC3': 'Risk Assessment',
+    'CC4': 'Monitoring Activities',
+    'CC5': 'Control Activities',
+    'CC6': 'Logical and Physical Access Controls',
+    'CC7': 'System Operations',
+    'CC8': 'Change Management',
+    'CC9': 'Risk Mitigation'
+}
+
+_RISK_DESCRIPTIONS = {
+    'critical': 'Immediate action required. This issue poses a severe security risk and violates SOC 2 requirements.',
+    'high': 'High priority. This issue significantly impacts security posture and SOC 2 compliance.',
+    'medium': 'Medium priority. This issue should be addressed to improve security and compliance.',
+    'low': 'Low priority. This issue represents a minor security concern.',
+    'info': 'Informational. This is a best practice recommendation.'
+}
+
+_ISSUE_FOOTER = """
+---
+*This issue was automatically created by CompliantByDefault - SOC 2 Readiness Agent*
+"""
+
 
 class GitHubIssueCreator:
     """Creates GitHub issues for compliance findings."""
     
+    # GitHub's secondary rate limits penalize bursts of concurrent writes
+    MAX_CONCURRENT_REQUESTS = 10
+    RATE_LIMIT_RETRIES = 3
+    MAX_RATE_LIMIT_WAIT = 60
+    
     def __init__(self, token: Optional[str] = None):
         """
         Initialize GitHub issue creator.
@@ -28,6 +75,116 @@ class GitHubIssueCreator:
             "Accept": "application/vnd.github.v3+json",
             "Content-Type": "application/json"
         }
+        
+        # Pooled async client so repeated issue calls reuse the TLS connection
+        self._client = httpx.AsyncClient(
+            base_url=self.api_base,
+            headers=self.headers,
+            timeout=30
+        )
+        self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+    
+    async def aclose(self):
+        """Close the underlying HTTP connection pool."""
+        await self._client.aclose()
+    
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a GitHub API request, bounded by the concurrency limit.
+        
+        Rate-limited responses are retried after the wait GitHub asks for
+        (capped at MAX_RATE_LIMIT_WAIT), up to RATE_LIMIT_RETRIES times.
+        
+        Args:
+            method: HTTP method
+            url: Path relative to the API base URL
+            **kwargs: Passed through to httpx
+            
+        Returns:
+            The final response
+        """
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            async with self._semaphore:
+                response = await self._client.request(method, url, **kwargs)
+            
+            delay = self._rate_limit_delay(response, attempt)
+            if delay is None or attempt == self.RATE_LIMIT_RETRIES:
+                return response
+            
+            logger.warning(f"GitHub rate limit hit ({response.status_code}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        
+        return response
+    
+    def _rate_limit_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a rate-limited response, or None if not rate-limited."""
+        if response.status_code not in (403, 429):
+            return None
+        
+        headers = response.headers
+        retry_after = headers.get('retry-after', '')
+        reset = headers.get('x-ratelimit-reset', '')
+        
+        if retry_after.isdigit():
+            delay = float(retry_after)
+        elif headers.get('x-ratelimit-remaining') == '0' and reset.isdigit():
+            delay = max(0.0, int(reset) - time.time())
+        elif response.status_code == 429 or 'rate limit' in response.text.lower():
+            delay = float(2 ** attempt)
+        else:
+            return None
+        
+        return min(delay, self.MAX_RATE_LIMIT_WAIT)
+    
+    async def can_manage_issue_metadata(self, owner: str, repo: str) -> bool:
+        """
+        Check whether the token may set labels and assignees on a repository.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            
+        Returns:
+            False only if GitHub reports no triage/push access; True otherwise
+        """
+        try:
+            response = await self._request('GET', f"/repos/{owner}/{repo}")
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not check repository permissions: {e}")
+            return True
+        
+        if response.status_code != 200:
+            return True
+        
+        permissions = response.json().get('permissions') or {}
+        return any(permissions.get(role) for role in ('admin', 'maintain', 'push', 'triage'))
+    
+    async def _is_assignable(self, owner: str, repo: str, username: str) -> bool:
+        """Check whether a user can be assigned issues (False only on a definite 404)."""
+        try:
+            response = await self._request('GET', f"/repos/{owner}/{repo}/collaborators/{username}")
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not check collaborator {username}: {e}")
+            return True
+        return response.status_code != 404
+    
+    async def get_valid_assignees(self, owner: str, repo: str, usernames: Set[str]) -> Set[str]:
+        """
+        Filter usernames down to those that can be assigned on a repository.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            usernames: Candidate assignees
+            
+        Returns:
+            Usernames GitHub did not reject as non-collaborators
+        """
+        usernames = list(usernames)
+        checks = await asyncio.gather(
+            *(self._is_assignable(owner, repo, username) for username in usernames)
+        )
+        return {username for username, ok in zip(usernames, checks) if ok}
     
     def extract_repo_info(self, repo_url: str) -> Optional[Dict[str, str]]:
         """
@@ -39,14 +196,8 @@ class GitHubIssueCreator:
         Returns:
             Dict with 'owner' and 'repo' keys, or None if invalid
         """
-        import re
-        patterns = [
-            r'github\.com[/:]([^/]+)/([^/\.]+?)(?:\.git)?$',
-            r'github\.com[/:]([^/]+)/([^/]+?)/?$'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, repo_url)
+        for pattern in _REPO_PATTERNS:
+            match = pattern.search(repo_url)
             if match:
                 return {
                     'owner': match.group(1),
@@ -65,74 +216,67 @@ class GitHubIssueCreator:
         Returns:
             Formatted markdown body for the issue
         """
-        severity_emoji = {
-            'critical': '🔴',
-            'high': '🟠',
-            'medium': '🟡',
-            'low': '🔵',
-            'info': '⚪'
-        }
+        severity = finding.get('severity', 'medium')
+        severity_label = severity.upper()
+        control = finding.get('control', '')
+        emoji = _SEVERITY_EMOJI.get(severity, '🟡')
         
-        emoji = severity_emoji.get(finding.get('severity', 'medium'), '🟡')
+        # Priority only escalates for an explicit severity
+        raw_severity = finding.get('severity')
+        if raw_severity in ('critical', 'high'):
+            priority = 'Immediate'
+        elif raw_severity == 'medium':
+            priority = 'High'
+        else:
+            priority = 'Normal'
         
-        body = f"""## {emoji} SOC 2 Compliance Issue Detected
+        parts = [f"""## {emoji} SOC 2 Compliance Issue Detected
 
 ### Issue Details
-**Control:** {finding.get('control', 'N/A')} - {self._get_control_name(finding.get('control', ''))}
+**Control:** {finding.get('control', 'N/A')} - {self._get_control_name(control)}
 **Type:** {finding.get('type', 'Unknown').replace('_', ' ').title()}
-**Severity:** {finding.get('severity', 'medium').upper()}
-**Assigned to:** @{self._get_assignee_for_display(finding.get('control', ''))}
+**Severity:** {severity_label}
+**Assigned to:** @{self._get_assignee_for_display(control)}
 
 ### Summary of Risk
 {finding.get('message', 'Security or compliance issue detected.')}
 
 ### Risk Level
-**{finding.get('severity', 'medium').upper()}** - {self._get_risk_description(finding.get('severity', 'medium'))}
+**{severity_label}** - {self._get_risk_description(severity)}
 
 ### Location
-"""
+"""]
         
-        if finding.get('file'):
-            file_path = finding['file']
+        file_path = finding.get('file')
+        if file_path:
             if file_path.startswith('https://github.com/'):
-                body += f"**File:** [{file_path.split('/')[-1].split('#')[0]}]({file_path})\n"
+                parts.append(f"**File:** [{file_path.split('/')[-1].split('#')[0]}]({file_path})\n")
             else:
-                body += f"**File:** `{file_path}`\n"
+                parts.append(f"**File:** `{file_path}`\n")
         
-        if finding.get('line'):
-            body += f"**Line:** {finding['line']}\n"
+        line = finding.get('line')
+        if line:
+            parts.append(f"**Line:** {line}\n")
         
-        if finding.get('snippet'):
-            body += f"\n**Code Snippet:**\n```\n{finding['snippet'][:200]}\n```\n"
+        snippet = finding.get('snippet')
+        if snippet:
+            parts.append(f"\n**Code Snippet:**\n```\n{snippet[:200]}\n```\n")
         
-        body += f"""
+        parts.append(f"""
 ### Recommended Remediation
 {finding.get('recommendation', 'Please review and address this security issue according to SOC 2 compliance requirements.')}
 
 ### Additional Information
 - **SOC 2 Trust Service Criteria:** {finding.get('control', 'N/A')}
-- **Priority:** {'Immediate' if finding.get('severity') in ['critical', 'high'] else 'High' if finding.get('severity') == 'medium' else 'Normal'}
-
----
-*This issue was automatically created by CompliantByDefault - SOC 2 Readiness Agent*
-"""
+- **Priority:** {priority}
+""")
+        parts.append(_ISSUE_FOOTER)
         
-        return body
+        return ''.join(parts)
     
     def _get_control_name(self, control: str) -> str:
         """Get the full name of a SOC 2 control."""
-        control_names = {
-            'CC1': 'Control Environment',
-            'CC2': 'Communication and Information',
-            'CC3': 'Risk Assessment',
-            'CC4': 'Monitoring Activities',
-            'CC5': 'Control Activities',
-            'CC6': 'Logical and Physical Access Controls',
-            'CC7': 'System Operations',
-            'CC8': 'Change Management',
-            'CC9': 'Risk Mitigation'
-        }
-        return control_names.get(control, 'SOC 2 Compliance')
+        return _CONTROL_NAMES.get(control, 'SOC 2 Compliance')
     
     def _get_assignee_for_display(self, control: str) -> str:
         """Get the assignee username for display in issue body."""
@@ -140,22 +284,23 @@ class GitHubIssueCreator:
     
     def _get_risk_description(self, severity: str) -> str:
         """Get risk level description."""
-        descriptions = {
-            'critical': 'Immediate action required. This issue poses a severe security risk and violates SOC 2 requirements.',
-            'high': 'High priority. This issue significantly impacts security posture and SOC 2 compliance.',
-            'medium': 'Medium priority. This issue should be addressed to improve security and compliance.',
-            'low': 'Low priority. This issue represents a minor security concern.',
-            'info': 'Informational. This is a best practice recommendation.'
-        }
-        return descriptions.get(severity, 'This issue should be reviewed and addressed.')
+        return _RISK_DESCRIPTIONS.get(severity, 'This issue should be reviewed and addressed.')
     
-    def create_issue(self, repo_url: str, finding: Dict) -> Optional[Dict]:
+    async def create_issue(self, 
+                          repo_url: str, 
+                          finding: Dict,
+                          manage_metadata: Optional[bool] = None,
+                          valid_assignees: Optional[Set[str]] = None) -> Optional[Dict]:
         """
         Create a GitHub issue for a compliance finding.
         
         Args:
             repo_url: GitHub repository URL
             finding: Finding dictionary with issue details
+            manage_metadata: Whether the token may set labels and assignees
+                (from can_manage_issue_metadata); None tries and falls back
+            valid_assignees: Users known to be assignable (from
+                get_valid_assignees); None assumes the assignee is valid
             
         Returns:
             Created issue data or None if failed
@@ -179,6 +324,8 @@ class GitHubIssueCreator:
         
         # Get assignee based on control
         assignee = get_assignee_for_control(finding.get('control', ''))
+        assignable = valid_assignees is None or assignee in valid_assignees
+        assignee_fields = {'assignees': [assignee]} if assignable else {}
         
         # Create issue payload (without assignees initially)
         payload = {
@@ -187,7 +334,23 @@ class GitHubIssueCreator:
         }
         
         try:
-            url = f"{self.api_base}/repos/{owner}/{repo}/issues"
+            url = f"/repos/{owner}/{repo}/issues"
+            
+            if manage_metadata is False:
+                # Labels and assignees would be rejected or dropped; skip them
+                response = await self._request('POST', url, json=payload)
+                if response.status_code != 201:
+                    logger.error(f"Failed to create issue: {response.status_code} - {response.text}")
+                    return None
+                
+                issue_data = response.json()
+                logger.info(f"Created GitHub issue #{issue_data['number']}: {title}")
+                return {
+                    'number': issue_data['number'],
+                    'url': issue_data['html_url'],
+                    'title': title,
+                    'assignee': None
+                }
             
             # First try with labels and assignees
             payload_full = {
@@ -198,19 +361,19 @@ class GitHubIssueCreator:
                     f'severity-{finding.get("severity", "medium")}',
                     f'control-{finding.get("control", "unknown").lower()}'
                 ],
-                'assignees': [assignee]
+                **assignee_fields
             }
             
-            response = requests.post(url, json=payload_full, headers=self.headers)
+            response = await self._request('POST', url, json=payload_full)
             
             # If label creation fails (403), retry without labels but keep assignees
             if response.status_code == 403 and 'label' in response.text.lower():
                 logger.warning("Label creation permission denied, creating issue without labels")
                 payload_with_assignee = {
                     **payload,
-                    'assignees': [assignee]
+                    **assignee_fields
                 }
-                response = requests.post(url, json=payload_with_assignee, headers=self.headers)
+                response = await self._request('POST', url, json=payload_with_assignee)
             
             if response.status_code == 201:
                 issue_data = response.json()
@@ -218,13 +381,13 @@ class GitHubIssueCreator:
                 logger.info(f"Created GitHub issue #{issue_number}: {title}")
                 
                 # If assignee wasn't set in creation, try to add it separately
-                if not issue_data.get('assignees') or len(issue_data.get('assignees', [])) == 0:
+                if assignable and not issue_data.get('assignees'):
                     logger.info(f"Attempting to add assignee {assignee} to issue #{issue_number}")
-                    assignee_url = f"{self.api_base}/repos/{owner}/{repo}/issues/{issue_number}/assignees"
-                    assignee_response = requests.post(
+                    assignee_url = f"/repos/{owner}/{repo}/issues/{issue_number}/assignees"
+                    assignee_response = await self._request(
+                        'POST',
                         assignee_url, 
-                        json={'assignees': [assignee]}, 
-                        headers=self.headers
+                        json={'assignees': [assignee]}
                     )
                     
                     if assignee_response.status_code in [200, 201]:
@@ -236,7 +399,7 @@ class GitHubIssueCreator:
                     'number': issue_number,
                     'url': issue_data['html_url'],
                     'title': title,
-                    'assignee': assignee
+                    'assignee': assignee if assignable else None
                 }
             else:
                 logger.error(f"Failed to create issue: {response.status_code} - {response.text}")
@@ -246,9 +409,13 @@ class GitHubIssueCreator:
             logger.error(f"Error creating GitHub issue: {e}")
             return None
     
-    def create_issues_batch(self, repo_url: str, findings: list) -> Dict:
+    async def create_issues_batch(self, repo_url: str, findings: list) -> Dict:
         """
-        Create GitHub issues for multiple findings.
+        Create GitHub issues for multiple findings concurrently.
+        
+        Repository permissions and assignee validity are checked once up
+        front, so issues are not each retried without labels or followed by
+        an assignment call that cannot succeed.
         
         Args:
             repo_url: GitHub repository URL
@@ -257,15 +424,32 @@ class GitHubIssueCreator:
         Returns:
             Dict with success count and created issues
         """
-        created_issues = []
-        failed_count = 0
+        manage_metadata = None
+        valid_assignees = None
+        repo_info = self.extract_repo_info(repo_url)
+        if repo_info and findings:
+            owner, repo = repo_info['owner'], repo_info['repo']
+            manage_metadata = await self.can_manage_issue_metadata(owner, repo)
+            if manage_metadata:
+                # Only a handful of experts exist, so check each once for the batch
+                valid_assignees = await self.get_valid_assignees(owner, repo, {
+                    get_assignee_for_control(finding.get('control', ''))
+                    for finding in findings
+                })
         
-        for finding in findings:
-            result = self.create_issue(repo_url, finding)
-            if result:
-                created_issues.append(result)
-            else:
-                failed_count += 1
+        results = await asyncio.gather(
+            *(
+                self.create_issue(repo_url, finding, manage_metadata, valid_assignees)
+                for finding in findings
+            ),
+            return_exceptions=True
+        )
+        
+        created_issues = [
+            result for result in results
+            if result and not isinstance(result, BaseException)
+        ]
+        failed_count = len(results) - len(created_issues)
         
         return {
             'success_count': len(created_issues),
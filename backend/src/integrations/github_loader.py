@@ -1,28 +1,69 @@
 import os
+import re
 import tempfile
 import shutil
+import subprocess
+import threading
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict
-from git import Repo, GitCommandError
+from ..utils.file_loader import FileLoader
 from ..utils.logger import logger
 
+
+# GitHub repository URL (https, http, scheme-less or SSH), capturing owner and repo
+_GITHUB_URL = re.compile(
+    r'^(?:https?://|git@)?(?:www\.)?github\.com[/:]'
+    r'(?P<owner>[\w.-]+)/(?P<repo>[\w.-]+?)(?:\.git)?/?$'
+)
+
+
+@lru_cache(maxsize=32)
+def _cached_tree(path: str, mtime_ns: int) -> Dict:
+    """Build a directory tree once per path and root directory mtime."""
+    return FileLoader.get_directory_tree(path)
+
+
 class GitHubLoader:
     """Load and manage repositories from GitHub."""
     
-    def __init__(self, cache_dir: Optional[str] = None):
+    # Seconds to wait for `git ls-remote` before cloning without the cache
+    LS_REMOTE_TIMEOUT = 30
+    
+    # RAM-backed directory preferred for clones when no cache dir is configured
+    TMPFS_DIR = '/dev/shm'
+    
+    def __init__(self, cache_dir: Optional[str] = None, max_cached_repos: int = 8):
         """
         Initialize GitHub loader.
         
         Args:
-            cache_dir: Directory to cache cloned repos (defaults to temp)
+            cache_dir: Directory to cache cloned repos (defaults to
+                COMPLIANT_CACHE_DIR, else a temp dir on tmpfs when available)
+            max_cached_repos: Commit-keyed clones kept before the least
+                recently used are evicted
         """
-        self.cache_dir = cache_dir or tempfile.mkdtemp(prefix='compliant_')
+        self.cache_dir = cache_dir or os.getenv('COMPLIANT_CACHE_DIR') or self._default_cache_dir()
+        self.max_cached_repos = max_cached_repos
         Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+        # Scans still reading each commit-keyed clone; those are never evicted
+        self._in_use: Counter = Counter()
+        self._lock = threading.Lock()
         logger.info(f"GitHub cache directory: {self.cache_dir}")
     
+    @classmethod
+    def _default_cache_dir(cls) -> str:
+        """Create a temp cache dir, on tmpfs if writable to spare the disk."""
+        tmpfs = cls.TMPFS_DIR if os.access(cls.TMPFS_DIR, os.W_OK) else None
+        return tempfile.mkdtemp(prefix='compliant_', dir=tmpfs)
+    
     def clone_repository(self, repo_url: str, token: Optional[str] = None) -> str:
         """
-        Clone a GitHub repository.
+        Clone a GitHub repository, reusing a cached clone of the same commit.
+        
+        The clone is held in use until release() is called with its path, so
+        eviction cannot delete it while it is being scanned.
         
         Args:
             repo_url: GitHub repository URL
@@ -33,12 +74,6 @@ class GitHubLoader:
         """
         # Parse repo name from URL
         repo_name = self._parse_repo_name(repo_url)
-        local_path = Path(self.cache_dir) / repo_name
-        
-        # Remove if exists
-        if local_path.exists():
-            logger.info(f"Removing existing clone: {local_path}")
-            shutil.rmtree(local_path)
         
         # Prepare URL with token if provided
         clone_url = repo_url
@@ -47,20 +82,144 @@ class GitHubLoader:
             if 'github.com' in repo_url:
                 clone_url = repo_url.replace('https://', f'https://{token}@')
         
+        head_sha = self._resolve_head(clone_url)
+        if head_sha is None:
+            # Cannot tell which commit we would get; clone afresh
+            local_path = Path(self.cache_dir) / repo_name
+            if local_path.exists():
+                logger.info(f"Removing existing clone: {local_path}")
+                shutil.rmtree(local_path)
+            self._clone(repo_url, clone_url, local_path)
+            return str(local_path)
+        
+        local_path = Path(self.cache_dir) / f"{repo_name}@{head_sha}"
+        with self._lock:
+            if (local_path / '.git').is_dir():
+                logger.info(f"Reusing cached clone of {repo_url} at {head_sha[:12]}")
+                os.utime(local_path)  # Mark as recently used
+                self._in_use[local_path] += 1
+                return str(local_path)
+        
+        # Clone beside the cache entry, then move it into place in one step
+        staging_path = Path(tempfile.mkdtemp(prefix=f".{repo_name}-", dir=self.cache_dir))
+        try:
+            self._clone(repo_url, clone_url, staging_path)
+            os.rename(staging_path, local_path)
+        except OSError:
+            # A concurrent scan cached the same commit first
+            if not (local_path / '.git').is_dir():
+                raise
+        finally:
+            if staging_path.exists():
+                shutil.rmtree(staging_path, ignore_errors=True)
+        
+        with self._lock:
+            self._in_use[local_path] += 1
+            self._evict_cached_clones()
+        return str(local_path)
+    
+    def release(self, local_path: str):
+        """
+        Mark a clone returned by clone_repository as no longer in use.
+        
+        Args:
+            local_path: Path returned by clone_repository
+        """
+        path = Path(local_path)
+        with self._lock:
+            if self._in_use[path] > 1:
+                self._in_use[path] -= 1
+            else:
+                self._in_use.pop(path, None)
+    
+    def _clone(self, repo_url: str, clone_url: str, local_path: Path):
+        """Shallow-clone a repository into local_path."""
         logger.info(f"Cloning repository: {repo_url}")
         
+        # Shallow clone of the default branch only; scanners read just the checkout
+        result = subprocess.run(
+            ['git', 'clone', '--depth=1', '--single-branch', '--no-tags',
+             '--quiet', clone_url, str(local_path)],
+            capture_output=True,
+            text=True,
+            env={**os.environ, 'GIT_TERMINAL_PROMPT': '0'}
+        )
+        
+        if result.returncode != 0:
+            # Keep any token out of logs and API errors
+            error = result.stderr.strip().replace(clone_url, repo_url)
+            logger.error(f"Failed to clone repository: {error}")
+            raise Exception(f"Failed to clone repository: {error}")
+        
+        logger.info(f"Successfully cloned to: {local_path}")
+    
+    @staticmethod
+    def _git(local_path: str, *args: str) -> str:
+        """Run a git command in a repository and return its stdout."""
+        return subprocess.run(
+            ['git', '-C', local_path, *args],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+    
+    def _resolve_head(self, clone_url: str) -> Optional[str]:
+        """
+        Look up the remote HEAD commit without cloning.
+        
+        Args:
+            clone_url: Repository URL (including any token)
+            
+        Returns:
+            Commit SHA, or None if it could not be resolved
+        """
         try:
-            Repo.clone_from(clone_url, local_path, depth=1)  # Shallow clone
-            logger.info(f"Successfully cloned to: {local_path}")
-            return str(local_path)
+            result = subprocess.run(
+                ['git', 'ls-remote', clone_url, 'HEAD'],
+                capture_output=True,
+                text=True,
+                timeout=self.LS_REMOTE_TIMEOUT,
+                env={**os.environ, 'GIT_TERMINAL_PROMPT': '0'}
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"Could not resolve remote HEAD: {e}")
+            return None
         
-        except GitCommandError as e:
-            logger.error(f"Failed to clone repository: {e}")
-            raise Exception(f"Failed to clone repository: {str(e)}")
+        fields = result.stdout.split()
+        if result.returncode != 0 or not fields:
+            return None
+        return fields[0]
+    
+    def _evict_cached_clones(self):
+        """
+        Delete the least recently used commit-keyed clones beyond max_cached_repos.
+        
+        Clones in use are kept even if the cache stays over its cap; called
+        with the lock held, so no scan can pick up a clone being deleted.
+        """
+        entries = [
+            entry for entry in Path(self.cache_dir).iterdir()
+            if '@' in entry.name and entry.is_dir()
+        ]
+        excess = len(entries) - self.max_cached_repos
+        if excess <= 0:
+            return
+        
+        idle = sorted(
+            (entry for entry in entries if entry not in self._in_use),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in idle[:excess]:
+            logger.info(f"Evicting cached clone: {entry}")
+            shutil.rmtree(entry, ignore_errors=True)
     
     def _parse_repo_name(self, repo_url: str) -> str:
         """Extract repository name from URL."""
-        # Remove .git suffix if present
+        match = _GITHUB_URL.match(repo_url)
+        if match:
+            return f"{match['owner']}_{match['repo']}"
+        
+        # Other remotes: remove .git suffix if present
         url = repo_url.rstrip('/')
         if url.endswith('.git'):
             url = url[:-4]
@@ -83,17 +242,21 @@ class GitHubLoader:
             Dictionary with repository metadata
         """
         try:
-            repo = Repo(local_path)
+            commit, commit_date, message = self._git(
+                local_path, 'log', '-1', '--format=%H%x00%cI%x00%B'
+            ).split('\0', 2)
+            branch = self._git(local_path, 'rev-parse', '--abbrev-ref', 'HEAD').strip()
+            remotes = self._git(local_path, 'remote').split()
             
             # Get basic info
             metadata = {
                 'path': local_path,
-                'remote_url': repo.remotes.origin.url if repo.remotes else None,
-                'branch': repo.active_branch.name if not repo.head.is_detached else 'detached',
-                'commit': str(repo.head.commit),
-                'commit_message': repo.head.commit.message.strip(),
-                'commit_date': repo.head.commit.committed_datetime.isoformat(),
-                'is_dirty': repo.is_dirty()
+                'remote_url': self._git(local_path, 'remote', 'get-url', 'origin').strip() if 'origin' in remotes else None,
+                'branch': 'detached' if branch == 'HEAD' else branch,
+                'commit': commit,
+                'commit_message': message.strip(),
+                'commit_date': commit_date,
+                'is_dirty': bool(self._git(local_path, 'status', '--porcelain', '--untracked-files=no').strip())
             }
             
             logger.info(f"Repository metadata: {metadata['remote_url']}")
@@ -129,19 +292,7 @@ class GitHubLoader:
         Returns:
             True if valid, False otherwise
         """
-        # Basic validation
-        if not repo_url:
-            return False
-        
-        # Check for GitHub domain
-        valid_patterns = [
-            'github.com/',
-            'https://github.com/',
-            'http://github.com/',
-            'git@github.com:'
-        ]
-        
-        return any(pattern in repo_url for pattern in valid_patterns)
+        return bool(repo_url and _GITHUB_URL.match(repo_url))
     
     def get_file_tree(self, local_path: str) -> Dict:
         """
@@ -151,7 +302,11 @@ class GitHubLoader:
             local_path: Path to repository
             
         Returns:
-            Nested dictionary representing file structure
+            Nested dictionary representing file structure (shared between
+            calls for the same checkout, so treat it as read-only)
         """
-        from ..utils.file_loader import FileLoader
-        return FileLoader.get_directory_tree(local_path)
+        try:
+            mtime_ns = os.stat(local_path).st_mtime_ns
+        except OSError:
+            return {}
+        return _cached_tree(local_path, mtime_ns)
@@ -1,38 +1,137 @@
+import os
 import uuid
 import asyncio
-from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional
 from pathlib import Path
 from datetime import datetime
 
-from .scanners.secret_scanner import SecretScanner
-from .scanners.static_scanner import StaticScanner
-from .scanners.dependency_scanner import DependencyScanner
-from .scanners.iac_scanner import IaCScanner
+from .scanners.combined_scanner import CombinedScanner
 from .analyzers.llm_analyzer import LLMAnalyzer
 from .analyzers.scoring import ScoringEngine
 from .reports.report_generator import ReportGenerator
 from .integrations.github_loader import GitHubLoader
+from .utils.file_loader import FileIndex
 from .utils.logger import logger
+from .utils.job_store import JobStore, create_job_store
+
+# Files per scanner task, so large repositories keep every worker busy
+_SCAN_BATCH_SIZE = 256
+
+# Scanners owned by a process-pool worker, created once per worker process
+_worker_scanner = None
+
+def _init_worker_scanners():
+    """Process-pool initializer: build the scanners once per worker."""
+    global _worker_scanner
+    _worker_scanner = CombinedScanner(use_cache=True)
+
+def _warm_worker():
+    """No-op task whose submission makes the pool spawn (and initialize) a worker."""
+
+def _create_llm_analyzer() -> Optional[LLMAnalyzer]:
+    """Build the LLM analyzer, or None when it is not configured."""
+    try:
+        return LLMAnalyzer()
+    except ValueError as e:
+        logger.warning(f"LLM Analyzer not initialized: {e}")
+        return None
+    except Exception as e:
+        # Scans still run without AI analysis when the SDK cannot be set up
+        logger.error(f"LLM Analyzer failed to initialize: {e}")
+        return None
+
+def _run_scanners(file_index: FileIndex, repo_url: Optional[str] = None) -> Dict[str, List[Dict]]:
+    """Run every scanner over a file index inside a worker process, reading each file once."""
+    return _worker_scanner.scan_files(
+        file_index, repo_url=repo_url, local_base_path=file_index.root
+    )
 
 class ScanEngine:
     """Main orchestration engine for running scans."""
     
-    def __init__(self):
-        """Initialize scan engine with all components."""
-        self.secret_scanner = SecretScanner()
-        self.static_scanner = StaticScanner()
-        self.dependency_scanner = DependencyScanner()
-        self.iac_scanner = IaCScanner()
-        self.scoring_engine = ScoringEngine()
-        self.report_generator = ReportGenerator()
-        self.github_loader = GitHubLoader()
-        
-        # Initialize LLM analyzer (may raise if API key missing)
-        try:
-            self.llm_analyzer = LLMAnalyzer()
-        except ValueError as e:
-            logger.warning(f"LLM Analyzer not initialized: {e}")
-            self.llm_analyzer = None
+    def __init__(self, max_workers: Optional[int] = None, job_store: Optional[JobStore] = None,
+                 markdown_reports: Optional[bool] = None):
+        """
+        Initialize scan engine with all components.
+        
+        Args:
+            max_workers: Scanner worker processes (defaults to CPU count)
+            job_store: Job progress store (defaults to JOBSTORE_URL, else in-memory)
+            markdown_reports: Also save a Markdown report per scan (defaults to
+                MARKDOWN_REPORTS, enabled unless set to 0/false/no)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if markdown_reports is None:
+            markdown_reports = os.getenv('MARKDOWN_REPORTS', '1').lower() not in ('0', 'false', 'no')
+        self.markdown_reports = markdown_reports
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Bound queued scans so a burst of requests cannot pile up unbounded work
+        # (created on first use, inside the event loop that runs the scans)
+        self._scan_semaphore: Optional[asyncio.Semaphore] = None
+        # Job registration and progress events, shareable across API workers
+        self.job_store = job_store or create_job_store()
+        
+        # Components load config, create directories and import the Gemini SDK;
+        # build them side by side so startup takes the slowest, not the sum
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            scoring_engine = executor.submit(ScoringEngine)
+            report_generator = executor.submit(ReportGenerator)
+            github_loader = executor.submit(GitHubLoader)
+            llm_analyzer = executor.submit(_create_llm_analyzer)
+        
+        self.scoring_engine = scoring_engine.result()
+        self.report_generator = report_generator.result()
+        self.github_loader = github_loader.result()
+        self.llm_analyzer = llm_analyzer.result()
+    
+    def start(self):
+        """Start the scanner process pool (idempotent)."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker_scanners
+            )
+            # Spawn every worker now so they build their scanners in parallel
+            # at startup instead of during the first scan
+            for _ in range(self.max_workers):
+                self._pool.submit(_warm_worker)
+            logger.info(f"Started scanner pool with {self.max_workers} worker(s)")
+    
+    def shutdown(self):
+        """Shut down the scanner process pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            logger.info("Scanner pool shut down")
+    
+    async def create_job(self) -> str:
+        """
+        Register a new scan job so progress can be subscribed to before it runs.
+        
+        Returns:
+            Job ID
+        """
+        job_id = str(uuid.uuid4())
+        await self.job_store.create(job_id)
+        return job_id
+    
+    async def job_events(self, job_id: str) -> Optional[AsyncIterator[Dict]]:
+        """
+        Subscribe to progress events of a scan.
+        
+        Args:
+            job_id: Scan job identifier
+            
+        Returns:
+            Async iterator of events ending after completed/failed, or None
+            if the job store does not know the job
+        """
+        return await self.job_store.events(job_id)
+    
+    async def _publish(self, job_id: str, status: str, **data):
+        """Send a progress event to every subscriber of a scan."""
+        await self.job_store.publish(job_id, {'job_id': job_id, 'status': status, **data})
     
     async def scan_local(self, path: str) -> str:
         """
@@ -44,11 +143,10 @@ class ScanEngine:
         Returns:
             Job ID
         """
-        job_id = str(uuid.uuid4())
-        logger.info(f"Starting local scan {job_id} for: {path}")
+        job_id = await self.create_job()
         
         # Run scan in background
-        asyncio.create_task(self._execute_scan(job_id, path, 'local'))
+        asyncio.create_task(self.run_local_scan(job_id, path))
         
         return job_id
     
@@ -63,27 +161,63 @@ class ScanEngine:
         Returns:
             Job ID
         """
-        job_id = str(uuid.uuid4())
-        logger.info(f"Starting GitHub scan {job_id} for: {repo_url}")
-        
         # Validate URL
         if not self.github_loader.validate_url(repo_url):
             raise ValueError("Invalid GitHub repository URL")
         
-        # Clone repository
-        try:
-            local_path = self.github_loader.clone_repository(repo_url, token)
-        except Exception as e:
-            logger.error(f"Failed to clone repository: {e}")
-            raise
+        job_id = await self.create_job()
         
-        # Run scan in background
-        asyncio.create_task(
-            self._execute_scan(job_id, local_path, 'github', repo_url)
-        )
+        # Clone and scan in background
+        asyncio.create_task(self.run_github_scan(job_id, repo_url, token))
         
         return job_id
     
+    async def run_local_scan(self, job_id: str, path: str):
+        """
+        Run a registered local scan to completion.
+        
+        Args:
+            job_id: Job ID from create_job
+            path: Path to local directory
+        """
+        logger.info(f"Starting local scan {job_id} for: {path}")
+        await self._run_job(job_id, self._execute_scan(job_id, path, 'local'))
+    
+    async def run_github_scan(self, job_id: str, repo_url: str, token: Optional[str] = None):
+        """
+        Clone a repository and run a registered scan over it.
+        
+        Args:
+            job_id: Job ID from create_job
+            repo_url: GitHub repository URL
+            token: Optional GitHub token
+        """
+        logger.info(f"Starting GitHub scan {job_id} for: {repo_url}")
+        
+        async def clone_and_scan():
+            await self._publish(job_id, 'cloning')
+            local_path = await asyncio.to_thread(
+                self.github_loader.clone_repository, repo_url, token
+            )
+            try:
+                await self._execute_scan(job_id, local_path, 'github', repo_url)
+            finally:
+                self.github_loader.release(local_path)
+        
+        await self._run_job(job_id, clone_and_scan())
+    
+    async def _run_job(self, job_id: str, scan):
+        """Await a scan and publish its outcome."""
+        try:
+            await scan
+        except Exception as e:
+            logger.error(f"Error executing scan {job_id}: {e}")
+            await self._publish(job_id, 'failed', error=str(e))
+            return
+        
+        logger.info(f"Scan {job_id} completed successfully")
+        await self._publish(job_id, 'completed')
+    
     async def _execute_scan(self, 
                            job_id: str, 
                            path: str, 
@@ -98,76 +232,124 @@ class ScanEngine:
             scan_type: 'local' or 'github'
             repo_url: Original repository URL (for GitHub scans)
         """
-        try:
-            logger.info(f"Executing scan {job_id}")
-            
-            # Run all scanners
-            logger.info("Running scanners...")
-            
-            secret_findings = self.secret_scanner.scan_directory(path, repo_url=repo_url, local_base_path=path)
-            static_findings = self.static_scanner.scan_directory(path, repo_url=repo_url, local_base_path=path)
-            dependency_findings = self.dependency_scanner.scan_directory(path, repo_url=repo_url, local_base_path=path)
-            iac_findings = self.iac_scanner.scan_directory(path, repo_url=repo_url, local_base_path=path)
-            
-            # Combine all findings
-            all_findings = (
-                secret_findings + 
-                static_findings + 
-                dependency_findings + 
-                iac_findings
-            )
-            
-            logger.info(f"Scanners complete. Total findings: {len(all_findings)}")
-            
-            # Analyze with LLM
-            if self.llm_analyzer:
-                logger.info("Running LLM analysis...")
-                analysis = self.llm_analyzer.analyze_findings(all_findings)
-            else:
-                logger.warning("Skipping LLM analysis (not configured)")
-                analysis = {
-                    'control_coverage': {},
-                    'recommendations': [],
-                    'risk_assessment': 'LLM analysis not available'
-                }
-            
-            # Calculate scores
-            logger.info("Calculating scores...")
-            scoring = self.scoring_engine.calculate_readiness_score(
-                all_findings,
-                analysis.get('control_coverage', {})
-            )
-            
-            # Generate metadata
-            metadata = {
-                'job_id': job_id,
-                'scan_type': scan_type,
-                'path': path,
-                'repository': repo_url or path,
-                'timestamp': datetime.now().isoformat(),
-                'scanner_versions': {
-                    'secret': '1.0',
-                    'static': '1.0',
-                    'dependency': '1.0',
-                    'iac': '1.0'
-                }
+        logger.info(f"Executing scan {job_id}")
+        
+        # Run all scanners in the process pool to keep the event loop free
+        logger.info("Running scanners...")
+        await self._publish(job_id, 'scanning')
+        self.start()
+        if self._scan_semaphore is None:
+            self._scan_semaphore = asyncio.Semaphore(2 * self.max_workers)
+        
+        # Walk the tree once; every batch of files is read once and run through
+        # all scanners, so a large repository spreads over all workers
+        async with self._scan_semaphore:
+            file_index = await asyncio.to_thread(FileIndex.build, path)
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(*(
+                loop.run_in_executor(self._pool, _run_scanners, batch, repo_url)
+                for batch in file_index.batches(_SCAN_BATCH_SIZE)
+            ))
+        # Report order: scanner by scanner, batches in traversal order
+        all_findings = [
+            finding
+            for name in results[0]
+            for batch_findings in results
+            for finding in batch_findings[name]
+        ]
+        
+        logger.info(f"Scanners complete. Total findings: {len(all_findings)}")
+        
+        # Analyze with LLM
+        if self.llm_analyzer:
+            logger.info("Running LLM analysis...")
+            await self._publish(job_id, 'analyzing', findings=len(all_findings))
+            analysis = await self.llm_analyzer.analyze_findings(all_findings)
+        else:
+            logger.warning("Skipping LLM analysis (not configured)")
+            analysis = {
+                'control_coverage': {},
+                'recommendations': [],
+                'risk_assessment': 'LLM analysis not available'
             }
+        
+        # Calculate scores
+        logger.info("Calculating scores...")
+        await self._publish(job_id, 'scoring')
+        scoring = self.scoring_engine.calculate_readiness_score(
+            all_findings,
+            analysis.get('control_coverage', {})
+        )
+        
+        # Generate metadata
+        metadata = {
+            'job_id': job_id,
+            'scan_type': scan_type,
+            'path': path,
+            'repository': repo_url or path,
+            'timestamp': datetime.now().isoformat(),
+            'scanner_versions': {
+                'secret': '1.0',
+                'static': '1.0',
+                'dependency': '1.0',
+                'iac': '1.0'
+            }
+        }
+        
+        # Generate report
+        logger.info("Generating report...")
+        await self._publish(job_id, 'reporting')
+        # Serializing and writing the report files blocks, so keep it off the loop
+        await asyncio.to_thread(
+            self.report_generator.generate_report,
+            job_id,
+            all_findings,
+            analysis,
+            scoring,
+            metadata,
+            emit_markdown=self.markdown_reports
+        )
+    
+    async def wait_for_job(self, job_id: str, timeout: Optional[float] = None):
+        """
+        Wait for a scan to finish (returns at once if it is not running).
+        
+        Args:
+            job_id: Scan job identifier
+            timeout: Maximum seconds to wait (None waits indefinitely)
             
-            # Generate report
-            logger.info("Generating report...")
-            report = self.report_generator.generate_report(
-                job_id,
-                all_findings,
-                analysis,
-                scoring,
-                metadata
-            )
+        Raises:
+            asyncio.TimeoutError: If the scan does not finish within timeout
+        """
+        events = await self.job_events(job_id)
+        if events is None:
+            return
+        
+        async def drain():
+            async for _ in events:
+                pass
+        
+        try:
+            await asyncio.wait_for(drain(), timeout)
+        finally:
+            await events.aclose()
+    
+    async def await_report(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Wait for a scan to finish and return its report.
+        
+        Args:
+            job_id: Scan job identifier
+            timeout: Maximum seconds to wait (None waits indefinitely)
             
-            logger.info(f"Scan {job_id} completed successfully")
+        Returns:
+            Report data, or None if the scan finished without a report
             
-        except Exception as e:
-            logger.error(f"Error executing scan {job_id}: {e}")
-            raise
+        Raises:
+            asyncio.TimeoutError: If the scan does not finish within timeout
+        """
+        await self.wait_for_job(job_id, timeout)
+        return self.get_report(job_id)
     
     def get_report(self, job_id: str) -> Optional[Dict]:
         """
@@ -181,6 +363,18 @@ class ScanEngine:
         """
         return self.report_generator.load_report(job_id)
     
+    def get_report_etag(self, job_id: str) -> Optional[str]:
+        """
+        Get the ETag of a completed report.
+        
+        Args:
+            job_id: Scan job identifier
+            
+        Returns:
+            ETag string or None if the report does not exist
+        """
+        return self.report_generator.get_report_etag(job_id)
+    
     def list_reports(self) -> List[Dict]:
         """
         List all available reports.
@@ -4,14 +4,149 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Dict
-import json
+from typing import Dict, Optional
+import asyncio
+import io
 
+from .report_generator import SEVERITIES, prepare_findings_by_severity
 from ..utils.logger import logger
 
 
+def _build_styles():
+    """Build the sample stylesheet plus the report's custom paragraph styles."""
+    styles = getSampleStyleSheet()
+    
+    # Title style
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#1F2937'),
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    ))
+    
+    # Section Header
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=colors.HexColor('#374151'),
+        spaceAfter=12,
+        spaceBefore=20,
+        fontName='Helvetica-Bold'
+    ))
+    
+    # Score style
+    styles.add(ParagraphStyle(
+        name='ScoreText',
+        parent=styles['Normal'],
+        fontSize=48,
+        textColor=colors.HexColor('#2563EB'),
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    ))
+    
+    return styles
+
+
+# Styles are read-only once built, so every report shares them
+_STYLES = _build_styles()
+
+_PRIORITY_COLORS = {
+    'critical': colors.HexColor('#DC2626'),
+    'high': colors.HexColor('#F59E0B'),
+    'medium': colors.HexColor('#10B981'),
+    'low': colors.HexColor('#6B7280')
+}
+
+
+# Wrapping text inside findings table cells
+_CELL_STYLE = ParagraphStyle(
+    'FindingCell',
+    parent=_STYLES['Normal'],
+    fontSize=8,
+    leading=10
+)
+
+_STATUS_SYMBOLS = {
+    'compliant': '✓',
+    'partial': '⚠',
+    'non_compliant': '✗',
+    'unknown': '?'
+}
+
+_STATS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F3F4F6')),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('PADDING', (0, 0), (-1, -1), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#D1D5DB')),
+])
+
+_SEVERITY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1F2937')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('PADDING', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#D1D5DB')),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F9FAFB')]),
+])
+
+_CONTROL_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1F2937')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (3, 0), (4, -1), 'CENTER'),
+    ('PADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#D1D5DB')),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F9FAFB')]),
+])
+
+_FINDINGS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1F2937')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('PADDING', (0, 0), (-1, -1), 4),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#D1D5DB')),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F9FAFB')]),
+])
+
+_FINDINGS_COL_WIDTHS = [1.3*inch, 2.0*inch, 0.7*inch, 2.5*inch]
+
+# Priority cells are colored per row on top of this style
+_RECOMMENDATIONS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1F2937')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('TEXTCOLOR', (1, 1), (1, -1), colors.white),
+    ('FONTNAME', (1, 1), (1, -1), 'Helvetica-Bold'),
+    ('ALIGN', (0, 0), (1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('PADDING', (0, 0), (-1, -1), 4),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#D1D5DB')),
+])
+
+_RECOMMENDATIONS_COL_WIDTHS = [0.3*inch, 0.8*inch, 1.6*inch, 0.6*inch, 1.7*inch, 1.5*inch]
+
+# Worker processes for ReportLab layout, which is CPU-bound and holds the GIL
+_PDF_POOL_WORKERS = 2
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
 class PDFReportGenerator:
     """Generate PDF reports from JSON report data."""
     
@@ -24,42 +159,7 @@ class PDFReportGenerator:
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles."""
-        # Title style
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1F2937'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Section Header
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#374151'),
-            spaceAfter=12,
-            spaceBefore=20,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Score style
-        self.styles.add(ParagraphStyle(
-            name='ScoreText',
-            parent=self.styles['Normal'],
-            fontSize=48,
-            textColor=colors.HexColor('#2563EB'),
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
+        self.styles = _STYLES
     
     def generate_pdf(self, job_id: str, report_data: Dict) -> Path:
         """
@@ -75,8 +175,10 @@ class PDFReportGenerator:
         logger.info(f"Generating PDF report for job {job_id}")
         
         pdf_path = self.output_dir / f"{job_id}_report.pdf"
+        # Lay out in memory and write the file in one call
+        buffer = io.BytesIO()
         doc = SimpleDocTemplate(
-            str(pdf_path),
+            buffer,
             pagesize=letter,
             rightMargin=72,
             leftMargin=72,
@@ -84,64 +186,70 @@ class PDFReportGenerator:
             bottomMargin=18,
         )
         
+        # The fixed cover page is drawn straight onto the canvas; each section
+        # opens with a page break, so the story starts on page two
         story = []
         
-        # Add content
-        story.extend(self._create_cover_page(report_data))
-        story.append(PageBreak())
-        story.extend(self._create_executive_summary(report_data))
-        story.append(PageBreak())
-        story.extend(self._create_control_coverage(report_data))
-        story.append(PageBreak())
-        story.extend(self._create_recommendations(report_data))
-        story.append(PageBreak())
-        story.extend(self._create_findings_details(report_data))
+        # Add content; sections with nothing to show get no page
+        for section in (
+            self._create_executive_summary,
+            self._create_control_coverage,
+            self._create_recommendations,
+            self._create_findings_details
+        ):
+            flowables = section(report_data)
+            if flowables:
+                story.append(PageBreak())
+                story.extend(flowables)
         
         # Build PDF
-        doc.build(story)
+        doc.build(story, onFirstPage=partial(self._draw_cover_page, report_data=report_data))
+        pdf_path.write_bytes(buffer.getvalue())
         
         logger.info(f"PDF report generated: {pdf_path}")
         return pdf_path
     
-    def _create_cover_page(self, report_data: Dict) -> list:
-        """Create cover page content."""
-        story = []
+    def _draw_cover_page(self, canvas, doc, report_data: Dict):
+        """Draw the cover page directly on the canvas (no flowable layout)."""
+        summary = report_data.get('summary', {})
+        metadata = report_data.get('metadata', {})
+        center = doc.pagesize[0] / 2
+        top = doc.pagesize[1] - doc.topMargin
+        
+        canvas.saveState()
         
         # Title
-        story.append(Spacer(1, 1.5*inch))
-        story.append(Paragraph("SOC 2 Compliance Report", self.styles['CustomTitle']))
-        story.append(Spacer(1, 0.3*inch))
+        canvas.setFont('Helvetica-Bold', 24)
+        canvas.setFillColor(colors.HexColor('#1F2937'))
+        canvas.drawCentredString(center, top - 1.5*inch - 24, "SOC 2 Compliance Report")
         
         # Score
-        summary = report_data.get('summary', {})
-        score = summary.get('readiness_score', 0)
-        grade = summary.get('grade', 'N/A')
+        canvas.setFont('Helvetica-Bold', 48)
+        canvas.setFillColor(colors.HexColor('#2563EB'))
+        canvas.drawCentredString(center, top - 3.3*inch, f"{summary.get('readiness_score', 0)}/100")
         
-        story.append(Paragraph(f"{score}/100", self.styles['ScoreText']))
-        story.append(Paragraph(f"Grade: {grade}", self.styles['Heading2']))
-        story.append(Spacer(1, 0.5*inch))
+        canvas.setFont('Helvetica-Bold', 14)
+        canvas.setFillColor(colors.black)
+        canvas.drawCentredString(center, top - 3.75*inch, f"Grade: {summary.get('grade', 'N/A')}")
         
-        # Metadata
-        metadata = report_data.get('metadata', {})
+        # Metadata: right-aligned labels, left-aligned values
         meta_data = [
-            ['Report ID:', report_data.get('id', 'N/A')],
-            ['Repository:', metadata.get('repository', 'N/A')],
-            ['Scan Type:', metadata.get('scan_type', 'N/A').upper()],
-            ['Generated:', datetime.fromisoformat(report_data.get('generated_at', datetime.now().isoformat())).strftime('%Y-%m-%d %H:%M:%S')],
+            ('Report ID:', report_data.get('id', 'N/A')),
+            ('Repository:', metadata.get('repository', 'N/A')),
+            ('Scan Type:', metadata.get('scan_type', 'N/A').upper()),
+            ('Generated:', datetime.fromisoformat(report_data.get('generated_at', datetime.now().isoformat())).strftime('%Y-%m-%d %H:%M:%S')),
         ]
         
-        meta_table = Table(meta_data, colWidths=[2*inch, 4*inch])
-        meta_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#374151')),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        story.append(meta_table)
+        canvas.setFillColor(colors.HexColor('#374151'))
+        y = top - 4.5*inch
+        for label, value in meta_data:
+            canvas.setFont('Helvetica-Bold', 10)
+            canvas.drawRightString(center - 1.1*inch, y, label)
+            canvas.setFont('Helvetica', 10)
+            canvas.drawString(center - 0.9*inch, y, str(value))
+            y -= 0.3*inch
         
-        return story
+        canvas.restoreState()
     
     def _create_executive_summary(self, report_data: Dict) -> list:
         """Create executive summary section."""
@@ -161,14 +269,7 @@ class PDFReportGenerator:
         ]
         
         stats_table = Table(stats_data, colWidths=[3*inch, 3*inch])
-        stats_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F3F4F6')),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('PADDING', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#D1D5DB')),
-        ]))
+        stats_table.setStyle(_STATS_TABLE_STYLE)
         story.append(stats_table)
         story.append(Spacer(1, 0.3*inch))
         
@@ -178,47 +279,35 @@ class PDFReportGenerator:
         severity_counts = severity_impact.get('counts', {})
         
         severity_data = [['Severity', 'Count']]
-        for severity in ['critical', 'high', 'medium', 'low', 'info']:
+        for severity in SEVERITIES:
             count = severity_counts.get(severity, 0)
             if count > 0:
                 severity_data.append([severity.upper(), str(count)])
         
         if len(severity_data) > 1:
             severity_table = Table(severity_data, colWidths=[3*inch, 3*inch])
-            severity_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1F2937')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('PADDING', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#D1D5DB')),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F9FAFB')]),
-            ]))
+            severity_table.setStyle(_SEVERITY_TABLE_STYLE)
             story.append(severity_table)
         
         return story
     
     def _create_control_coverage(self, report_data: Dict) -> list:
-        """Create SOC 2 control coverage section."""
+        """Create SOC 2 control coverage section (empty without controls)."""
+        controls = report_data.get('controls', {})
+        if not controls:
+            return []
+        
         story = []
         
         story.append(Paragraph("SOC 2 Control Coverage", self.styles['CustomTitle']))
         story.append(Spacer(1, 0.2*inch))
         
-        controls = report_data.get('controls', {})
-        
         # Create table data
         table_data = [['Control ID', 'Name', 'Status', 'Score', 'Findings']]
         
         for control_id, control_info in sorted(controls.items()):
             status = control_info.get('status', 'unknown')
-            status_symbol = {
-                'compliant': '✓',
-                'partial': '⚠',
-                'non_compliant': '✗',
-                'unknown': '?'
-            }.get(status, '?')
+            status_symbol = _STATUS_SYMBOLS.get(status, '?')
             
             table_data.append([
                 control_id,
@@ -230,101 +319,104 @@ class PDFReportGenerator:
         
         if len(table_data) > 1:
             control_table = Table(table_data, colWidths=[1*inch, 2.5*inch, 1.2*inch, 0.8*inch, 0.8*inch])
-            control_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1F2937')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('ALIGN', (3, 0), (4, -1), 'CENTER'),
-                ('PADDING', (0, 0), (-1, -1), 8),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#D1D5DB')),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F9FAFB')]),
-            ]))
+            control_table.setStyle(_CONTROL_TABLE_STYLE)
             story.append(control_table)
         
         return story
     
     def _create_recommendations(self, report_data: Dict) -> list:
-        """Create recommendations section."""
+        """Create recommendations section (empty without recommendations)."""
+        recommendations = report_data.get('recommendations', [])[:10]
+        if not recommendations:
+            return []
+        
         story = []
         
         story.append(Paragraph("Top Recommendations", self.styles['CustomTitle']))
         story.append(Spacer(1, 0.2*inch))
         
-        recommendations = report_data.get('recommendations', [])
+        # One table for all recommendations; only wrapping cells need Paragraphs
+        table_data = [['#', 'Priority', 'Issue', 'Control', 'Action', 'File']]
+        priority_backgrounds = []
         
-        for i, rec in enumerate(recommendations[:10], 1):
+        for i, rec in enumerate(recommendations, 1):
             priority = rec.get('priority', 'medium')
-            priority_color = {
-                'critical': colors.HexColor('#DC2626'),
-                'high': colors.HexColor('#F59E0B'),
-                'medium': colors.HexColor('#10B981'),
-                'low': colors.HexColor('#6B7280')
-            }.get(priority, colors.gray)
-            
-            # Recommendation header
-            header_style = ParagraphStyle(
-                'RecHeader',
-                parent=self.styles['Normal'],
-                fontSize=12,
-                fontName='Helvetica-Bold',
-                textColor=priority_color,
-                spaceAfter=4
+            table_data.append([
+                str(i),
+                priority.upper(),
+                Paragraph(rec.get('issue', 'Issue'), _CELL_STYLE),
+                rec.get('control', 'N/A'),
+                Paragraph(rec.get('action', 'Review and remediate'), _CELL_STYLE),
+                Paragraph(rec.get('file', 'N/A'), _CELL_STYLE)
+            ])
+            priority_backgrounds.append(
+                ('BACKGROUND', (1, i), (1, i), _PRIORITY_COLORS.get(priority, colors.gray))
             )
-            story.append(Paragraph(f"{i}. [{priority.upper()}] {rec.get('issue', 'Issue')}", header_style))
-            
-            # Recommendation details
-            story.append(Paragraph(f"<b>Control:</b> {rec.get('control', 'N/A')}", self.styles['Normal']))
-            story.append(Paragraph(f"<b>Action:</b> {rec.get('action', 'Review and remediate')}", self.styles['Normal']))
-            story.append(Paragraph(f"<b>File:</b> {rec.get('file', 'N/A')}", self.styles['Normal']))
-            story.append(Spacer(1, 0.15*inch))
+        
+        recommendations_table = Table(table_data, colWidths=_RECOMMENDATIONS_COL_WIDTHS, repeatRows=1)
+        recommendations_table.setStyle(_RECOMMENDATIONS_TABLE_STYLE)
+        recommendations_table.setStyle(TableStyle(priority_backgrounds))
+        story.append(recommendations_table)
         
         return story
     
     def _create_findings_details(self, report_data: Dict) -> list:
-        """Create detailed findings section."""
+        """Create detailed findings section (empty without findings)."""
+        # Grouped when the report was generated; older reports are grouped here
+        findings_by_severity = report_data.get('findings_by_severity')
+        if findings_by_severity is None:
+            findings_by_severity = prepare_findings_by_severity(report_data.get('findings', []))
+        if not findings_by_severity:
+            return []
+        
         story = []
         
         story.append(Paragraph("Detailed Findings", self.styles['CustomTitle']))
         story.append(Spacer(1, 0.2*inch))
         
-        findings = report_data.get('findings', [])
-        
-        # Group by severity
-        findings_by_severity = {}
-        for finding in findings:
-            severity = finding.get('severity', 'info')
-            if severity not in findings_by_severity:
-                findings_by_severity[severity] = []
-            findings_by_severity[severity].append(finding)
-        
         # Display findings by severity
-        for severity in ['critical', 'high', 'medium', 'low', 'info']:
-            if severity in findings_by_severity:
-                story.append(Paragraph(f"{severity.upper()} Severity Findings", self.styles['SectionHeader']))
+        for severity, rows in findings_by_severity.items():
+            story.append(Paragraph(f"{severity.upper()} Severity Findings", self.styles['SectionHeader']))
+            
+            # One table per severity; only wrapping cells need Paragraphs
+            table_data = [['Type', 'File', 'Control', 'Details']]
+            
+            for row in rows:
+                details = row['message']
+                if row['recommendation']:
+                    details += f"<br/><b>Recommendation:</b> {row['recommendation']}"
                 
-                for finding in findings_by_severity[severity][:20]:  # Limit to 20 per severity
-                    finding_text = f"""
-                    <b>Type:</b> {finding.get('type', 'Unknown').replace('_', ' ').title()}<br/>
-                    <b>File:</b> {finding.get('file', 'N/A')}<br/>
-                    <b>Line:</b> {finding.get('line', 'N/A')}<br/>
-                    <b>Control:</b> {finding.get('control', 'N/A')}<br/>
-                    <b>Message:</b> {finding.get('message', 'No message')}<br/>
-                    """
-                    
-                    if finding.get('recommendation'):
-                        finding_text += f"<b>Recommendation:</b> {finding.get('recommendation')}<br/>"
-                    
-                    story.append(Paragraph(finding_text, self.styles['Normal']))
-                    story.append(Spacer(1, 0.1*inch))
+                table_data.append([
+                    row['type_display'],
+                    Paragraph(row['file_line'], _CELL_STYLE),
+                    row['control'],
+                    Paragraph(details, _CELL_STYLE)
+                ])
+                
+            findings_table = Table(table_data, colWidths=_FINDINGS_COL_WIDTHS, repeatRows=1)
+            findings_table.setStyle(_FINDINGS_TABLE_STYLE)
+            story.append(findings_table)
         
         return story
 
 
-def generate_pdf_report(job_id: str, report_data: Dict) -> Path:
+def _generate_pdf_sync(job_id: str, report_data: Dict) -> Path:
+    """Generate a PDF report in the calling process."""
+    generator = PDFReportGenerator()
+    return generator.generate_pdf(job_id, report_data)
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Create the PDF worker pool on first use (joined at interpreter exit)."""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=_PDF_POOL_WORKERS)
+    return _pdf_pool
+
+
+async def generate_pdf_report(job_id: str, report_data: Dict) -> Path:
     """
-    Helper function to generate PDF report.
+    Helper function to generate PDF report in a worker process.
     
     Args:
         job_id: Report job ID
@@ -333,5 +425,5 @@ def generate_pdf_report(job_id: str, report_data: Dict) -> Path:
     Returns:
         Path to generated PDF
     """
-    generator = PDFReportGenerator()
-    return generator.generate_pdf(job_id, report_data)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pdf_pool(), _generate_pdf_sync, job_id, report_data)
@@ -1,28 +1,134 @@
-import json
+import hashlib
+import os
+import threading
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, List, Optional
+import orjson
 from ..utils.logger import logger
 
+# Severities in display order (most urgent first)
+SEVERITIES = ('critical', 'high', 'medium', 'low', 'info')
+
+# Detailed findings listed per severity
+DETAIL_FINDINGS_PER_SEVERITY = 20
+
+# Markdown marker shown next to each control status (read-only, shared by all reports)
+_STATUS_EMOJI = MappingProxyType({
+    'compliant': '✅',
+    'partial': '⚠️',
+    'non_compliant': '❌',
+    'unknown': '❓'
+})
+
+def _control_row(control_id: str, control_data: Dict) -> str:
+    """Format one row of the control coverage table."""
+    get = control_data.get
+    status = get('status', 'unknown')
+    return (
+        f"| {control_id} | {get('name', '')} | {_STATUS_EMOJI.get(status, '❓')} {status} "
+        f"| {get('score', 0)} | {get('findings_count', 0)} |\n"
+    )
+
+# LLM insight lists rendered in the Markdown report: key, heading, list marker
+_ANALYSIS_LISTS = (
+    ('critical_risks', 'Critical Risks', '-'),
+    ('compliance_gaps', 'Compliance Gaps', '-'),
+    ('top_actions', 'Recommended Actions', '1.')
+)
+
+def _recommendation_markdown(index: int, rec: Dict) -> str:
+    """Format one top recommendation as a Markdown block."""
+    get = rec.get
+    return (
+        f"### {index}. {get('issue', 'Issue')}\n\n"
+        f"**Priority:** {get('priority', 'medium').upper()}  \n"
+        f"**Control:** {get('control', 'N/A')}  \n"
+        f"**File:** `{get('file', 'N/A')}`  \n\n"
+        f"**Action:** {get('action', 'Review and remediate')}\n\n"
+    )
+
+def _finding_markdown(finding: Dict) -> str:
+    """Format one detailed finding as a Markdown block."""
+    get = finding.get
+    recommendation = get('recommendation')
+    return (
+        f"**{get('type', 'Issue').replace('_', ' ').title()}**  \n"
+        f"📁 File: `{get('file', 'N/A')}`  \n"
+        f"📍 Line: {get('line', 'N/A')}  \n"
+        f"🎯 Control: {get('control', 'N/A')}  \n"
+        f"💬 {get('message', 'No message')}  \n"
+        + (f"💡 *Recommendation:* {recommendation}  \n" if recommendation else "")
+        + "\n---\n\n"
+    )
+
+def prepare_findings_by_severity(findings: List[Dict]) -> Dict[str, List[Dict]]:
+    """
+    Group findings by severity with their display fields precomputed.
+    
+    Args:
+        findings: All findings from scanners
+        
+    Returns:
+        Severity -> display rows (first DETAIL_FINDINGS_PER_SEVERITY of each),
+        in display order and omitting empty severities
+    """
+    grouped: Dict[str, List[Dict]] = {severity: [] for severity in SEVERITIES}
+    
+    for finding in findings:
+        get = finding.get
+        rows = grouped.get(get('severity', 'info'))
+        if rows is None or len(rows) >= DETAIL_FINDINGS_PER_SEVERITY:
+            continue
+        rows.append({
+            'type_display': get('type', 'Unknown').replace('_', ' ').title(),
+            'file_line': f"{get('file', 'N/A')}:{get('line', 'N/A')}",
+            'control': get('control', 'N/A'),
+            'message': get('message', 'No message'),
+            'recommendation': get('recommendation')
+        })
+    
+    return {severity: rows for severity, rows in grouped.items() if rows}
+
 class ReportGenerator:
     """Generate compliance reports in JSON and Markdown formats."""
     
-    def __init__(self, output_dir: str = "./reports"):
+    def __init__(self, output_dir: str = "./reports", fast_write: bool = True):
         """
         Initialize report generator.
         
         Args:
             output_dir: Directory to save reports
+            fast_write: Skip the fsync before report files are swapped into place
+                (reports can be regenerated); False flushes each file to disk
         """
         self.output_dir = Path(output_dir)
+        self.fast_write = fast_write
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Content hashes of saved JSON reports, used as HTTP ETags
+        self._etags: Dict[str, str] = {}
+        # Digest of the inputs each report was last generated from
+        self._input_digests: Dict[str, bytes] = {}
+        
+        # Report summaries keyed by JSON file name, refreshed when the directory changes
+        self._summary_index: Dict[str, Dict] = {}
+        self._index_mtime_ns: Optional[int] = None
+        # Newest-first listing built from the index, reset whenever it changes
+        self._sorted_summaries: Optional[List[Dict]] = None
+        # Reports are listed from worker threads while scans add to the index
+        self._index_lock = threading.Lock()
     
     def generate_report(self, 
                        job_id: str,
                        findings: List[Dict],
                        analysis: Dict,
                        scoring: Dict,
-                       metadata: Dict) -> Dict:
+                       metadata: Dict,
+                       emit_json: bool = True,
+                       emit_markdown: bool = True) -> Dict:
         """
         Generate comprehensive compliance report.
         
@@ -32,10 +138,29 @@ class ReportGenerator:
             analysis: LLM analysis results
             scoring: Scoring metrics
             metadata: Scan metadata (repo, timestamp, etc.)
+            emit_json: Save the JSON report (without it the report cannot be
+                loaded or listed later)
+            emit_markdown: Save the Markdown report
             
         Returns:
-            Report data dictionary
+            Report data dictionary; report_files maps skipped formats to None
         """
+        json_path = self.output_dir / f"{job_id}_report.json"
+        md_path = self.output_dir / f"{job_id}_report.md"
+        
+        # Regenerating from identical inputs would rewrite the same files
+        digest = self._digest_inputs(findings, analysis, scoring, metadata)
+        if (emit_json and self._input_digests.get(job_id) == digest
+                and (not emit_markdown or md_path.exists())):
+            report = self.load_report(job_id)
+            if report is not None:
+                logger.info(f"Report for job {job_id} is up to date")
+                report['report_files'] = {
+                    'json': str(json_path),
+                    'markdown': str(md_path) if emit_markdown else None
+                }
+                return report
+        
         logger.info(f"Generating report for job {job_id}")
         
         report = {
@@ -51,45 +176,145 @@ class ReportGenerator:
             'score': scoring,
             'controls': analysis.get('control_coverage', {}),
             'findings': findings,
+            'findings_by_severity': prepare_findings_by_severity(findings),
             'analysis': analysis.get('llm_insights', {}),
             'recommendations': analysis.get('recommendations', [])
         }
         
         # Save JSON report
-        json_path = self._save_json(job_id, report)
-        logger.info(f"JSON report saved: {json_path}")
+        if emit_json:
+            json_path = self._save_json(job_id, report)
+            logger.info(f"JSON report saved: {json_path}")
+            summary = self._summarize(report)
+            self._save_summary(json_path, summary)
+            with self._index_lock:
+                self._summary_index[json_path.name] = summary
+                self._sorted_summaries = None
         
         # Save Markdown report
-        md_path = self._save_markdown(job_id, report)
-        logger.info(f"Markdown report saved: {md_path}")
+        if emit_markdown:
+            md_path = self._save_markdown(job_id, report)
+            logger.info(f"Markdown report saved: {md_path}")
+        
+        # Only a saved JSON report can be returned in place of regenerating
+        if emit_json:
+            self._input_digests[job_id] = digest
         
         report['report_files'] = {
-            'json': str(json_path),
-            'markdown': str(md_path)
+            'json': str(json_path) if emit_json else None,
+            'markdown': str(md_path) if emit_markdown else None
         }
         
         return report
     
+    @staticmethod
+    def _digest_inputs(findings: List[Dict], analysis: Dict, scoring: Dict, metadata: Dict) -> bytes:
+        """Hash report inputs in canonical (sorted-key) form."""
+        return hashlib.blake2b(orjson.dumps(
+            [findings, analysis, scoring, metadata],
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        )).digest()
+    
     def _save_json(self, job_id: str, report: Dict) -> Path:
         """Save report as JSON."""
         file_path = self.output_dir / f"{job_id}_report.json"
+        content = orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
         
-        with open(file_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        self._write_file(file_path, content)
+        
+        # Reports are immutable once written, so the hash stays valid
+        self._etags[job_id] = self._compute_etag(content)
         
         return file_path
     
+    @staticmethod
+    def _summary_path(json_path: Path) -> Path:
+        """Path of the list-view summary stored next to a JSON report."""
+        return json_path.with_suffix('.index.json')
+    
+    def _save_summary(self, json_path: Path, summary: Dict):
+        """Save the list-view summary of a report so listing need not parse the report."""
+        self._write_file(self._summary_path(json_path), orjson.dumps(summary))
+    
+    def _read_summary(self, json_path: Path) -> Dict:
+        """Read a report's summary, falling back to the full report for older reports."""
+        try:
+            return orjson.loads(self._summary_path(json_path).read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return self._summarize(orjson.loads(json_path.read_bytes()))
+    
+    @staticmethod
+    def _compute_etag(content: bytes) -> str:
+        """Build a strong HTTP ETag from report content."""
+        return f'"{hashlib.sha256(content).hexdigest()}"'
+    
+    def get_report_etag(self, job_id: str) -> Optional[str]:
+        """
+        Get the ETag for a saved report.
+        
+        Args:
+            job_id: Report identifier
+            
+        Returns:
+            Quoted ETag string, or None if the report does not exist
+        """
+        etag = self._etags.get(job_id)
+        if etag is not None:
+            return etag
+        
+        file_path = self.output_dir / f"{job_id}_report.json"
+        try:
+            etag = self._compute_etag(file_path.read_bytes())
+        except OSError:
+            return None
+        
+        self._etags[job_id] = etag
+        return etag
+    
     def _save_markdown(self, job_id: str, report: Dict) -> Path:
         """Save report as Markdown."""
         file_path = self.output_dir / f"{job_id}_report.md"
         
         md_content = self._generate_markdown(report)
         
-        with open(file_path, 'w') as f:
-            f.write(md_content)
+        # Encode once and hand the whole report to a single write
+        self._write_file(file_path, md_content.encode('utf-8'))
         
         return file_path
     
+    def _write_file(self, file_path: Path, content: bytes):
+        """
+        Write a report file in one go and swap it into place atomically.
+        
+        Readers (report loads, ETags, listings) see either the old file or
+        the complete new one, never a truncated file.
+        
+        Args:
+            file_path: Destination path (replaced if it exists)
+            content: Complete file content
+        """
+        # Same directory so the rename stays on one filesystem; the name does
+        # not match the *_report.json listing glob
+        tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        # Unbuffered: the bytes go straight to write(2), usually in one call
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            try:
+                view = memoryview(content)
+                while view:
+                    view = view[os.write(fd, view):]
+                if not self.fast_write:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    
     def _generate_markdown(self, report: Dict) -> str:
         """Generate Markdown content for report."""
         summary = report.get('summary', {})
@@ -100,7 +325,7 @@ class ReportGenerator:
         recommendations = report.get('recommendations', [])
         metadata = report.get('metadata', {})
         
-        md = f"""# SOC 2 Compliance Report
+        parts = [f"""# SOC 2 Compliance Report
 
 **Report ID:** {report.get('id', 'N/A')}  
 **Generated:** {report.get('generated_at', 'N/A')}  
@@ -124,101 +349,66 @@ class ReportGenerator:
 
 ## Severity Distribution
 
-"""
+"""]
         
         severity_impact = score.get('severity_impact', {})
         severity_counts = severity_impact.get('counts', {})
         
-        for severity in ['critical', 'high', 'medium', 'low', 'info']:
-            count = severity_counts.get(severity, 0)
-            md += f"- **{severity.upper()}:** {count}\n"
+        parts.append(''.join(
+            f"- **{severity.upper()}:** {severity_counts.get(severity, 0)}\n"
+            for severity in SEVERITIES
+        ))
         
-        md += "\n---\n\n## SOC 2 Control Coverage\n\n"
+        parts.append("\n---\n\n## SOC 2 Control Coverage\n\n")
         
         # Control coverage table
-        md += "| Control | Name | Status | Score | Findings |\n"
-        md += "|---------|------|--------|-------|----------|\n"
-        
-        for control_id, control_data in sorted(controls.items()):
-            status = control_data.get('status', 'unknown')
-            status_emoji = {
-                'compliant': '✅',
-                'partial': '⚠️',
-                'non_compliant': '❌',
-                'unknown': '❓'
-            }.get(status, '❓')
-            
-            md += f"| {control_id} | {control_data.get('name', '')} | {status_emoji} {status} | {control_data.get('score', 0)} | {control_data.get('findings_count', 0)} |\n"
-        
-        md += "\n---\n\n## Top Recommendations\n\n"
-        
-        for i, rec in enumerate(recommendations[:10], 1):
-            md += f"### {i}. {rec.get('issue', 'Issue')}\n\n"
-            md += f"**Priority:** {rec.get('priority', 'medium').upper()}  \n"
-            md += f"**Control:** {rec.get('control', 'N/A')}  \n"
-            md += f"**File:** `{rec.get('file', 'N/A')}`  \n\n"
-            md += f"**Action:** {rec.get('action', 'Review and remediate')}\n\n"
-        
-        md += "---\n\n## LLM Analysis\n\n"
-        
-        # Critical risks
-        critical_risks = analysis.get('critical_risks', [])
-        if critical_risks and isinstance(critical_risks, list):
-            md += "### Critical Risks\n\n"
-            for risk in critical_risks:
-                md += f"- {risk}\n"
-            md += "\n"
-        
-        # Compliance gaps
-        compliance_gaps = analysis.get('compliance_gaps', [])
-        if compliance_gaps and isinstance(compliance_gaps, list):
-            md += "### Compliance Gaps\n\n"
-            for gap in compliance_gaps:
-                md += f"- {gap}\n"
-            md += "\n"
-        
-        # Top actions
-        top_actions = analysis.get('top_actions', [])
-        if top_actions and isinstance(top_actions, list):
-            md += "### Recommended Actions\n\n"
-            for action in top_actions:
-                md += f"1. {action}\n"
-            md += "\n"
-        
-        md += "---\n\n## Detailed Findings\n\n"
+        parts.append("| Control | Name | Status | Score | Findings |\n")
+        parts.append("|---------|------|--------|-------|----------|\n")
+        
+        parts.append(''.join(
+            _control_row(control_id, control_data)
+            for control_id, control_data in sorted(controls.items())
+        ))
+        
+        parts.append("\n---\n\n## Top Recommendations\n\n")
+        
+        parts.append(''.join(
+            _recommendation_markdown(i, rec) for i, rec in enumerate(recommendations[:10], 1)
+        ))
+        
+        parts.append("---\n\n## LLM Analysis\n\n")
+        
+        # Critical risks, compliance gaps and top actions
+        for key, heading, marker in _ANALYSIS_LISTS:
+            items = analysis.get(key, [])
+            if items and isinstance(items, list):
+                parts.append(f"### {heading}\n\n")
+                parts.append(''.join(f"{marker} {item}\n" for item in items))
+                parts.append("\n")
+        
+        parts.append("---\n\n## Detailed Findings\n\n")
         
         # Group findings by severity
-        findings_by_severity = {}
+        findings_by_severity = defaultdict(list)
         for finding in findings:
-            severity = finding.get('severity', 'info')
-            if severity not in findings_by_severity:
-                findings_by_severity[severity] = []
-            findings_by_severity[severity].append(finding)
+            findings_by_severity[finding.get('severity', 'info')].append(finding)
         
-        for severity in ['critical', 'high', 'medium', 'low', 'info']:
+        for severity in SEVERITIES:
             if severity in findings_by_severity:
-                md += f"### {severity.upper()} Severity\n\n"
-                
-                for finding in findings_by_severity[severity][:20]:  # Limit to 20 per severity
-                    md += f"**{finding.get('type', 'Issue').replace('_', ' ').title()}**  \n"
-                    md += f"📁 File: `{finding.get('file', 'N/A')}`  \n"
-                    md += f"📍 Line: {finding.get('line', 'N/A')}  \n"
-                    md += f"🎯 Control: {finding.get('control', 'N/A')}  \n"
-                    md += f"💬 {finding.get('message', 'No message')}  \n"
-                    
-                    if finding.get('recommendation'):
-                        md += f"💡 *Recommendation:* {finding.get('recommendation')}  \n"
-                    
-                    md += "\n---\n\n"
-        
-        md += "## Conclusion\n\n"
-        md += f"This report analyzed {len(findings)} findings across {score.get('controls_total', 0)} SOC 2 controls. "
-        md += f"The repository achieved a readiness score of {summary.get('readiness_score', 0)}/100. "
-        md += "Address the critical and high-priority findings first to improve your security posture.\n\n"
-        md += "---\n\n"
-        md += "*Generated by CompliantByDefault - SOC 2 Readiness Agent*\n"
-        
-        return md
+                parts.append(f"### {severity.upper()} Severity\n\n")
+                parts.append(''.join(
+                    _finding_markdown(finding)
+                    for finding in findings_by_severity[severity][:DETAIL_FINDINGS_PER_SEVERITY]
+                ))
+        
+        parts.append("## Conclusion\n\n")
+        parts.append(f"This report analyzed {len(findings)} findings across {score.get('controls_total', 0)} SOC 2 controls. ")
+        parts.append(f"The repository achieved a readiness score of {summary.get('readiness_score', 0)}/100. ")
+        parts.append("Address the critical and high-priority findings first to improve your security posture.\n\n")
+        parts.append("---\n\n")
+        parts.append("*Generated by CompliantByDefault - SOC 2 Readiness Agent*\n")
+        
+        return ''.join(parts)
     
     def load_report(self, job_id: str) -> Optional[Dict]:
         """
@@ -237,8 +427,7 @@ class ReportGenerator:
             return None
         
         try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
+            return orjson.loads(file_path.read_bytes())
         except Exception as e:
             logger.error(f"Error loading report: {e}")
             return None
@@ -247,23 +436,57 @@ class ReportGenerator:
         """
         List all available reports.
         
+        The returned list is cached until a report is added or removed and is
+        shared between callers, so it must not be mutated.
+        
         Returns:
-            List of report summaries
+            List of report summaries, newest first
         """
-        reports = []
+        with self._index_lock:
+            self._refresh_summary_index()
+            if self._sorted_summaries is None:
+                self._sorted_summaries = sorted(
+                    self._summary_index.values(),
+                    key=lambda x: x.get('generated_at') or '',
+                    reverse=True
+                )
+            return self._sorted_summaries
+    
+    def _refresh_summary_index(self):
+        """Sync the summary index with the reports directory, reading only new files."""
+        try:
+            mtime_ns = self.output_dir.stat().st_mtime_ns
+        except OSError:
+            return
+        
+        # Directory unchanged since the last sync: the index is current
+        if mtime_ns == self._index_mtime_ns:
+            return
         
+        present = set()
         for json_file in self.output_dir.glob("*_report.json"):
+            present.add(json_file.name)
+            if json_file.name in self._summary_index:
+                continue
             try:
-                with open(json_file, 'r') as f:
-                    data = json.load(f)
-                    reports.append({
-                        'id': data.get('id'),
-                        'generated_at': data.get('generated_at'),
-                        'score': data.get('summary', {}).get('readiness_score'),
-                        'findings': data.get('summary', {}).get('total_findings'),
-                        'repository': data.get('metadata', {}).get('repository', 'Unknown')
-                    })
+                self._summary_index[json_file.name] = self._read_summary(json_file)
             except Exception as e:
                 logger.error(f"Error reading report {json_file}: {e}")
         
-        return sorted(reports, key=lambda x: x.get('generated_at', ''), reverse=True)
+        # Forget reports that were deleted from disk
+        for name in self._summary_index.keys() - present:
+            del self._summary_index[name]
+        
+        self._index_mtime_ns = mtime_ns
+        self._sorted_summaries = None
+    
+    @staticmethod
+    def _summarize(data: Dict) -> Dict:
+        """Build the list-view summary of a report."""
+        return {
+            'id': data.get('id'),
+            'generated_at': data.get('generated_at'),
+            'score': data.get('summary', {}).get('readiness_score'),
+            'findings': data.get('summary', {}).get('total_findings'),
+            'repository': data.get('metadata', {}).get('repository', 'Unknown')
+        }
@@ -0,0 +1,161 @@
+import os
+import hashlib
+import orjson
+from pathlib import Path
+from typing import List, Dict, Optional
+from ..utils.logger import logger
+from ..utils.config_loader import load_config
+from ..utils.file_loader import FileLoader, FileIndex
+from ..utils.github_url import GitHubURLConverter
+from ..utils.scan_cache import ScanCache, create_scan_cache
+from .secret_scanner import SecretScanner
+from .static_scanner import StaticScanner
+from .dependency_scanner import DependencyScanner
+from .iac_scanner import IaCScanner
+
+# Bump whenever scanner code changes what a file's findings are, so cached
+# findings from older scanners are not reused
+SCAN_CACHE_VERSION = 3
+
+class CombinedScanner:
+    """Runs several scanners over one pass of the files, reading each file once."""
+    
+    def __init__(self, scanners: Optional[Dict[str, object]] = None, use_cache: bool = False):
+        """
+        Initialize the combined scanner.
+        
+        Args:
+            scanners: Scanners by name, in report order (defaults to the
+                secret, static, dependency and IaC scanners)
+            use_cache: Reuse findings of files scanned before with the same
+                path and content (see utils.scan_cache); assumes the scanners
+                use the default config
+        """
+        self.cache: Optional[ScanCache] = None
+        if use_cache:
+            self.cache = create_scan_cache(self._cache_namespace(scanners))
+        
+        if scanners is None:
+            scanners = {
+                'secret': SecretScanner(),
+                'static': StaticScanner(),
+                'dependency': DependencyScanner(),
+                'iac': IaCScanner()
+            }
+        self.scanners = scanners
+    
+    @staticmethod
+    def _cache_namespace(scanners: Optional[Dict[str, object]]) -> str:
+        """Version of the scanners and config, under which cached findings are valid."""
+        names = list(scanners) if scanners is not None else []
+        version = orjson.dumps(
+            [SCAN_CACHE_VERSION, names, load_config()],
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        )
+        return hashlib.blake2b(version, digest_size=8).hexdigest()
+    
+    def _scan_file(self, file_path: Path, content: str, accepting: List[str], root: str) -> Dict[str, List[Dict]]:
+        """
+        Scan one file with the scanners that accept it, reusing cached findings.
+        
+        Args:
+            file_path: Path to the file
+            content: File content
+            accepting: Names of the scanners that accept the file
+            root: Root directory of the scan
+            
+        Returns:
+            Findings of each accepting scanner by scanner name
+        """
+        if self.cache is None:
+            return {name: self.scanners[name].scan_file(file_path, content) for name in accepting}
+        
+        # Findings name their file; cache entries leave it out so they stay
+        # valid wherever the repository is checked out
+        file_name = str(file_path)
+        cache_key = self.cache.key(os.path.relpath(file_name, root), content)
+        cached = self.cache.get(cache_key)
+        if cached is not None and all(name in cached for name in accepting):
+            return {
+                name: [
+                    {**finding, 'file': file_name} if finding.get('file', '') is None else finding
+                    for finding in cached[name]
+                ]
+                for name in accepting
+            }
+        
+        file_findings = {name: self.scanners[name].scan_file(file_path, content) for name in accepting}
+        if not any(file_findings.values()):
+            return file_findings
+        self.cache.put(cache_key, {
+            name: [
+                {**finding, 'file': None} if finding.get('file') == file_name else finding
+                for finding in findings
+            ]
+            for name, findings in file_findings.items()
+        })
+        return file_findings
+    
+    def scan_directory(self, root_path: str, repo_url: Optional[str] = None, local_base_path: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """
+        Scan a directory with every scanner.
+        
+        Args:
+            root_path: Root directory to scan
+            repo_url: GitHub repository URL (optional)
+            local_base_path: Base path of cloned repository (optional)
+            
+        Returns:
+            Findings of each scanner by scanner name
+        """
+        return self.scan_files(FileIndex.build(root_path), repo_url, local_base_path)
+    
+    def scan_files(self, index: FileIndex, repo_url: Optional[str] = None, local_base_path: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """
+        Scan indexed files with every scanner that accepts them.
+        
+        Each file is read once and its content handed to the accepting
+        scanners, in the same order as their own scan_files would visit it.
+        
+        Args:
+            index: Files walked once for all scanners
+            repo_url: GitHub repository URL (optional)
+            local_base_path: Base path of cloned repository (optional)
+            
+        Returns:
+            Findings of each scanner by scanner name
+        """
+        logger.info(f"Starting combined scan of {len(index.files)} files...")
+        all_findings = {name: [] for name in self.scanners}
+        
+        for file_path in index.files:
+            accepting = [name for name, scanner in self.scanners.items() if scanner.accepts(file_path)]
+            if not accepting:
+                continue
+            
+            content = FileLoader.read_file(file_path)
+            if not content:
+                continue
+            
+            for name, findings in self._scan_file(file_path, content, accepting, index.root).items():
+                # Convert file paths to GitHub URLs if applicable (updates findings in place)
+                if repo_url and local_base_path:
+                    for finding in findings:
+                        GitHubURLConverter.update_finding_with_github_url(
+                            finding, repo_url, local_base_path
+                        )
+                
+                all_findings[name].extend(findings)
+        
+        # Scanners with a second pass (static validation) review their findings
+        for name, scanner in self.scanners.items():
+            review_findings = getattr(scanner, 'review_findings', None)
+            if review_findings is not None:
+                all_findings[name] = review_findings(all_findings[name], index.root)
+        
+        logger.info(
+            "Combined scan complete. Found "
+            + ", ".join(f"{len(findings)} {name}" for name, findings in all_findings.items())
+            + " issues"
+        )
+        return all_findings
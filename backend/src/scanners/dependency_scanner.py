@@ -1,9 +1,18 @@
 import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Set, Optional
 import re
+import sys
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
 from ..utils.logger import logger
-from ..utils.file_loader import FileLoader
+from ..utils.file_loader import FileLoader, FileIndex
 from ..utils.github_url import GitHubURLConverter
 
 class DependencyScanner:
@@ -23,6 +32,9 @@ class DependencyScanner:
         'Cargo.toml': 'rust'
     }
     
+    # Manifest file names, for the per-file membership test
+    _DEPENDENCY_NAMES = frozenset(DEPENDENCY_FILES)
+    
     # Known vulnerable patterns (simplified - in production use CVE databases)
     KNOWN_VULNERABILITIES = {
         'python': {
@@ -40,6 +52,23 @@ class DependencyScanner:
         }
     }
     
+    # Known vulnerabilities of Python and npm packages
+    _PYTHON_VULNERABILITIES = KNOWN_VULNERABILITIES['python']
+    _JAVASCRIPT_VULNERABILITIES = KNOWN_VULNERABILITIES['javascript']
+    
+    # Version operator and version of a Pipfile package spec ("*" has neither)
+    _PIPFILE_SPEC_PATTERN = re.compile(r'([=<>!~]+)?\s*(.*)')
+    
+    # Threads reading dependency files concurrently
+    READ_WORKERS = 8
+    
+    # Package name, optional version operator and the rest of a requirements.txt line
+    _REQUIREMENT_PATTERN = re.compile(r'([a-zA-Z0-9_-]+)([=<>!]+)?(.*)')
+    
+    def accepts(self, file_path: Path) -> bool:
+        """Whether a file is a dependency manifest."""
+        return file_path.name in self._DEPENDENCY_NAMES
+    
     def scan_file(self, file_path: Path, content: str) -> List[Dict]:
         """
         Scan a dependency file for security issues.
@@ -51,121 +80,226 @@ class DependencyScanner:
         Returns:
             List of findings
         """
-        findings = []
         file_type = self.DEPENDENCY_FILES.get(file_path.name)
         
         if not file_type:
-            return findings
+            return []
         
-        logger.info(f"Scanning dependency file: {file_path}")
+        logger.info("Scanning dependency file: %s", file_path)
         
+        # Each parser builds the file's findings list; return it as is
         if file_path.name == 'requirements.txt':
-            findings.extend(self._scan_requirements_txt(file_path, content))
+            return self._scan_requirements_txt(file_path, content)
         elif file_path.name == 'package.json':
-            findings.extend(self._scan_package_json(file_path, content))
+            return self._scan_package_json(file_path, content)
         elif file_path.name == 'Pipfile':
-            findings.extend(self._scan_pipfile(file_path, content))
+            return self._scan_pipfile(file_path, content)
         
-        return findings
+        return []
     
     def _scan_requirements_txt(self, file_path: Path, content: str) -> List[Dict]:
         """Scan Python requirements.txt file."""
-        findings = []
-        lines = content.split('\n')
+        file_name = str(file_path)
+        match_requirement = self._REQUIREMENT_PATTERN.match
+        vulnerabilities = self._PYTHON_VULNERABILITIES
         
-        for line_num, line in enumerate(lines, 1):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
+        # Parse package and version of every requirement line once
+        requirements = [
+            (line_num, match)
+            for line_num, line in enumerate(map(str.strip, content.split('\n')), 1)
+            if line and not line.startswith('#') and (match := match_requirement(line))
+        ]
+        
+        return [
+            finding
+            for line_num, match in requirements
+            for finding in self._check_python_package(
+                file_name,
+                line_num,
+                sys.intern(match.group(1).lower()),
+                match.group(2) or '',
+                match.group(3).strip(),
+                vulnerabilities
+            )
+        ]
+    
+    @staticmethod
+    def _check_python_package(file_name: str, line_num: int, package: str, operator: str,
+                              version: str, vulnerabilities: Dict) -> List[Dict]:
+        """
+        Check one Python dependency for a missing pin and known vulnerabilities.
+        
+        Args:
+            file_name: Manifest the dependency is declared in
+            line_num: Line of the declaration
+            package: Lower-cased package name
+            operator: Version operator ('' when unconstrained)
+            version: Version after the operator
+            vulnerabilities: Known vulnerabilities by package name
             
-            # Parse package and version
-            match = re.match(r'([a-zA-Z0-9_-]+)([=<>!]+)?(.*)', line)
-            if match:
-                package = match.group(1).lower()
-                operator = match.group(2) or ''
-                version = match.group(3).strip()
-                
-                # Check for pinned versions
-                if not operator or operator != '==':
-                    findings.append({
-                        'type': 'unpinned_dependency',
-                        'severity': 'medium',
-                        'file': str(file_path),
-                        'line': line_num,
-                        'message': f'Dependency {package} is not pinned to a specific version',
-                        'control': 'CC3',
-                        'package': package,
-                        'recommendation': 'Pin dependencies to specific versions for reproducible builds'
-                    })
-                
-                # Check for known vulnerabilities
-                if package in self.KNOWN_VULNERABILITIES.get('python', {}):
-                    vuln_info = self.KNOWN_VULNERABILITIES['python'][package]
-                    findings.append({
-                        'type': 'vulnerable_dependency',
-                        'severity': 'high',
-                        'file': str(file_path),
-                        'line': line_num,
-                        'message': f'Package {package} has known vulnerabilities',
-                        'control': 'CC3',
-                        'package': package,
-                        'version': version,
-                        'vulnerability': str(vuln_info),
-                        'recommendation': 'Update to the latest secure version'
-                    })
+        Returns:
+            List of findings
+        """
+        findings = []
+        
+        # Check for pinned versions
+        if operator != '==':
+            findings.append({
+                'type': 'unpinned_dependency',
+                'severity': 'medium',
+                'file': file_name,
+                'line': line_num,
+                'message': f'Dependency {package} is not pinned to a specific version',
+                'control': 'CC3',
+                'package': package,
+                'recommendation': 'Pin dependencies to specific versions for reproducible builds'
+            })
+        
+        # Check for known vulnerabilities
+        vuln_info = vulnerabilities.get(package)
+        if vuln_info is not None:
+            findings.append({
+                'type': 'vulnerable_dependency',
+                'severity': 'high',
+                'file': file_name,
+                'line': line_num,
+                'message': f'Package {package} has known vulnerabilities',
+                'control': 'CC3',
+                'package': package,
+                'version': version,
+                'vulnerability': str(vuln_info),
+                'recommendation': 'Update to the latest secure version'
+            })
         
         return findings
     
     def _scan_package_json(self, file_path: Path, content: str) -> List[Dict]:
         """Scan Node.js package.json file."""
-        findings = []
+        file_name = str(file_path)
         
         try:
             data = json.loads(content)
-            dependencies = {**data.get('dependencies', {}), **data.get('devDependencies', {})}
-            
-            for package, version in dependencies.items():
-                package_lower = package.lower()
-                
-                # Check for loose version constraints
-                if version.startswith('^') or version.startswith('~') or version == '*':
-                    findings.append({
-                        'type': 'loose_version_constraint',
-                        'severity': 'medium',
-                        'file': str(file_path),
-                        'line': 0,
-                        'message': f'Package {package} uses loose version constraint: {version}',
-                        'control': 'CC3',
-                        'package': package,
-                        'version': version,
-                        'recommendation': 'Use exact versions or lock files for reproducibility'
-                    })
-                
-                # Check for known vulnerabilities
-                if package_lower in self.KNOWN_VULNERABILITIES.get('javascript', {}):
-                    vuln_info = self.KNOWN_VULNERABILITIES['javascript'][package_lower]
-                    findings.append({
-                        'type': 'vulnerable_dependency',
-                        'severity': 'high',
-                        'file': str(file_path),
-                        'line': 0,
-                        'message': f'Package {package} has known vulnerabilities',
-                        'control': 'CC3',
-                        'package': package,
-                        'version': version,
-                        'vulnerability': str(vuln_info),
-                        'recommendation': 'Update to the latest secure version'
-                    })
-        
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing {file_path}: {e}")
+            return []
+        
+        dependencies = {**data.get('dependencies', {}), **data.get('devDependencies', {})}
+        
+        return [
+            finding
+            for package, version in dependencies.items()
+            for finding in self._check_javascript_package(file_name, package, version)
+        ]
+    
+    @staticmethod
+    def _check_javascript_package(file_name: str, package: str, version: str) -> List[Dict]:
+        """
+        Check one npm dependency for a loose constraint and known vulnerabilities.
+        
+        Args:
+            file_name: Manifest the dependency is declared in
+            package: Package name as declared
+            version: Version constraint
+            
+        Returns:
+            List of findings
+        """
+        findings = []
+        
+        # Check for loose version constraints
+        if version.startswith('^') or version.startswith('~') or version == '*':
+            findings.append({
+                'type': 'loose_version_constraint',
+                'severity': 'medium',
+                'file': file_name,
+                'line': 0,
+                'message': f'Package {package} uses loose version constraint: {version}',
+                'control': 'CC3',
+                'package': package,
+                'version': version,
+                'recommendation': 'Use exact versions or lock files for reproducibility'
+            })
+        
+        # Check for known vulnerabilities
+        vuln_info = DependencyScanner._JAVASCRIPT_VULNERABILITIES.get(package.lower())
+        if vuln_info is not None:
+            findings.append({
+                'type': 'vulnerable_dependency',
+                'severity': 'high',
+                'file': file_name,
+                'line': 0,
+                'message': f'Package {package} has known vulnerabilities',
+                'control': 'CC3',
+                'package': package,
+                'version': version,
+                'vulnerability': str(vuln_info),
+                'recommendation': 'Update to the latest secure version'
+            })
         
         return findings
     
     def _scan_pipfile(self, file_path: Path, content: str) -> List[Dict]:
         """Scan Python Pipfile."""
+        if tomllib is None:
+            return self._scan_pipfile_lines(file_path, content)
+        
         findings = []
-        # Simplified - would use toml parser in production
+        file_name = str(file_path)
+        
+        try:
+            data = tomllib.loads(content)
+        except tomllib.TOMLDecodeError as e:
+            logger.error(f"Error parsing {file_path}: {e}")
+            return findings
+        
+        # TOML values carry no positions; map each key to the line that declares
+        # it within its [section], so equal keys in other sections do not match
+        key_lines = defaultdict(dict)
+        section_lines = None
+        for line_num, line in enumerate(content.split('\n'), 1):
+            stripped = line.strip()
+            if stripped.startswith('['):
+                header = stripped.strip('[]').strip()
+                section, _, package = header.partition('.')
+                section_lines = key_lines[section.strip().strip('"\'')]
+                if package:
+                    # [packages.name] tables declare the package on the header line
+                    section_lines.setdefault(package.strip().strip('"\''), line_num)
+                    section_lines = None
+                continue
+            key, sep, _ = line.partition('=')
+            if sep and section_lines is not None:
+                section_lines.setdefault(key.strip().strip('"\''), line_num)
+        
+        match_spec = self._PIPFILE_SPEC_PATTERN.match
+        for section in ('packages', 'dev-packages'):
+            packages = data.get(section, {})
+            if not isinstance(packages, dict):
+                continue
+            package_lines = key_lines.get(section, {})
+            
+            for package, spec in packages.items():
+                # Specs are "*", "==1.0" or tables such as {version = ">=1.0", extras = [...]}
+                if isinstance(spec, dict):
+                    spec = spec.get('version', '*')
+                if not isinstance(spec, str):
+                    spec = '*'
+                match = match_spec(spec.strip())
+                findings.extend(self._check_python_package(
+                    file_name,
+                    package_lines.get(package, 0),
+                    sys.intern(package.lower()),
+                    match.group(1) or '',
+                    match.group(2),
+                    self._PYTHON_VULNERABILITIES
+                ))
+        
+        return findings
+    
+    def _scan_pipfile_lines(self, file_path: Path, content: str) -> List[Dict]:
+        """Flag every assignment in a Pipfile for review (Python < 3.11, without tomllib)."""
+        findings = []
+        file_name = str(file_path)
         lines = content.split('\n')
         
         for line_num, line in enumerate(lines, 1):
@@ -173,7 +307,7 @@ class DependencyScanner:
                 findings.append({
                     'type': 'dependency_check',
                     'severity': 'info',
-                    'file': str(file_path),
+                    'file': file_name,
                     'line': line_num,
                     'message': 'Review dependency for security updates',
                     'control': 'CC3',
@@ -191,30 +325,49 @@ class DependencyScanner:
             repo_url: GitHub repository URL (optional)
             local_base_path: Base path of cloned repository (optional)
             
+        Returns:
+            List of all findings
+        """
+        # Walking alone, only manifests need to be indexed
+        index = FileIndex.build(root_path, names=self._DEPENDENCY_NAMES)
+        return self.scan_files(index, repo_url, local_base_path)
+    
+    def scan_files(self, index: FileIndex, repo_url: Optional[str] = None, local_base_path: Optional[str] = None) -> List[Dict]:
+        """
+        Analyze the dependency files in an index.
+        
+        Args:
+            index: Files walked once for all scanners
+            repo_url: GitHub repository URL (optional)
+            local_base_path: Base path of cloned repository (optional)
+            
         Returns:
             List of all findings
         """
         logger.info("Starting dependency scan...")
         all_findings = []
         
-        files = FileLoader.get_all_files(root_path)
-        
-        for file_path in files:
-            if file_path.name in self.DEPENDENCY_FILES:
-                content = FileLoader.read_file(file_path)
-                if content:
-                    findings = self.scan_file(file_path, content)
-                    
-                    # Convert file paths to GitHub URLs if applicable
-                    if repo_url and local_base_path:
-                        findings = [
-                            GitHubURLConverter.update_finding_with_github_url(
-                                finding, repo_url, local_base_path
-                            )
-                            for finding in findings
-                        ]
-                    
-                    all_findings.extend(findings)
+        dependency_files = [file_path for file_path in index.files if self.accepts(file_path)]
+        
+        # Manifests are small and scanning them is cheap, so overlap the reads
+        if len(dependency_files) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.READ_WORKERS, len(dependency_files))) as executor:
+                contents = list(executor.map(FileLoader.read_file, dependency_files))
+        else:
+            contents = [FileLoader.read_file(file_path) for file_path in dependency_files]
+        
+        for file_path, content in zip(dependency_files, contents):
+            if content:
+                findings = self.scan_file(file_path, content)
+                
+                # Convert file paths to GitHub URLs if applicable (updates findings in place)
+                if repo_url and local_base_path:
+                    for finding in findings:
+                        GitHubURLConverter.update_finding_with_github_url(
+                            finding, repo_url, local_base_path
+                        )
+                
+                all_findings.extend(findings)
         
         logger.info(f"Dependency scan complete. Found {len(all_findings)} issues")
         return all_findings
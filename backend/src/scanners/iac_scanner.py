@@ -1,11 +1,21 @@
 import re
 import yaml
+from bisect import bisect_left
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional
 from ..utils.logger import logger
-from ..utils.file_loader import FileLoader
+from ..utils.config_loader import load_config
+from ..utils.file_loader import FileLoader, FileIndex
 from ..utils.github_url import GitHubURLConverter
 
+try:
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YAMLLoader
+
+_NEWLINE = re.compile('\n')
+
 class IaCScanner:
     """Scanner for Infrastructure as Code security issues."""
     
@@ -19,15 +29,76 @@ class IaCScanner:
         '.yml': 'kubernetes'
     }
     
+    # File type by suffix; YAML files are Kubernetes manifests only when
+    # their path or content says so
+    _SUFFIX_TYPES = {
+        '.tf': 'terraform',
+        '.tfvars': 'terraform',
+        '.yaml': 'yaml',
+        '.yml': 'yaml'
+    }
+    
+    # Manifests declare apiVersion and kind near the top, so look there first
+    _K8S_HEAD_SIZE = 512
+    
+    # Terraform checks, run over the whole file
+    _TF_CREDENTIALS_PATTERN = re.compile(r'(access_key|secret_key|password)\s*=\s*"[^"]{8,}"')
+    _TF_ENCRYPTED_PATTERN = re.compile(r'encrypted\s*=\s*true')
+    _TF_OPEN_CIDR_PATTERN = re.compile(r'cidr_blocks\s*=\s*\["0\.0\.0\.0/0"\]')
+    
+    # Secret-looking ARG/ENV instruction, checked per Dockerfile line
+    _DOCKER_SECRET_PATTERN = re.compile(r'(ARG|ENV)\s+(PASSWORD|SECRET|KEY|TOKEN)', re.IGNORECASE)
+    
+    # Text every Dockerfile line check needs: a root user, a :latest tag or a
+    # secret-looking ARG/ENV. Matches stay within a line, so one pass over the
+    # file finds every line worth checking.
+    _DOCKER_CANDIDATE_PATTERN = re.compile(
+        r'root|:latest|(?i:(?:ARG|ENV)[^\S\n]+(?:PASSWORD|SECRET|KEY|TOKEN))'
+    )
+    
     def __init__(self, config_path: Optional[str] = None):
         """Initialize IaC scanner."""
-        if config_path is None:
-            config_path = Path(__file__).parent.parent / "config" / "soc2_controls.yaml"
-        
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        # Parsed once per process and shared with the other components
+        config = load_config(config_path)
         
         self.config = config
+        
+        # Scan method per file type
+        self._handlers = {
+            'terraform': self._scan_terraform,
+            'docker': self._scan_dockerfile,
+            'docker_compose': self._scan_docker_compose,
+            'kubernetes': self._scan_kubernetes
+        }
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _file_type(name: str) -> Optional[str]:
+        """
+        Classify a file by name, once per distinct name.
+        
+        Args:
+            name: File name
+            
+        Returns:
+            'terraform', 'docker', 'docker_compose', 'yaml' or None
+        """
+        suffix_type = IaCScanner._SUFFIX_TYPES.get(Path(name).suffix)
+        if suffix_type == 'terraform':
+            return suffix_type
+        if 'Dockerfile' in name:
+            return 'docker'
+        if 'docker-compose' in name:
+            return 'docker_compose'
+        return suffix_type
+    
+    def accepts(self, file_path: Path) -> bool:
+        """Whether a file is infrastructure as code this scanner checks."""
+        file_type = self._file_type(file_path.name)
+        if file_type == 'yaml':
+            path = str(file_path)
+            return 'k8s' in path or 'kubernetes' in path
+        return file_type is not None
     
     def scan_file(self, file_path: Path, content: str) -> List[Dict]:
         """
@@ -40,39 +111,37 @@ class IaCScanner:
         Returns:
             List of findings
         """
-        findings = []
-        
         # Determine file type
-        file_type = None
-        if file_path.suffix in ['.tf', '.tfvars']:
-            file_type = 'terraform'
-        elif 'Dockerfile' in file_path.name:
-            file_type = 'docker'
-        elif 'docker-compose' in file_path.name:
-            file_type = 'docker_compose'
-        elif file_path.suffix in ['.yaml', '.yml']:
+        file_type = self._file_type(file_path.name)
+        if file_type == 'yaml':
             # Check if it's Kubernetes
-            if 'apiVersion' in content or 'kind:' in content:
-                file_type = 'kubernetes'
+            file_type = 'kubernetes' if self._is_kubernetes(content) else None
         
-        if file_type == 'terraform':
-            findings.extend(self._scan_terraform(file_path, content))
-        elif file_type == 'docker':
-            findings.extend(self._scan_dockerfile(file_path, content))
-        elif file_type == 'docker_compose':
-            findings.extend(self._scan_docker_compose(file_path, content))
-        elif file_type == 'kubernetes':
-            findings.extend(self._scan_kubernetes(file_path, content))
-        
-        return findings
+        handler = self._handlers.get(file_type)
+        if handler is None:
+            return []
+        return handler(file_path, content)
+    
+    def _is_kubernetes(self, content: str) -> bool:
+        """Whether YAML content looks like a Kubernetes manifest."""
+        head = content[:self._K8S_HEAD_SIZE]
+        if 'apiVersion' in head or 'kind:' in head:
+            return True
+        if len(content) <= self._K8S_HEAD_SIZE:
+            return False
+        # Markers may follow a long comment header or straddle the head's end
+        return 'apiVersion' in content or 'kind:' in content
     
     def _scan_terraform(self, file_path: Path, content: str) -> List[Dict]:
         """Scan Terraform files for security issues."""
         findings = []
-        lines = content.split('\n')
+        
+        # Each regex runs only when the text it needs is present; clean files
+        # are ruled out by substring scans alone
         
         # Check for hardcoded credentials
-        if re.search(r'(access_key|secret_key|password)\s*=\s*"[^"]{8,}"', content):
+        if (('access_key' in content or 'secret_key' in content or 'password' in content)
+                and self._TF_CREDENTIALS_PATTERN.search(content)):
             findings.append({
                 'type': 'hardcoded_credentials',
                 'severity': 'critical',
@@ -97,7 +166,7 @@ class IaCScanner:
         
         # Check for unencrypted storage
         if 'aws_db_instance' in content or 'aws_ebs_volume' in content:
-            if not re.search(r'encrypted\s*=\s*true', content):
+            if not self._TF_ENCRYPTED_PATTERN.search(content):
                 findings.append({
                     'type': 'unencrypted_storage',
                     'severity': 'high',
@@ -109,7 +178,7 @@ class IaCScanner:
                 })
         
         # Check for open security groups
-        if re.search(r'cidr_blocks\s*=\s*\["0\.0\.0\.0/0"\]', content):
+        if '0.0.0.0/0' in content and self._TF_OPEN_CIDR_PATTERN.search(content):
             findings.append({
                 'type': 'open_security_group',
                 'severity': 'high',
@@ -125,17 +194,28 @@ class IaCScanner:
     def _scan_dockerfile(self, file_path: Path, content: str) -> List[Dict]:
         """Scan Dockerfile for security issues."""
         findings = []
+        file_name = str(file_path)
         lines = content.split('\n')
         
-        for line_num, line in enumerate(lines, 1):
-            line_stripped = line.strip()
+        # Lines without any candidate text cannot trigger a check
+        newline_offsets = None
+        candidate_lines = []
+        for match in self._DOCKER_CANDIDATE_PATTERN.finditer(content):
+            if newline_offsets is None:
+                newline_offsets = [nl.start() for nl in _NEWLINE.finditer(content)]
+            line_num = bisect_left(newline_offsets, match.start()) + 1
+            if not candidate_lines or candidate_lines[-1] != line_num:
+                candidate_lines.append(line_num)
+        
+        for line_num in candidate_lines:
+            line_stripped = lines[line_num - 1].strip()
             
             # Check for running as root
             if line_stripped.upper().startswith('USER') and 'root' in line_stripped:
                 findings.append({
                     'type': 'running_as_root',
                     'severity': 'high',
-                    'file': str(file_path),
+                    'file': file_name,
                     'line': line_num,
                     'message': 'Container configured to run as root user',
                     'control': 'CC6',
@@ -147,7 +227,7 @@ class IaCScanner:
                 findings.append({
                     'type': 'latest_tag',
                     'severity': 'medium',
-                    'file': str(file_path),
+                    'file': file_name,
                     'line': line_num,
                     'message': 'Using :latest tag instead of specific version',
                     'control': 'CC8',
@@ -155,11 +235,11 @@ class IaCScanner:
                 })
             
             # Check for secrets in build
-            if re.search(r'(ARG|ENV)\s+(PASSWORD|SECRET|KEY|TOKEN)', line_stripped, re.IGNORECASE):
+            if self._DOCKER_SECRET_PATTERN.search(line_stripped):
                 findings.append({
                     'type': 'secret_in_dockerfile',
                     'severity': 'high',
-                    'file': str(file_path),
+                    'file': file_name,
                     'line': line_num,
                     'message': 'Potential secret in Dockerfile ARG/ENV',
                     'control': 'CC9',
@@ -167,11 +247,11 @@ class IaCScanner:
                 })
         
         # Check if USER directive exists
-        if not any('USER' in line for line in lines):
+        if 'USER' not in content:
             findings.append({
                 'type': 'no_user_directive',
                 'severity': 'high',
-                'file': str(file_path),
+                'file': file_name,
                 'line': 0,
                 'message': 'No USER directive found - container will run as root',
                 'control': 'CC6',
@@ -185,7 +265,7 @@ class IaCScanner:
         findings = []
         
         try:
-            data = yaml.safe_load(content)
+            data = yaml.load(content, Loader=_YAMLLoader)
             services = data.get('services', {})
             
             for service_name, service_config in services.items():
@@ -222,10 +302,11 @@ class IaCScanner:
     def _scan_kubernetes(self, file_path: Path, content: str) -> List[Dict]:
         """Scan Kubernetes manifests."""
         findings = []
+        file_name = str(file_path)
         
         try:
             # K8s files can have multiple documents
-            docs = yaml.safe_load_all(content)
+            docs = yaml.load_all(content, Loader=_YAMLLoader)
             
             for doc in docs:
                 if not doc:
@@ -247,7 +328,7 @@ class IaCScanner:
                             findings.append({
                                 'type': 'privileged_container',
                                 'severity': 'critical',
-                                'file': str(file_path),
+                                'file': file_name,
                                 'line': 0,
                                 'message': f'Container runs with privileged flag',
                                 'control': 'CC6',
@@ -258,7 +339,7 @@ class IaCScanner:
                             findings.append({
                                 'type': 'running_as_root',
                                 'severity': 'high',
-                                'file': str(file_path),
+                                'file': file_name,
                                 'line': 0,
                                 'message': 'Container runs as root (UID 0)',
                                 'control': 'CC6',
@@ -279,37 +360,39 @@ class IaCScanner:
             repo_url: GitHub repository URL (optional)
             local_base_path: Base path of cloned repository (optional)
             
+        Returns:
+            List of all findings
+        """
+        return self.scan_files(FileIndex.build(root_path), repo_url, local_base_path)
+    
+    def scan_files(self, index: FileIndex, repo_url: Optional[str] = None, local_base_path: Optional[str] = None) -> List[Dict]:
+        """
+        Scan the IaC files in an index.
+        
+        Args:
+            index: Files walked once for all scanners
+            repo_url: GitHub repository URL (optional)
+            local_base_path: Base path of cloned repository (optional)
+            
         Returns:
             List of all findings
         """
         logger.info("Starting IaC scan...")
         all_findings = []
         
-        files = FileLoader.get_all_files(root_path)
-        
-        for file_path in files:
+        for file_path in index.files:
             # Check if it's an IaC file
-            is_iac = (
-                file_path.suffix in ['.tf', '.tfvars'] or
-                'Dockerfile' in file_path.name or
-                'docker-compose' in file_path.name or
-                (file_path.suffix in ['.yaml', '.yml'] and 
-                 ('k8s' in str(file_path) or 'kubernetes' in str(file_path)))
-            )
-            
-            if is_iac:
+            if self.accepts(file_path):
                 content = FileLoader.read_file(file_path)
                 if content:
                     findings = self.scan_file(file_path, content)
                     
-                    # Convert file paths to GitHub URLs if applicable
+                    # Convert file paths to GitHub URLs if applicable (updates findings in place)
                     if repo_url and local_base_path:
-                        findings = [
+                        for finding in findings:
                             GitHubURLConverter.update_finding_with_github_url(
                                 finding, repo_url, local_base_path
                             )
-                            for finding in findings
-                        ]
                     
                     all_findings.extend(findings)
         
@@ -1,24 +1,90 @@
 import re
+from bisect import bisect_left
 from pathlib import Path
-from typing import List, Dict, Optional
-import yaml
+from typing import List, Dict, Optional, Tuple
 from ..utils.logger import logger
-from ..utils.file_loader import FileLoader
+from ..utils.config_loader import load_config
+from ..utils.file_loader import FileLoader, FileIndex
 from ..utils.github_url import GitHubURLConverter
+from ..utils.patterns import build_prefilter, guard_leading_repeat, is_potentially_exponential
+
+# Constructs that behave differently on one line than on the whole file:
+# \A, \Z, lookarounds and DOTALL. Patterns using them are matched line by line.
+_LINE_BOUND_CONSTRUCTS = re.compile(r'\\[AZ]|\(\?(?:[=!<]|[a-zA-Z]*s)')
+
+_NEWLINE = re.compile('\n')
+
+def _line_at(content: str, newline_offsets: List[int], line_num: int) -> str:
+    """Slice one line out of the content without splitting the whole file."""
+    start = newline_offsets[line_num - 2] + 1 if line_num > 1 else 0
+    end = newline_offsets[line_num - 1] if line_num <= len(newline_offsets) else len(content)
+    return content[start:end]
+
+def _lines_spanned(spans: List[Tuple[int, int]], newline_offsets: List[int]) -> List[int]:
+    """
+    Map whole-file match spans to the line numbers they touch.
+    
+    A pattern matches a line on its own only where a whole-file match starts or
+    runs through, so these are the only lines that need matching line by line.
+    
+    Args:
+        spans: (start, end) offsets of matches in the file content
+        newline_offsets: Sorted offsets of every newline in the content
+        
+    Returns:
+        Sorted 1-based line numbers
+    """
+    line_numbers = set()
+    for start, end in spans:
+        first = bisect_left(newline_offsets, start) + 1
+        last = bisect_left(newline_offsets, max(start, end - 1)) + 1
+        line_numbers.update(range(first, last + 1))
+    return sorted(line_numbers)
 
 class SecretScanner:
     """Scanner for detecting secrets and sensitive information in code."""
     
     def __init__(self, config_path: Optional[str] = None):
         """Initialize the secret scanner with patterns from config."""
-        if config_path is None:
-            config_path = Path(__file__).parent.parent / "config" / "soc2_controls.yaml"
-        
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        # Parsed once per process and shared with the other components
+        config = load_config(config_path)
         
         self.patterns = config.get('patterns', {}).get('secrets', [])
         self.high_risk_files = config.get('file_patterns', {}).get('high_risk', [])
+        
+        # Compile once; invalid patterns and patterns that can backtrack
+        # exponentially are reported here and then skipped. Each pattern also
+        # gets a whole-file variant (None when unsafe) that finds the lines
+        # worth matching in a single pass; a leading repeat is guarded only in
+        # the per-line regex, as the whole-file one may find extra lines.
+        self._compiled_patterns = []
+        for pattern_def in self.patterns:
+            pattern = pattern_def['pattern']
+            if is_potentially_exponential(pattern):
+                logger.error(f"Skipping regex pattern {pattern}: nested or ambiguous repetition can backtrack exponentially")
+                continue
+            guarded = guard_leading_repeat(pattern)
+            if guarded != pattern:
+                logger.info(f"Guarding leading repeat of regex pattern {pattern} as {guarded}")
+            try:
+                regex = re.compile(guarded)
+                whole_file_regex = None
+                if not _LINE_BOUND_CONSTRUCTS.search(pattern):
+                    whole_file_regex = re.compile(pattern, re.MULTILINE)
+                self._compiled_patterns.append((regex, whole_file_regex, pattern_def))
+            except re.error as e:
+                logger.error(f"Invalid regex pattern {pattern}: {e}")
+        
+        # One pass over a file tells whether any whole-file pattern can match it
+        self._may_match = build_prefilter(
+            [pattern_def['pattern'] for _, whole_file_regex, pattern_def in self._compiled_patterns
+             if whole_file_regex is not None],
+            re.MULTILINE
+        )
+    
+    def accepts(self, file_path: Path) -> bool:
+        """Whether a file is scanned for secrets (every indexed file is)."""
+        return True
     
     def scan_file(self, file_path: Path, content: str) -> List[Dict]:
         """
@@ -32,40 +98,62 @@ class SecretScanner:
             List of findings
         """
         findings = []
+        file_name = str(file_path)
         
         # Check if file itself is high risk
         if any(file_path.match(pattern) for pattern in self.high_risk_files):
             findings.append({
                 'type': 'high_risk_file',
                 'severity': 'high',
-                'file': str(file_path),
+                'file': file_name,
                 'line': 0,
                 'message': f'High-risk file detected: {file_path.name}',
                 'control': 'CC9',
                 'pattern': file_path.name
             })
         
-        # Scan content for secret patterns
-        lines = content.split('\n')
-        for pattern_def in self.patterns:
-            pattern = pattern_def['pattern']
-            try:
-                regex = re.compile(pattern)
-                for line_num, line in enumerate(lines, 1):
-                    matches = regex.finditer(line)
-                    for match in matches:
-                        findings.append({
-                            'type': pattern_def['name'],
-                            'severity': pattern_def['severity'],
-                            'file': str(file_path),
-                            'line': line_num,
-                            'message': f"Potential {pattern_def['name'].replace('_', ' ')} detected",
-                            'control': pattern_def['control'],
-                            'snippet': line.strip()[:100],
-                            'matched_text': match.group(0)[:50]  # Truncate for safety
-                        })
-            except re.error as e:
-                logger.error(f"Invalid regex pattern {pattern}: {e}")
+        # Scan content for secret patterns; lines are split out only for
+        # patterns matched line by line, otherwise sliced where needed
+        lines = None
+        newline_offsets = None
+        candidates = self._may_match is None or self._may_match(content)
+        for regex, whole_file_regex, pattern_def in self._compiled_patterns:
+            if whole_file_regex is None:
+                if lines is None:
+                    lines = content.split('\n')
+                numbered_lines = enumerate(lines, 1)
+            elif not candidates:
+                continue
+            else:
+                spans = [match.span() for match in whole_file_regex.finditer(content)]
+                if not spans:
+                    continue
+                if newline_offsets is None:
+                    newline_offsets = [match.start() for match in _NEWLINE.finditer(content)]
+                numbered_lines = [
+                    (line_num, _line_at(content, newline_offsets, line_num))
+                    for line_num in _lines_spanned(spans, newline_offsets)
+                ]
+            
+            # Shared by every match of the pattern
+            name = pattern_def['name']
+            severity = pattern_def['severity']
+            message = f"Potential {name.replace('_', ' ')} detected"
+            control = pattern_def['control']
+            
+            for line_num, line in numbered_lines:
+                matches = regex.finditer(line)
+                for match in matches:
+                    findings.append({
+                        'type': name,
+                        'severity': severity,
+                        'file': file_name,
+                        'line': line_num,
+                        'message': message,
+                        'control': control,
+                        'snippet': line.strip()[:100],
+                        'matched_text': match.group(0)[:50]  # Truncate for safety
+                    })
         
         return findings
     
@@ -78,27 +166,37 @@ class SecretScanner:
             repo_url: GitHub repository URL (optional)
             local_base_path: Base path of cloned repository (optional)
             
+        Returns:
+            List of all findings
+        """
+        return self.scan_files(FileIndex.build(root_path), repo_url, local_base_path)
+    
+    def scan_files(self, index: FileIndex, repo_url: Optional[str] = None, local_base_path: Optional[str] = None) -> List[Dict]:
+        """
+        Scan indexed files for secrets.
+        
+        Args:
+            index: Files walked once for all scanners
+            repo_url: GitHub repository URL (optional)
+            local_base_path: Base path of cloned repository (optional)
+            
         Returns:
             List of all findings
         """
         logger.info("Starting secret scan...")
         all_findings = []
         
-        files = FileLoader.get_all_files(root_path)
-        
-        for file_path in files:
+        for file_path in index.files:
             content = FileLoader.read_file(file_path)
             if content:
                 findings = self.scan_file(file_path, content)
                 
-                # Convert file paths to GitHub URLs if applicable
+                # Convert file paths to GitHub URLs if applicable (updates findings in place)
                 if repo_url and local_base_path:
-                    findings = [
+                    for finding in findings:
                         GitHubURLConverter.update_finding_with_github_url(
                             finding, repo_url, local_base_path
                         )
-                        for finding in findings
-                    ]
                 
                 all_findings.extend(findings)
         
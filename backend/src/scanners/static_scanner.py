@@ -1,37 +1,212 @@
 import re
+import ast
+import json
+import warnings
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
-import yaml
+from typing import List, Dict, Optional, Set, Tuple
 import os
-import google.generativeai as genai
 from ..utils.logger import logger
-from ..utils.file_loader import FileLoader
+from ..utils.config_loader import load_config
+from ..utils.file_loader import FileLoader, FileIndex
 from ..utils.github_url import GitHubURLConverter
+from ..utils.patterns import build_prefilter, guard_leading_repeat, is_potentially_exponential, required_literals
+
+_NEWLINE = re.compile('\n')
+
+# Repository path of a file in a GitHub blob URL
+_BLOB_PATH = re.compile(r'/blob/[^/]+/(.+?)(?:#|$)')
+
+# Inline comment (Bandit's convention) marking a line's findings as reviewed
+_SUPPRESSION_MARKER = re.compile(r'(?:#|//)\s*nosec\b', re.IGNORECASE)
+
+def _line_at(content: str, newline_offsets: List[int], line_num: int) -> str:
+    """Slice one line out of the content without splitting the whole file."""
+    start = newline_offsets[line_num - 2] + 1 if line_num > 1 else 0
+    end = newline_offsets[line_num - 1] if line_num <= len(newline_offsets) else len(content)
+    return content[start:end]
+
+# Cursor and connection methods that run the SQL text they are given
+_SQL_EXECUTE_METHODS = frozenset({'execute', 'executemany', 'executescript', 'query'})
+
+# Attribute access of one of those methods, without which there is nothing to parse for
+_SQL_EXECUTE_ACCESS = re.compile(r'\.\s*(?:execute|query)')
+
+def _string_parts(node: ast.AST) -> Tuple[bool, bool]:
+    """Whether a + / % expression has a string literal part and a runtime value part."""
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mod)):
+        left_str, left_runtime = _string_parts(node.left)
+        right_str, right_runtime = _string_parts(node.right)
+        return left_str or right_str, left_runtime or right_runtime
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, str), False
+    if isinstance(node, ast.JoinedStr):
+        return True, any(isinstance(value, ast.FormattedValue) for value in node.values)
+    return False, True
+
+def _is_dynamic_sql(node: ast.AST, dynamic_names: Set[str]) -> bool:
+    """Whether an expression builds a string from runtime values (+, %, format() or an f-string)."""
+    if isinstance(node, ast.Name):
+        return node.id in dynamic_names
+    if isinstance(node, ast.JoinedStr):
+        return any(isinstance(value, ast.FormattedValue) for value in node.values)
+    if isinstance(node, ast.BinOp):
+        if _is_dynamic_sql(node.left, dynamic_names) or _is_dynamic_sql(node.right, dynamic_names):
+            return isinstance(node.op, (ast.Add, ast.Mod))
+        has_str, has_runtime = _string_parts(node)
+        return has_str and has_runtime
+    if isinstance(node, ast.Call):
+        func = node.func
+        return (
+            isinstance(func, ast.Attribute) and func.attr == 'format'
+            and isinstance(func.value, ast.Constant) and isinstance(func.value.value, str)
+            and bool(node.args or node.keywords)
+        )
+    return False
+
+class _SqlInjectionVisitor(ast.NodeVisitor):
+    """Collect lines of execute() / query() calls whose SQL is built from runtime values."""
+    
+    def __init__(self):
+        self.lines: List[int] = []
+        # Names holding dynamically built strings, per function or class scope
+        self._scopes: List[Set[str]] = [set()]
+    
+    def _visit_scope(self, node: ast.AST):
+        self._scopes.append(set())
+        self.generic_visit(node)
+        self._scopes.pop()
+    
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = visit_Lambda = _visit_scope
+    
+    def _assign(self, target: ast.AST, dynamic: bool):
+        if isinstance(target, ast.Name):
+            if dynamic:
+                self._scopes[-1].add(target.id)
+            else:
+                self._scopes[-1].discard(target.id)
+    
+    def visit_Assign(self, node: ast.Assign):
+        self.generic_visit(node)
+        dynamic = _is_dynamic_sql(node.value, self._scopes[-1])
+        for target in node.targets:
+            self._assign(target, dynamic)
+    
+    def visit_AnnAssign(self, node: ast.AnnAssign):
+        self.generic_visit(node)
+        if node.value is not None:
+            self._assign(node.target, _is_dynamic_sql(node.value, self._scopes[-1]))
+    
+    def visit_AugAssign(self, node: ast.AugAssign):
+        self.generic_visit(node)
+        if isinstance(node.target, ast.Name) and isinstance(node.op, ast.Add):
+            if _is_dynamic_sql(node.value, self._scopes[-1]):
+                self._scopes[-1].add(node.target.id)
+    
+    def visit_Call(self, node: ast.Call):
+        self.generic_visit(node)
+        func = node.func
+        method = func.attr if isinstance(func, ast.Attribute) else None
+        if method in _SQL_EXECUTE_METHODS and node.args and _is_dynamic_sql(node.args[0], self._scopes[-1]):
+            self.lines.append(node.lineno)
+
+def _sql_injection_lines(content: str) -> Optional[List[int]]:
+    """
+    Find execute() / query() calls on SQL built from runtime values in Python source.
+    
+    Args:
+        content: Python source
+        
+    Returns:
+        Sorted line numbers of the calls, or None if the source does not parse
+    """
+    # Every flagged call accesses one of the methods
+    if not _SQL_EXECUTE_ACCESS.search(content):
+        return []
+    
+    try:
+        with warnings.catch_warnings():
+            # Invalid escapes and the like in scanned code are not our concern
+            warnings.simplefilter('ignore')
+            tree = ast.parse(content)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+    
+    visitor = _SqlInjectionVisitor()
+    try:
+        visitor.visit(tree)
+    except RecursionError:
+        return None
+    return sorted(visitor.lines)
 
 class StaticScanner:
     """Scanner for static code analysis - security patterns and anti-patterns."""
     
+    # Extensions of the code files that are analyzed
+    CODE_SUFFIXES = frozenset({'.py', '.js', '.ts', '.tsx', '.java', '.go', '.rb', '.php'})
+    
+    # Prompt budget of one validation call (about 30k tokens at ~4 characters
+    # per token); files are packed into calls up to it
+    VALIDATION_MAX_PROMPT_CHARS = 120_000
+    
+    # Validation calls in flight at once
+    VALIDATION_WORKERS = 4
+    
+    # Severities of a lone finding kept without validation outside test code
+    TRUSTED_SEVERITIES = frozenset({'critical', 'high'})
+    
     def __init__(self, config_path: Optional[str] = None):
         """Initialize the static scanner with patterns from config."""
-        if config_path is None:
-            config_path = Path(__file__).parent.parent / "config" / "soc2_controls.yaml"
-        
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        # Parsed once per process and shared with the other components
+        config = load_config(config_path)
         
         self.security_patterns = config.get('patterns', {}).get('security', [])
         self.auth_patterns = config.get('patterns', {}).get('authentication', [])
         self.logging_patterns = config.get('patterns', {}).get('logging', [])
         
+        # Compile once; invalid patterns and patterns that can backtrack
+        # exponentially are reported here and then skipped, and a leading
+        # repeat is kept from restarting inside runs it covered. Each pattern
+        # also keeps the literals one of which its matches must contain.
+        self._compiled_patterns = []
+        for pattern_def in self.security_patterns + self.auth_patterns + self.logging_patterns:
+            if is_potentially_exponential(pattern_def['pattern'], re.MULTILINE | re.DOTALL):
+                logger.error(f"Skipping regex pattern {pattern_def['pattern']}: nested or ambiguous repetition can backtrack exponentially")
+                continue
+            guarded = guard_leading_repeat(pattern_def['pattern'])
+            if guarded != pattern_def['pattern']:
+                logger.info(f"Guarding leading repeat of regex pattern {pattern_def['pattern']} as {guarded}")
+            try:
+                regex = re.compile(guarded, re.MULTILINE | re.DOTALL)
+                literals = required_literals(pattern_def['pattern'], re.MULTILINE | re.DOTALL)
+                self._compiled_patterns.append((regex, literals, pattern_def))
+            except re.error as e:
+                logger.error(f"Invalid regex pattern {pattern_def['pattern']}: {e}")
+        
+        # Patterns with literals are ruled out by substring searches; one pass
+        # over a file tells whether any of the others can match it
+        self._may_match = build_prefilter(
+            [pattern_def['pattern'] for _, literals, pattern_def in self._compiled_patterns
+             if literals is None],
+            re.MULTILINE | re.DOTALL
+        )
+        
         # Initialize Gemini for second-pass validation
         api_key = os.getenv('GEMINI_API_KEY')
         if api_key:
+            # Deferred: the Gemini SDK is heavy and only needed for validation
+            import google.generativeai as genai
             genai.configure(api_key=api_key)
             self.model = genai.GenerativeModel('gemini-2.5-flash')
         else:
             self.model = None
             logger.warning("GEMINI_API_KEY not found - second-pass validation disabled")
     
+    def accepts(self, file_path: Path) -> bool:
+        """Whether a file is code this scanner analyzes."""
+        return file_path.suffix in self.CODE_SUFFIXES
+    
     def scan_file(self, file_path: Path, content: str) -> List[Dict]:
         """
         Scan a single file for security issues.
@@ -45,38 +220,70 @@ class StaticScanner:
         """
         findings = []
         
-        # Combine all pattern types
-        all_patterns = (
-            self.security_patterns + 
-            self.auth_patterns + 
-            self.logging_patterns
-        )
-        
-        lines = content.split('\n')
+        # Offsets of every newline, built on the first finding
+        newline_offsets = None
+        file_name = str(file_path)
+        # Lowercased content for the literals of case-insensitive patterns
+        lowered = None
+        # Prefilter result for the patterns without literals, on first need
+        may_match = None
         
-        for pattern_def in all_patterns:
-            pattern = pattern_def['pattern']
-            try:
-                regex = re.compile(pattern, re.MULTILINE | re.DOTALL)
+        for regex, literals, pattern_def in self._compiled_patterns:
+            name = pattern_def['name']
+            
+            # Python's syntax tree tells SQL built from runtime values apart
+            # from constant queries; the regex is the fallback if it won't parse
+            line_nums = None
+            if name == 'sql_injection_risk' and file_path.suffix == '.py':
+                line_nums = _sql_injection_lines(content)
+            
+            if line_nums is None:
+                # A substring search rules out patterns whose literals are all missing
+                if literals is not None:
+                    text = content
+                    if regex.flags & re.IGNORECASE:
+                        if lowered is None:
+                            lowered = content.lower()
+                        text = lowered
+                    if not any(literal in text for literal in literals):
+                        continue
+                elif self._may_match is not None:
+                    if may_match is None:
+                        may_match = self._may_match(content)
+                    if not may_match:
+                        continue
                 
                 # Check full content for multi-line patterns
-                matches = regex.finditer(content)
-                for match in matches:
-                    # Find line number
-                    line_num = content[:match.start()].count('\n') + 1
-                    
-                    findings.append({
-                        'type': pattern_def['name'],
-                        'severity': pattern_def['severity'],
-                        'file': str(file_path),
-                        'line': line_num,
-                        'message': f"Security issue: {pattern_def['name'].replace('_', ' ')}",
-                        'control': pattern_def['control'],
-                        'snippet': lines[line_num - 1].strip()[:100] if line_num <= len(lines) else '',
-                        'recommendation': self._get_recommendation(pattern_def['name'])
-                    })
-            except re.error as e:
-                logger.error(f"Invalid regex pattern {pattern}: {e}")
+                starts = [match.start() for match in regex.finditer(content)]
+                if not starts:
+                    continue
+                if newline_offsets is None:
+                    newline_offsets = [nl.start() for nl in _NEWLINE.finditer(content)]
+                
+                # Find line numbers: one more than the newlines before each match
+                line_nums = [bisect_left(newline_offsets, start) + 1 for start in starts]
+            elif not line_nums:
+                continue
+            elif newline_offsets is None:
+                newline_offsets = [nl.start() for nl in _NEWLINE.finditer(content)]
+            
+            # Shared by every match of the pattern
+            severity = pattern_def['severity']
+            message = f"Security issue: {name.replace('_', ' ')}"
+            control = pattern_def['control']
+            recommendation = self._get_recommendation(name)
+            
+            for line_num in line_nums:
+                findings.append({
+                    'type': name,
+                    'severity': severity,
+                    'file': file_name,
+                    'line': line_num,
+                    'message': message,
+                    'control': control,
+                    'snippet': _line_at(content, newline_offsets, line_num).strip()[:100],
+                    'recommendation': recommendation
+                })
         
         return findings
     
@@ -103,46 +310,69 @@ class StaticScanner:
             repo_url: GitHub repository URL (optional)
             local_base_path: Base path of cloned repository (optional)
             
+        Returns:
+            List of all findings
+        """
+        return self.scan_files(FileIndex.build(root_path), repo_url, local_base_path)
+    
+    def scan_files(self, index: FileIndex, repo_url: Optional[str] = None, local_base_path: Optional[str] = None) -> List[Dict]:
+        """
+        Scan indexed code files for security issues.
+        
+        Args:
+            index: Files walked once for all scanners
+            repo_url: GitHub repository URL (optional)
+            local_base_path: Base path of cloned repository (optional)
+            
         Returns:
             List of all findings
         """
         logger.info("Starting static code analysis...")
         all_findings = []
         
-        files = FileLoader.get_all_files(root_path)
-        
-        for file_path in files:
+        for file_path in index.files:
             # Focus on code files
-            if file_path.suffix in ['.py', '.js', '.ts', '.tsx', '.java', '.go', '.rb', '.php']:
+            if self.accepts(file_path):
                 content = FileLoader.read_file(file_path)
                 if content:
                     findings = self.scan_file(file_path, content)
                     
-                    # Convert file paths to GitHub URLs if applicable
+                    # Convert file paths to GitHub URLs if applicable (updates findings in place)
                     if repo_url and local_base_path:
-                        findings = [
+                        for finding in findings:
                             GitHubURLConverter.update_finding_with_github_url(
                                 finding, repo_url, local_base_path
                             )
-                            for finding in findings
-                        ]
                     
                     all_findings.extend(findings)
         
         logger.info(f"Static analysis complete. Found {len(all_findings)} potential issues")
         
-        # Second pass: validate findings to reduce false positives
-        if all_findings and self.model:
+        return self.review_findings(all_findings, index.root)
+    
+    def review_findings(self, findings: List[Dict], root_path: str) -> List[Dict]:
+        """
+        Second pass over a scan's findings, when validation is configured.
+        
+        Args:
+            findings: Findings from pattern matching
+            root_path: Root directory of the scanned files
+            
+        Returns:
+            Findings with false positives removed
+        """
+        if findings and self.model:
             logger.info("Running second-pass validation to filter false positives...")
-            all_findings = self._validate_findings(all_findings, root_path)
-            logger.info(f"After validation: {len(all_findings)} confirmed issues")
+            findings = self._validate_findings(findings, root_path)
+            logger.info(f"After validation: {len(findings)} confirmed issues")
         
-        return all_findings
+        return findings
     
     def _validate_findings(self, findings: List[Dict], root_path: str) -> List[Dict]:
         """
         Second pass: validate findings using LLM to reduce false positives.
-        Groups findings by file and analyzes context efficiently.
+        Groups findings by file and packs as many files per LLM call as the
+        prompt budget allows.
         
         Args:
             findings: Initial findings from pattern matching
@@ -154,64 +384,150 @@ class StaticScanner:
         if not findings:
             return findings
         
-        # Group findings by file for efficient batch analysis
+        # Group findings by file for efficient batch analysis; converted
+        # findings keep their local path, as their URLs differ per line
         findings_by_file = {}
         for finding in findings:
-            file_path = finding.get('file', '')
+            file_path = finding.get('local_file') or finding.get('file', '')
             if file_path not in findings_by_file:
                 findings_by_file[file_path] = []
             findings_by_file[file_path].append(finding)
         
-        validated_findings = []
+        # Validated findings per file, concatenated in file order at the end
+        validated_by_file = {}
+        batches = []
+        batch = []
+        batch_chars = 0
+        trusted_files = 0
+        suppressed = 0
         
-        # Process each file's findings in a single LLM call
         for file_path, file_findings in findings_by_file.items():
             # Read file content for context
             try:
                 # Handle both GitHub URLs and local paths
                 if file_path.startswith('https://github.com/'):
                     # Extract local path from GitHub URL
-                    match = re.search(r'/blob/[^/]+/(.+?)(?:#|$)', file_path)
+                    match = _BLOB_PATH.search(file_path)
                     if match:
-                        local_file = Path(root_path) / match.group(1)
+                        local_file = os.path.join(root_path, match.group(1))
                     else:
                         continue
                 else:
-                    local_file = Path(file_path)
+                    local_file = file_path
                 
-                if not local_file.exists():
+                if not os.path.exists(local_file):
                     # If file doesn't exist, keep findings (better safe than sorry)
-                    validated_findings.extend(file_findings)
+                    validated_by_file[file_path] = file_findings
                     continue
                 
-                content = local_file.read_text(encoding='utf-8', errors='ignore')
+                with open(local_file, encoding='utf-8', errors='ignore') as f:
+                    content = f.read()
                 
-                # Validate this batch of findings
-                valid_findings = self._validate_file_findings(file_findings, content, str(local_file))
-                validated_findings.extend(valid_findings)
+                # Findings on lines marked as reviewed never reach the model
+                unsuppressed = self._drop_suppressed(file_findings, content)
+                suppressed += len(file_findings) - len(unsuppressed)
+                if not unsuppressed:
+                    validated_by_file[file_path] = unsuppressed
+                    continue
+                
+                if not self._needs_llm_validation(unsuppressed, os.path.relpath(local_file, root_path)):
+                    validated_by_file[file_path] = unsuppressed
+                    trusted_files += 1
+                    continue
+                
+                file_findings = unsuppressed
+                section = self._file_section(file_findings, content, local_file)
                 
             except Exception as e:
                 logger.warning(f"Error validating findings for {file_path}: {e}")
                 # On error, keep findings to avoid missing real issues
-                validated_findings.extend(file_findings)
+                validated_by_file[file_path] = file_findings
+                continue
+            
+            # Send the batch once this file would take it over budget
+            if batch and batch_chars + len(section) > self.VALIDATION_MAX_PROMPT_CHARS:
+                batches.append(batch)
+                batch = []
+                batch_chars = 0
+            batch.append((file_path, file_findings, section, local_file))
+            batch_chars += len(section)
+        
+        if batch:
+            batches.append(batch)
+        
+        if suppressed:
+            logger.info(f"Dropped {suppressed} finding(s) on lines marked nosec")
+        if trusted_files:
+            logger.info(f"Kept findings of {trusted_files} file(s) without validation")
         
-        return validated_findings
+        # Calls spend their time waiting on the network, so overlap them
+        if len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.VALIDATION_WORKERS, len(batches))) as executor:
+                results = list(executor.map(self._validate_batch, batches))
+        else:
+            results = [self._validate_batch(batch) for batch in batches]
+        for result in results:
+            validated_by_file.update(result)
+        
+        return [
+            finding
+            for file_path in findings_by_file
+            for finding in validated_by_file.get(file_path, [])
+        ]
     
-    def _validate_file_findings(self, findings: List[Dict], file_content: str, file_path: str) -> List[Dict]:
+    def _drop_suppressed(self, findings: List[Dict], file_content: str) -> List[Dict]:
         """
-        Validate findings for a single file using LLM context analysis.
+        Remove findings on lines carrying a nosec comment.
         
         Args:
             findings: Findings for this file
             file_content: Full file content
-            file_path: Path to the file
             
         Returns:
-            List of validated findings (false positives removed)
+            Findings whose line is not marked as reviewed
         """
-        if not findings or not self.model:
+        if 'nosec' not in file_content.lower():
             return findings
         
+        newline_offsets = [match.start() for match in _NEWLINE.finditer(file_content)]
+        line_count = len(newline_offsets) + 1
+        return [
+            finding for finding in findings
+            if not 1 <= finding.get('line', 0) <= line_count
+            or not _SUPPRESSION_MARKER.search(_line_at(file_content, newline_offsets, finding['line']))
+        ]
+    
+    def _needs_llm_validation(self, findings: List[Dict], relative_path: str) -> bool:
+        """
+        Whether a file's findings are worth an LLM call.
+        
+        A single high-severity finding outside test code is rarely a false
+        positive, and validation keeps anything it is unsure of anyway, so
+        such files skip the call.
+        
+        Args:
+            findings: Findings for this file
+            relative_path: Path of the file within the scanned directory
+            
+        Returns:
+            False if the findings are kept as they are
+        """
+        if len(findings) != 1 or findings[0].get('severity') not in self.TRUSTED_SEVERITIES:
+            return True
+        return 'test' in relative_path.lower()
+    
+    def _file_section(self, findings: List[Dict], file_content: str, file_path: str) -> str:
+        """
+        Describe one file's findings and their code context for the validation prompt.
+        
+        Args:
+            findings: Findings for this file
+            file_content: Full file content
+            file_path: Path to the file
+            
+        Returns:
+            Prompt section naming the file, its findings and the lines around them
+        """
         # Prepare concise summary of findings for LLM
         findings_summary = []
         for idx, finding in enumerate(findings):
@@ -225,29 +541,71 @@ class StaticScanner:
                 'snippet': finding.get('snippet', '')
             })
         
-        # Extract relevant code context (lines around findings)
-        lines = file_content.split('\n')
+        # Extract relevant code context (lines around findings), sliced out
+        # through one newline index instead of splitting the whole file
+        newline_offsets = [match.start() for match in _NEWLINE.finditer(file_content)]
+        line_count = len(newline_offsets) + 1
         context_snippets = []
         for finding in findings:
             line_num = finding.get('line', 0)
             start = max(0, line_num - 3)
-            end = min(len(lines), line_num + 2)
-            snippet = '\n'.join(f"{i+1}: {lines[i]}" for i in range(start, end))
+            end = min(line_count, line_num + 2)
+            snippet = '\n'.join(f"{i+1}: {_line_at(file_content, newline_offsets, i + 1)}" for i in range(start, end))
             context_snippets.append(snippet)
         
         # Build findings list and context strings
-        findings_list = '\n'.join([f"{i+1}. {f['type']} at line {f['line']}: {f['message']}" for i, f in enumerate(findings_summary)])
-        context_list = '\n'.join([f"Finding {i+1} context:\n{snippet}\n" for i, snippet in enumerate(context_snippets)])
+        findings_list = '\n'.join([f"{i}. {f['type']} at line {f['line']}: {f['message']}" for i, f in enumerate(findings_summary)])
+        context_list = '\n'.join([f"Finding {i} context:\n{snippet}\n" for i, snippet in enumerate(context_snippets)])
         
-        prompt = f"""You are a security expert analyzing code for false positives in SOC 2 compliance scanning.
-
-File: {Path(file_path).name}
+        return f"""{os.path.basename(file_path)}
 
 Potential Issues Found ({len(findings)}):
 {findings_list}
 
 Code Context:
-{context_list}
+{context_list}"""
+    
+    def _validate_file_findings(self, findings: List[Dict], file_content: str, file_path: str) -> List[Dict]:
+        """
+        Validate findings for a single file using LLM context analysis.
+        
+        Args:
+            findings: Findings for this file
+            file_content: Full file content
+            file_path: Path to the file
+            
+        Returns:
+            List of validated findings (false positives removed)
+        """
+        if not findings or not self.model:
+            return findings
+        
+        findings = self._drop_suppressed(findings, file_content)
+        if not findings:
+            return findings
+        
+        section = self._file_section(findings, file_content, file_path)
+        return self._validate_batch([(file_path, findings, section, file_path)])[file_path]
+    
+    def _validate_batch(self, batch: List[Tuple[str, List[Dict], str, str]]) -> Dict[str, List[Dict]]:
+        """
+        Validate several files' findings in one LLM call.
+        
+        Args:
+            batch: (key, findings, prompt section, local path) of each file
+            
+        Returns:
+            Validated findings by file key
+        """
+        sections = '\n---\n'.join(
+            f"File {number}: {section}" for number, (_, _, section, _) in enumerate(batch, 1)
+        )
+        
+        prompt = f"""You are a security expert analyzing code for false positives in SOC 2 compliance scanning.
+
+Potential issues were found in {len(batch)} file(s), each listed with its code context.
+
+{sections}
 
 Task: Analyze each finding and determine if it's a TRUE POSITIVE or FALSE POSITIVE.
 
@@ -258,12 +616,11 @@ Common false positive patterns to filter out:
 - Configuration for development/testing environments clearly marked as such
 - Code that appears vulnerable but has proper validation elsewhere
 
-Respond with a JSON array of finding IDs (0-based) that are TRUE POSITIVES only.
-Format: {{"valid_findings": [0, 2, 4]}}
+Respond with a JSON object mapping each file number to the IDs of its findings that are TRUE POSITIVES only.
+Format: {{"valid_findings": {{"1": [0, 2, 4], "2": []}}}}
 
 Be conservative - if unsure, mark as true positive. Only filter obvious false positives."""
-
-
+        
         try:
             response = self.model.generate_content(prompt)
             response_text = response.text.strip()
@@ -274,20 +631,36 @@ Be conservative - if unsure, mark as true positive. Only filter obvious false po
             elif '```' in response_text:
                 response_text = response_text.split('```')[1].split('```')[0].strip()
             
-            import json
             result = json.loads(response_text)
-            valid_ids = result.get('valid_findings', [])
+            valid_ids_by_file = result.get('valid_findings', {})
+            if isinstance(valid_ids_by_file, list):
+                # A bare ID list can only answer a single-file batch
+                valid_ids_by_file = {'1': valid_ids_by_file} if len(batch) == 1 else {}
+            elif not isinstance(valid_ids_by_file, dict):
+                valid_ids_by_file = {}
+            
+        except Exception as e:
+            logger.warning(f"Validation failed for {len(batch)} file(s): {e}. Keeping all findings.")
+            # On error, keep all findings (fail-safe)
+            return {key: findings for key, findings, _, _ in batch}
+        
+        validated_by_file = {}
+        for number, (key, findings, _, file_path) in enumerate(batch, 1):
+            valid_ids = valid_ids_by_file.get(str(number))
+            if not isinstance(valid_ids, list):
+                # Files the model did not answer for keep their findings
+                validated_by_file[key] = findings
+                continue
             
-            # Return only validated findings
-            validated = [findings[i] for i in valid_ids if i < len(findings)]
+            # Keep only validated findings: in-range integer IDs (bools are not
+            # IDs), each once, in the model's order
+            validated = [findings[i] for i in dict.fromkeys(
+                i for i in valid_ids if type(i) is int and 0 <= i < len(findings)
+            )]
+            validated_by_file[key] = validated
             
             filtered_count = len(findings) - len(validated)
             if filtered_count > 0:
-                logger.info(f"Filtered {filtered_count} false positive(s) from {Path(file_path).name}")
-            
-            return validated
-            
-        except Exception as e:
-            logger.warning(f"Validation failed for {file_path}: {e}. Keeping all findings.")
-            # On error, keep all findings (fail-safe)
-            return findings
+                logger.info(f"Filtered {filtered_count} false positive(s) from {os.path.basename(file_path)}")
+        
+        return validated_by_file
@@ -0,0 +1,68 @@
+"""Shared loader for the SOC 2 controls configuration."""
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from yaml import load as yaml_load
+
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _Loader
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent / "config" / "soc2_controls.yaml"
+
+
+@lru_cache(maxsize=4)
+def _load_config_cached(resolved_path: str, mtime_ns: int, size: int) -> Dict:
+    """Parse a YAML config file once per resolved path, modification time and size."""
+    with open(resolved_path, 'r') as f:
+        return yaml_load(f, Loader=_Loader) or {}
+
+
+def _resolve(config_path: Optional[str]) -> str:
+    """Resolve a config path, defaulting to soc2_controls.yaml."""
+    if config_path is None:
+        config_path = DEFAULT_CONFIG_PATH
+    return str(Path(config_path).resolve())
+
+
+def config_version(config_path: Optional[str] = None) -> int:
+    """
+    Get a version stamp for the config file (its mtime in nanoseconds).
+
+    Args:
+        config_path: Path to config file (defaults to soc2_controls.yaml)
+
+    Returns:
+        Modification time in nanoseconds, or 0 if the file cannot be stat'ed
+    """
+    try:
+        return os.stat(_resolve(config_path)).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def load_config(config_path: Optional[str] = None) -> Dict:
+    """
+    Load the SOC 2 controls config, memoized per resolved path.
+
+    The file is re-parsed only when its modification time or size changes,
+    so edits are picked up without a restart (size also catches rewrites
+    within the filesystem's timestamp granularity). The returned dict is
+    shared between callers and must not be mutated.
+
+    Args:
+        config_path: Path to config file (defaults to soc2_controls.yaml)
+
+    Returns:
+        Parsed configuration dictionary
+    """
+    resolved_path = _resolve(config_path)
+    try:
+        stat = os.stat(resolved_path)
+    except OSError:
+        # Let the open in the loader raise the usual error
+        return _load_config_cached(resolved_path, 0, 0)
+    return _load_config_cached(resolved_path, stat.st_mtime_ns, stat.st_size)
@@ -1,23 +1,59 @@
 import os
+import re
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import AbstractSet, Iterable, Iterator, List, Dict, Optional
 import fnmatch
 from .logger import logger
 
+# Initial size of the per-thread read buffer; it grows to the largest file read
+_READ_BUFFER_SIZE = 1 << 20
+
+# Read buffer reused across files by each thread instead of allocating per read
+_read_buffers = threading.local()
+
+# Leading bytes searched for a NUL to tell binary files from text
+_BINARY_SNIFF_SIZE = 4096
+
+def _read_buffer(size: int) -> bytearray:
+    """Return this thread's read buffer, grown to at least size bytes."""
+    buffer = getattr(_read_buffers, 'buffer', None)
+    if buffer is None or len(buffer) < size:
+        buffer = bytearray(max(size, _READ_BUFFER_SIZE))
+        _read_buffers.buffer = buffer
+    return buffer
+
+def _read_into(f, view: memoryview, size: int, limit: int) -> int:
+    """Fill view[size:limit] from an unbuffered file; returns the new size (less at EOF)."""
+    while size < limit:
+        read = f.readinto(view[size:limit])
+        if not read:
+            break
+        size += read
+    return size
+
+def _compile_globs(patterns: Iterable[str]) -> re.Pattern:
+    """Compile glob patterns into one regex matching what fnmatch.fnmatch matches (on normcase'd names)."""
+    return re.compile('|'.join(fnmatch.translate(os.path.normcase(pattern)) for pattern in patterns))
+
 class FileLoader:
     """Utility for loading and traversing files in a repository."""
     
-    EXCLUDED_DIRS = {
+    EXCLUDED_DIRS = frozenset({
         'node_modules', '.git', '__pycache__', 'venv', 'env',
         '.venv', 'dist', 'build', '.next', 'coverage', '.pytest_cache',
         'target', 'bin', 'obj', '.terraform', 'vendor'
-    }
+    })
     
     EXCLUDED_FILES = {
         '.DS_Store', 'Thumbs.db', '*.pyc', '*.pyo', '*.so', '*.dylib',
         '*.dll', '*.exe', '*.o', '*.a', '*.class', '*.jar', '*.war'
     }
     
+    # EXCLUDED_FILES as one regex, instead of one fnmatch call per pattern per file
+    _EXCLUDED_FILES_RE = _compile_globs(EXCLUDED_FILES)
+    
     BINARY_EXTENSIONS = {
         '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico', '.svg',
         '.pdf', '.zip', '.tar', '.gz', '.bz2', '.7z', '.rar',
@@ -28,13 +64,48 @@ class FileLoader:
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
     
     @staticmethod
-    def get_all_files(root_path: str, include_patterns: Optional[List[str]] = None) -> List[Path]:
+    def _iter_file_entries(root_path: str) -> Iterator[os.DirEntry]:
+        """
+        Yield file entries under a directory, skipping excluded directories.
+        
+        Uses os.scandir so file types come from the directory listing rather
+        than extra stat calls. Each directory's files are yielded before its
+        subdirectories are visited, in listing order (the same order as
+        Path.rglob). Symlinked directories are not followed.
+        
+        Args:
+            root_path: Root directory to walk
+            
+        Yields:
+            os.DirEntry for each file
+        """
+        excluded_dirs = FileLoader.EXCLUDED_DIRS
+        stack = [root_path]
+        while stack:
+            subdirs = []
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in excluded_dirs:
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            yield entry
+            except OSError as e:
+                logger.warning(f"Cannot read directory: {e}")
+            stack.extend(reversed(subdirs))
+    
+    @staticmethod
+    def get_all_files(root_path: str, include_patterns: Optional[List[str]] = None,
+                      names: Optional[AbstractSet[str]] = None) -> List[Path]:
         """
         Get all relevant files from a directory tree.
         
         Args:
             root_path: Root directory to scan
             include_patterns: Optional list of glob patterns to include
+            names: Optional set of file names to keep; other files are dropped
+                before any further checks
             
         Returns:
             List of Path objects for relevant files
@@ -51,35 +122,34 @@ class FileLoader:
         files = []
         logger.info(f"Scanning directory: {root_path}")
         
-        for item in root.rglob('*'):
-            # Skip excluded directories
-            if any(excluded in item.parts for excluded in FileLoader.EXCLUDED_DIRS):
-                continue
-            
-            # Only process files
-            if not item.is_file():
+        excluded_files = FileLoader._EXCLUDED_FILES_RE
+        include = _compile_globs(include_patterns) if include_patterns else None
+        
+        for entry in FileLoader._iter_file_entries(str(root)):
+            if names is not None and entry.name not in names:
                 continue
             
             # Skip excluded files
-            if any(fnmatch.fnmatch(item.name, pattern) for pattern in FileLoader.EXCLUDED_FILES):
+            if excluded_files.match(os.path.normcase(entry.name)):
                 continue
             
+            item = Path(entry.path)
+            
             # Skip binary files
             if item.suffix.lower() in FileLoader.BINARY_EXTENSIONS:
                 continue
             
             # Skip large files
             try:
-                if item.stat().st_size > FileLoader.MAX_FILE_SIZE:
-                    logger.warning(f"Skipping large file: {item}")
+                if entry.stat().st_size > FileLoader.MAX_FILE_SIZE:
+                    logger.warning("Skipping large file: %s", item)
                     continue
             except OSError:
                 continue
             
             # Apply include patterns if specified
-            if include_patterns:
-                if not any(fnmatch.fnmatch(str(item.relative_to(root)), pattern) 
-                          for pattern in include_patterns):
+            if include is not None:
+                if not include.match(os.path.normcase(str(item.relative_to(root)))):
                     continue
             
             files.append(item)
@@ -92,17 +162,39 @@ class FileLoader:
         """
         Read file content safely.
         
+        Files with a NUL byte near the start are binary (images, archives,
+        compiled output under an unlisted extension) and are not read further.
+        
         Args:
             file_path: Path to the file
             
         Returns:
-            File content as string, or None if error
+            File content as string, or None if binary or on error
         """
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
+            with open(file_path, 'rb', buffering=0) as f:
+                # One spare byte shows whether the file grew since fstat
+                buffer = _read_buffer(os.fstat(f.fileno()).st_size + 1)
+                view = memoryview(buffer)
+                
+                sniff_size = min(len(buffer), _BINARY_SNIFF_SIZE)
+                size = _read_into(f, view, 0, sniff_size)
+                if buffer.find(b'\x00', 0, size) != -1:
+                    logger.debug("Skipping binary file: %s", file_path)
+                    return None
+                if size == sniff_size:
+                    size = _read_into(f, view, size, len(buffer))
+                
+                content = str(view[:size], 'utf-8', 'ignore')
+                if size == len(buffer):
+                    content += str(f.readall(), 'utf-8', 'ignore')
+            
+            # Match text-mode universal newlines
+            if '\r' in content:
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
+            return content
         except Exception as e:
-            logger.error(f"Error reading file {file_path}: {e}")
+            logger.error("Error reading file %s: %s", file_path, e)
             return None
     
     @staticmethod
@@ -128,7 +220,7 @@ class FileLoader:
                 'modified': stat.st_mtime,
             }
         except Exception as e:
-            logger.error(f"Error getting file info for {file_path}: {e}")
+            logger.error("Error getting file info for %s: %s", file_path, e)
             return {}
     
     @staticmethod
@@ -154,21 +246,62 @@ class FileLoader:
         }
         
         try:
-            for item in sorted(root.iterdir()):
+            with os.scandir(root) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+            
+            for entry in entries:
                 # Skip excluded directories
-                if item.name in FileLoader.EXCLUDED_DIRS:
+                if entry.name in FileLoader.EXCLUDED_DIRS:
                     continue
                 
-                if item.is_dir():
-                    tree['children'].append(FileLoader.get_directory_tree(str(item)))
-                elif item.is_file():
+                if entry.is_dir():
+                    tree['children'].append(FileLoader.get_directory_tree(entry.path))
+                elif entry.is_file():
                     tree['children'].append({
-                        'name': item.name,
-                        'path': str(item),
+                        'name': entry.name,
+                        'path': entry.path,
                         'type': 'file',
-                        'size': item.stat().st_size
+                        'size': entry.stat().st_size
                     })
         except PermissionError:
             logger.warning(f"Permission denied: {root}")
         
         return tree
+
+
+@dataclass
+class FileIndex:
+    """Scannable files under a root, walked once and shared by every scanner."""
+    root: str
+    files: List[Path] = field(default_factory=list)
+    
+    @classmethod
+    def build(cls, root_path: str, names: Optional[AbstractSet[str]] = None) -> 'FileIndex':
+        """
+        Walk a directory once and index its scannable files.
+        
+        Args:
+            root_path: Root directory to scan
+            names: Optional set of file names to index (all files by default)
+            
+        Returns:
+            FileIndex with files in traversal order
+        """
+        return cls(root=root_path, files=FileLoader.get_all_files(root_path, names=names))
+    
+    def batches(self, size: int) -> List['FileIndex']:
+        """
+        Split the index into consecutive batches under the same root.
+        
+        Args:
+            size: Maximum files per batch
+            
+        Returns:
+            Batches in traversal order (one batch if the index fits in one)
+        """
+        if len(self.files) <= size:
+            return [self]
+        return [
+            FileIndex(root=self.root, files=self.files[start:start + size])
+            for start in range(0, len(self.files), size)
+        ]
@@ -1,8 +1,28 @@
 """Utility for converting local file paths to GitHub URLs."""
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 import re
 
+# Match various GitHub URL formats:
+# https://github.com/owner/repo
+# https://github.com/owner/repo.git
+# git@github.com:owner/repo.git
+_REPO_URL_PATTERNS = (
+    re.compile(r'github\.com[/:]([^/]+)/([^/\.]+?)(?:\.git)?$'),
+    re.compile(r'github\.com[/:]([^/]+)/([^/]+?)/?$')
+)
+
+
+@lru_cache(maxsize=256)
+def _parse_repo_url(repo_url: str) -> Optional[Tuple[str, str]]:
+    """Owner and repo name of a GitHub URL, parsed once per URL."""
+    for pattern in _REPO_URL_PATTERNS:
+        match = pattern.search(repo_url)
+        if match:
+            return match.group(1), match.group(2)
+    return None
+
 
 class GitHubURLConverter:
     """Convert local file paths to GitHub URLs with line numbers."""
@@ -18,24 +38,48 @@ class GitHubURLConverter:
         Returns:
             Dict with 'owner' and 'repo' keys, or None if invalid
         """
-        # Match various GitHub URL formats:
-        # https://github.com/owner/repo
-        # https://github.com/owner/repo.git
-        # git@github.com:owner/repo.git
-        patterns = [
-            r'github\.com[/:]([^/]+)/([^/\.]+?)(?:\.git)?$',
-            r'github\.com[/:]([^/]+)/([^/]+?)/?$'
-        ]
+        repo_info = _parse_repo_url(repo_url)
+        if repo_info is None:
+            return None
         
-        for pattern in patterns:
-            match = re.search(pattern, repo_url)
-            if match:
-                return {
-                    'owner': match.group(1),
-                    'repo': match.group(2)
-                }
+        # A fresh dict per call, as callers may modify it
+        return {
+            'owner': repo_info[0],
+            'repo': repo_info[1]
+        }
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _blob_url(file_path: str, repo_url: str, local_base_path: str) -> Optional[str]:
+        """
+        Build the GitHub URL of a file, shared by every finding in that file.
         
-        return None
+        Args:
+            file_path: Local file path
+            repo_url: GitHub repository URL
+            local_base_path: Base path of the cloned repository
+            
+        Returns:
+            GitHub URL without a line anchor, or None if it cannot be built
+        """
+        # Extract repo info
+        repo_info = GitHubURLConverter.extract_repo_info(repo_url)
+        if not repo_info:
+            return None
+        
+        # Calculate relative path
+        try:
+            relative_path = Path(file_path).relative_to(Path(local_base_path))
+        except ValueError:
+            return None
+        
+        # Convert to forward slashes for URL
+        relative_path_str = str(relative_path).replace('\\', '/')
+        
+        return (
+            f"https://github.com/{repo_info['owner']}/{repo_info['repo']}"
+            f"/blob/main/{relative_path_str}"
+        )
     
     @staticmethod
     def convert_to_github_url(
@@ -60,27 +104,11 @@ class GitHubURLConverter:
         if not repo_url or not local_base_path:
             return file_path
         
-        # Extract repo info
-        repo_info = GitHubURLConverter.extract_repo_info(repo_url)
-        if not repo_info:
-            return file_path
-        
-        # Calculate relative path
         try:
-            file_path_obj = Path(file_path)
-            base_path_obj = Path(local_base_path)
-            
-            # Get relative path from base
-            relative_path = file_path_obj.relative_to(base_path_obj)
-            
-            # Convert to forward slashes for URL
-            relative_path_str = str(relative_path).replace('\\', '/')
-            
-            # Construct GitHub URL
-            github_url = (
-                f"https://github.com/{repo_info['owner']}/{repo_info['repo']}"
-                f"/blob/main/{relative_path_str}"
-            )
+            # Repo info and relative path are resolved once per file
+            github_url = GitHubURLConverter._blob_url(file_path, repo_url, local_base_path)
+            if github_url is None:
+                return file_path
             
             # Add line number if provided
             if line_number is not None and line_number > 0:
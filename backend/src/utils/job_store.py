@@ -0,0 +1,191 @@
+"""
+Scan job state shared between the workers serving the API.
+
+MemoryJobStore keeps job progress in process memory (single worker).
+RedisJobStore keeps it in Redis, so any worker can stream a scan's progress
+regardless of which worker runs it.
+"""
+import os
+import time
+import asyncio
+import orjson
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .logger import logger
+
+# Statuses after which a job publishes no further events
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+class JobStore:
+    """Interface for registering scan jobs and fanning out their progress events."""
+    
+    async def create(self, job_id: str):
+        """Register a job as running."""
+        raise NotImplementedError
+    
+    async def publish(self, job_id: str, event: Dict):
+        """Deliver a progress event to every subscriber of a job."""
+        raise NotImplementedError
+    
+    async def events(self, job_id: str) -> Optional[AsyncIterator[Dict]]:
+        """
+        Subscribe to a job's progress events.
+        
+        The subscription is registered before this returns, so no event
+        published afterwards is missed. Iteration ends after a terminal event.
+        
+        Args:
+            job_id: Scan job identifier
+        
+        Returns:
+            Async iterator of events, or None if the job is unknown
+        """
+        raise NotImplementedError
+    
+    async def close(self):
+        """Release connections held by the store."""
+
+
+class MemoryJobStore(JobStore):
+    """Job store for a single process; a finished job keeps only its final event."""
+    
+    # Seconds a finished job's final event is kept for late subscribers
+    JOB_TTL = 24 * 60 * 60
+    
+    def __init__(self):
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        # Final events of finished jobs with their expiry, oldest first
+        self._finished: OrderedDict[str, Tuple[float, Dict]] = OrderedDict()
+    
+    async def create(self, job_id: str):
+        self._subscribers[job_id] = []
+    
+    async def publish(self, job_id: str, event: Dict):
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(event)
+        if event['status'] in TERMINAL_STATUSES:
+            self._subscribers.pop(job_id, None)
+            now = time.monotonic()
+            self._finished[job_id] = (now + self.JOB_TTL, event)
+            self._finished.move_to_end(job_id)
+            while self._finished and next(iter(self._finished.values()))[0] <= now:
+                self._finished.popitem(last=False)
+    
+    async def events(self, job_id: str) -> Optional[AsyncIterator[Dict]]:
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is None:
+            finished = self._finished.get(job_id)
+            if finished is None or finished[0] <= time.monotonic():
+                return None
+            return self._replay(finished[1])
+        queue: asyncio.Queue = asyncio.Queue()
+        subscribers.append(queue)
+        return self._drain(job_id, queue)
+    
+    async def _replay(self, event: Dict) -> AsyncIterator[Dict]:
+        """Yield the final event of a finished job."""
+        yield event
+    
+    async def _drain(self, job_id: str, queue: asyncio.Queue) -> AsyncIterator[Dict]:
+        """Yield queued events until a terminal one, then unsubscribe."""
+        try:
+            while True:
+                event = await queue.get()
+                yield event
+                if event['status'] in TERMINAL_STATUSES:
+                    return
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers and queue in subscribers:
+                subscribers.remove(queue)
+
+
+class RedisJobStore(JobStore):
+    """Job store backed by Redis keys (job state) and pub/sub (progress events)."""
+    
+    # Seconds a finished job's final event is kept for late subscribers
+    JOB_TTL = 24 * 60 * 60
+    KEY_PREFIX = 'compliant:job:'
+    
+    def __init__(self, url: str):
+        """
+        Initialize Redis job store.
+        
+        Args:
+            url: Redis connection URL (redis:// or rediss://)
+        """
+        import redis.asyncio as redis
+        
+        self._redis = redis.from_url(url, decode_responses=True)
+    
+    def _state_key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}{job_id}:state"
+    
+    def _channel(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}{job_id}:events"
+    
+    async def create(self, job_id: str):
+        await self._redis.set(
+            self._state_key(job_id),
+            orjson.dumps({'job_id': job_id, 'status': 'running'}),
+            ex=self.JOB_TTL
+        )
+    
+    async def publish(self, job_id: str, event: Dict):
+        data = orjson.dumps(event)
+        if event['status'] in TERMINAL_STATUSES:
+            # Record the outcome before announcing it so late subscribers see it
+            await self._redis.set(self._state_key(job_id), data, ex=self.JOB_TTL)
+        await self._redis.publish(self._channel(job_id), data)
+    
+    async def events(self, job_id: str) -> Optional[AsyncIterator[Dict]]:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self._channel(job_id))
+        
+        # Read state only after subscribing, so a finish in between is not lost
+        state = await self._redis.get(self._state_key(job_id))
+        if state is None:
+            await pubsub.aclose()
+            return None
+        
+        return self._listen(pubsub, orjson.loads(state))
+    
+    async def _listen(self, pubsub, state: Dict) -> AsyncIterator[Dict]:
+        """Yield published events until a terminal one, then unsubscribe."""
+        try:
+            if state['status'] in TERMINAL_STATUSES:
+                yield state
+                return
+            
+            async for message in pubsub.listen():
+                if message['type'] != 'message':
+                    continue
+                event = orjson.loads(message['data'])
+                yield event
+                if event['status'] in TERMINAL_STATUSES:
+                    return
+        finally:
+            await pubsub.aclose()
+    
+    async def close(self):
+        await self._redis.aclose()
+
+
+def create_job_store(url: Optional[str] = None) -> JobStore:
+    """
+    Create the job store configured by JOBSTORE_URL.
+    
+    Args:
+        url: Store URL (defaults to the JOBSTORE_URL environment variable);
+            redis:// or rediss:// selects Redis, anything else memory
+    
+    Returns:
+        JobStore instance
+    """
+    url = url or os.getenv('JOBSTORE_URL')
+    if url and url.startswith(('redis://', 'rediss://')):
+        logger.info("Using Redis job store")
+        return RedisJobStore(url)
+    return MemoryJobStore()
@@ -0,0 +1,362 @@
+"""Combine scanner regexes so a file can be ruled out in a single pass."""
+import re
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import hyperscan
+except ImportError:  # Optional: pip install hyperscan
+    hyperscan = None
+
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+from .logger import logger
+
+# A leading global flag group such as (?i), which must become a scoped group
+_LEADING_FLAGS = re.compile(r'\(\?([aiLmsux]+)\)')
+
+# Group references and names, which break once patterns share one expression
+_GROUP_REFERENCES = re.compile(r'\\[1-9]|\(\?P[<=]')
+
+# Constructs Hyperscan rejects even in prefilter mode: atomic groups,
+# conditionals and possessive quantifiers. Patterns using them go to re.
+_HYPERSCAN_UNSUPPORTED = re.compile(r'\(\?[>(]|[*+?}]\+')
+
+# An unbounded repeat of one character (class, escape, dot or literal) at the
+# start of a pattern, after any global flags
+_LEADING_REPEAT = re.compile(
+    r'(\(\?[aiLmsux]+\))?'
+    r'(\\[dDwWsS]|\[\^?\]?(?:\\.|[^\]\\])*\]|\.|[A-Za-z0-9_])'
+    r'[+*](?![+?{])'
+)
+
+
+def fuse_patterns(patterns: List[str], flags: int = 0) -> Optional[re.Pattern]:
+    """
+    Compile patterns into one alternation that matches wherever any of them does.
+
+    The fused regex only tells whether some pattern could match: alternatives
+    consume each other's text, so findings must still come from the individual
+    patterns. A fused search that finds nothing proves none of them match, so
+    callers can skip them all after one pass over the content.
+
+    Args:
+        patterns: Regex sources, each valid on its own
+        flags: Flags every pattern is compiled with
+
+    Returns:
+        Fused regex, or None if there are no patterns or they cannot be combined
+    """
+    alternatives = []
+    for pattern in patterns:
+        if _GROUP_REFERENCES.search(pattern):
+            return None
+        leading = _LEADING_FLAGS.match(pattern)
+        if leading:
+            pattern = f"(?{leading.group(1)}:{pattern[leading.end():]})"
+        alternatives.append(f"(?:{pattern})")
+
+    if not alternatives:
+        return None
+
+    try:
+        return re.compile('|'.join(alternatives), flags)
+    except re.error:
+        return None
+
+
+_UNBOUNDED_REPEATS = (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT)
+
+
+def _has_unbounded_repeat(items) -> bool:
+    """Whether a parsed (sub)pattern contains a repeat without an upper bound."""
+    for op, av in items:
+        if op in _UNBOUNDED_REPEATS:
+            if av[1] == _sre_parse.MAXREPEAT or _has_unbounded_repeat(av[2]):
+                return True
+        elif op == _sre_parse.SUBPATTERN:
+            if _has_unbounded_repeat(av[-1]):
+                return True
+        elif op == _sre_parse.BRANCH:
+            if any(_has_unbounded_repeat(branch) for branch in av[1]):
+                return True
+        elif op in (_sre_parse.ASSERT, _sre_parse.ASSERT_NOT):
+            if _has_unbounded_repeat(av[1]):
+                return True
+    return False
+
+
+def _has_duplicate_branches(items) -> bool:
+    """Whether a parsed (sub)pattern has an alternation with two identical branches."""
+    for op, av in items:
+        if op == _sre_parse.BRANCH:
+            # The parser factors out common prefixes, so (ab|ab) leaves two empty branches
+            branches = [str(branch) for branch in av[1]]
+            if len(set(branches)) < len(branches):
+                return True
+            if any(_has_duplicate_branches(branch) for branch in av[1]):
+                return True
+        elif op == _sre_parse.SUBPATTERN:
+            if _has_duplicate_branches(av[-1]):
+                return True
+        elif op in _UNBOUNDED_REPEATS:
+            if _has_duplicate_branches(av[2]):
+                return True
+    return False
+
+
+def _find_ambiguous_repeat(items) -> bool:
+    """Whether a parsed (sub)pattern repeats, without bound, something it can match two ways."""
+    for op, av in items:
+        if op in _UNBOUNDED_REPEATS:
+            body = av[2]
+            # (a+)+ or (a|a)*: exponentially many ways to split the same text
+            if av[1] == _sre_parse.MAXREPEAT and (
+                    _has_unbounded_repeat(body) or _has_duplicate_branches(body)):
+                return True
+            if _find_ambiguous_repeat(body):
+                return True
+        elif op == _sre_parse.SUBPATTERN:
+            if _find_ambiguous_repeat(av[-1]):
+                return True
+        elif op == _sre_parse.BRANCH:
+            if any(_find_ambiguous_repeat(branch) for branch in av[1]):
+                return True
+        elif op in (_sre_parse.ASSERT, _sre_parse.ASSERT_NOT):
+            if _find_ambiguous_repeat(av[1]):
+                return True
+    return False
+
+
+def is_potentially_exponential(pattern: str, flags: int = 0) -> bool:
+    """
+    Check a regex for shapes that backtrack exponentially in Python's re.
+
+    Flags unbounded repeats of something that itself repeats without bound,
+    such as (a+)+ or (\\w*)*, and unbounded repeats of an alternation with
+    duplicate branches, such as (a|a)*. On input that almost matches, these
+    can keep a scan busy for practically forever.
+
+    Args:
+        pattern: Regex source
+        flags: Flags the pattern is compiled with
+
+    Returns:
+        True if the pattern should not be run on untrusted content
+    """
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except re.error:
+        return False
+    return _find_ambiguous_repeat(parsed)
+
+
+def guard_leading_repeat(pattern: str) -> str:
+    """
+    Keep a leading unbounded repeat from restarting inside a run it already covered.
+
+    A pattern such as \\w+_key is retried from every character of a long
+    word that does not end in _key, which is quadratic in the word length.
+    A lookbehind lets the repeat start only where a run of its characters
+    starts; any match found from inside a run is also found from its start.
+
+    Args:
+        pattern: Regex source
+
+    Returns:
+        Pattern with a lookbehind before its leading repeat, or the pattern
+        unchanged if it does not start with one
+    """
+    leading = _LEADING_REPEAT.match(pattern)
+    if not leading:
+        return pattern
+
+    flags, atom = leading.group(1) or '', leading.group(2)
+    guarded = f"{flags}(?<!{atom}){pattern[len(flags):]}"
+    try:
+        re.compile(guarded)
+    except re.error:
+        return pattern
+    return guarded
+
+
+# Lowercase letters that re's IGNORECASE also matches with characters
+# str.lower() does not map to them (dotless i and dotted I, long s)
+_UNSAFE_FOLDED = frozenset('is')
+
+
+def _sequence_literals(items, ignore_case: bool) -> Optional[Tuple[str, ...]]:
+    """Literals one of which every match of a parsed sequence contains, preferring the longest."""
+    options = []
+    run = []
+    for op, av in list(items) + [(None, None)]:
+        char = chr(av) if op == _sre_parse.LITERAL else None
+        if char is not None and ignore_case:
+            char = char.lower() if char.isascii() and char.lower() not in _UNSAFE_FOLDED else None
+        if char is not None:
+            run.append(char)
+            continue
+
+        if run:
+            options.append((''.join(run),))
+            run = []
+
+        if op == _sre_parse.SUBPATTERN:
+            _, add_flags, del_flags, body = av
+            if not add_flags and not del_flags:
+                literals = _sequence_literals(body, ignore_case)
+                if literals:
+                    options.append(literals)
+        elif op == _sre_parse.BRANCH:
+            alternatives = []
+            for branch in av[1]:
+                literals = _sequence_literals(branch, ignore_case)
+                if literals is None:
+                    break
+                alternatives.extend(literals)
+            else:
+                options.append(tuple(dict.fromkeys(alternatives)))
+
+    if not options:
+        return None
+    return max(options, key=lambda literals: min(map(len, literals)))
+
+
+def required_literals(pattern: str, flags: int = 0) -> Optional[Tuple[str, ...]]:
+    """
+    Find literals one of which every match of a regex contains.
+
+    Content containing none of them cannot match, which a substring search
+    tells far faster than running the regex. Literals come from runs of
+    literal characters and from alternations whose every branch has one.
+
+    Args:
+        pattern: Regex source
+        flags: Flags the pattern is compiled with
+
+    Returns:
+        Literals, lowercased if the pattern ignores case (then search
+        content.lower()), or None if no literal is required
+    """
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except re.error:
+        return None
+    return _sequence_literals(parsed, bool(parsed.state.flags & re.IGNORECASE))
+
+
+def _hyperscan_prefilter(patterns: List[str], flags: int) -> Optional[Callable[[str], bool]]:
+    """Build a Hyperscan database answering whether any pattern may match."""
+    hs_flags = (
+        hyperscan.HS_FLAG_PREFILTER      # match a superset, so a miss stays conclusive
+        | hyperscan.HS_FLAG_SINGLEMATCH
+        | hyperscan.HS_FLAG_ALLOWEMPTY
+        | hyperscan.HS_FLAG_UTF8
+        | hyperscan.HS_FLAG_UCP          # Unicode \w, \s and \d, as in Python str patterns
+    )
+    if flags & re.MULTILINE:
+        hs_flags |= hyperscan.HS_FLAG_MULTILINE
+    if flags & re.DOTALL:
+        hs_flags |= hyperscan.HS_FLAG_DOTALL
+
+    database = hyperscan.Database()
+    try:
+        database.compile(
+            expressions=[pattern.encode('utf-8') for pattern in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[hs_flags] * len(patterns)
+        )
+    except Exception as e:
+        logger.warning(
+            f"Hyperscan cannot compile scanner patterns, using re: {e}. "
+            f"If one pattern is at fault, add its construct to _HYPERSCAN_UNSUPPORTED"
+        )
+        return None
+
+    def may_match(content: str) -> Optional[bool]:
+        try:
+            data = content.encode('utf-8')
+        except UnicodeEncodeError:
+            return None
+
+        matched = []
+
+        def on_match(pattern_id, start, end, match_flags, context):
+            matched.append(pattern_id)
+            return True  # One match settles it; stop scanning
+
+        try:
+            database.scan(data, match_event_handler=on_match)
+        except hyperscan.ScanTerminated:
+            pass
+        return bool(matched)
+
+    return may_match
+
+
+def build_prefilter(patterns: List[str], flags: int = 0) -> Optional[Callable[[str], bool]]:
+    """
+    Build a check that rules out content none of the patterns can match.
+
+    Uses a Hyperscan database when the optional hyperscan package is installed
+    (one vectorized pass over the content), otherwise the fused re alternation.
+    Patterns using constructs Hyperscan does not support are checked with re
+    alongside it. Prefilters are cached per pattern list and flags, so every
+    scanner instance with the same config shares one compiled database.
+
+    Args:
+        patterns: Regex sources, each valid on its own
+        flags: Flags every pattern is compiled with (re.MULTILINE / re.DOTALL)
+
+    Returns:
+        Function returning False only if no pattern matches the content, or
+        None if the patterns cannot be prefiltered
+    """
+    return _build_prefilter(tuple(patterns), flags)
+
+
+def _fused_may_match(patterns: Tuple[str, ...], flags: int) -> Optional[Callable[[str], bool]]:
+    """Prefilter with the fused re alternation, or None if it cannot be built."""
+    fused = fuse_patterns(list(patterns), flags)
+    if fused is None:
+        return None
+    return lambda content: fused.search(content) is not None
+
+
+@lru_cache(maxsize=16)
+def _build_prefilter(patterns: Tuple[str, ...], flags: int) -> Optional[Callable[[str], bool]]:
+    """Build (once per pattern tuple and flags) the prefilter of build_prefilter."""
+    fused_may_match = _fused_may_match(patterns, flags)
+    if hyperscan is None or not patterns:
+        return fused_may_match
+
+    # Known-unsupported patterns skip the Hyperscan compile instead of failing it
+    hyperscan_patterns = [pattern for pattern in patterns if not _HYPERSCAN_UNSUPPORTED.search(pattern)]
+    re_patterns = tuple(pattern for pattern in patterns if _HYPERSCAN_UNSUPPORTED.search(pattern))
+    if not hyperscan_patterns:
+        return fused_may_match
+
+    hyperscan_may_match = _hyperscan_prefilter(hyperscan_patterns, flags)
+    if hyperscan_may_match is None:
+        return fused_may_match
+
+    re_may_match = None
+    if re_patterns:
+        re_may_match = _fused_may_match(re_patterns, flags)
+        if re_may_match is None:
+            return fused_may_match
+
+    def may_match(content: str) -> bool:
+        result = hyperscan_may_match(content)
+        if result is None:
+            # Content Hyperscan cannot take (lone surrogates): fall back to re
+            return fused_may_match(content) if fused_may_match is not None else True
+        if result:
+            return True
+        return re_may_match is not None and re_may_match(content)
+
+    return may_match
@@ -0,0 +1,164 @@
+"""
+Findings of unchanged files, persisted across scans.
+
+Scanning a file is a pure function of its path within the repository, its
+content and the scanner config, so rescanning a repository only needs to
+scan the files that changed since the last scan.
+"""
+import os
+import hashlib
+import orjson
+from pathlib import Path
+from typing import Dict, Optional
+
+from .logger import logger
+
+DEFAULT_CACHE_DIR = './.cache/scan'
+
+# Default size cap of the cache directory
+DEFAULT_MAX_MB = 500
+
+
+class ScanCache:
+    """On-disk cache of per-file findings keyed by path and content hash, evicted least recently used first.
+    
+    Only files with findings are stored: rescanning a clean file through the
+    prefilters costs less than writing and later reading back its entry.
+    """
+    
+    def __init__(self, cache_dir: str, max_bytes: int, namespace: str):
+        """
+        Initialize the scan cache.
+        
+        Args:
+            cache_dir: Root directory of the cache
+            max_bytes: Size cap of the whole cache directory
+            namespace: Version of the scanners and their config; entries of
+                other versions are never read and age out
+        """
+        self.root = Path(cache_dir)
+        self.cache_dir = self.root / namespace
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # Shard directories known to exist
+        self._shards = set()
+        # Bytes written since the last eviction pass
+        self._written = 0
+    
+    @staticmethod
+    def key(relative_path: str, content: str) -> str:
+        """Cache key of a file: BLAKE2b of its path within the repository and content."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(relative_path.encode('utf-8', 'surrogatepass'))
+        digest.update(b'\0')
+        digest.update(content.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        """Entry path, sharded by the first two hex digits of the key."""
+        return self.cache_dir / key[:2] / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Load a file's cached findings.
+        
+        Args:
+            key: Cache key from key()
+            
+        Returns:
+            Findings by scanner name, or None if absent or unreadable
+        """
+        path = self._path(key)
+        try:
+            # Reading updates the access time used for eviction (at most
+            # daily under relatime), so hits need no extra syscall
+            return orjson.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable scan cache entry {key}: {e}")
+            return None
+    
+    def put(self, key: str, entry: Dict):
+        """
+        Store a file's findings.
+        
+        Args:
+            key: Cache key from key()
+            entry: Findings by scanner name
+        """
+        path = self._path(key)
+        # Write to a per-process temp name so readers never see partial files
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            data = orjson.dumps(entry)
+            if path.parent not in self._shards:
+                path.parent.mkdir(exist_ok=True)
+                self._shards.add(path.parent)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            logger.warning(f"Could not persist scan cache entry: {e}")
+            return
+        
+        # Check the size cap after every tenth of it written
+        self._written += len(data)
+        if self._written > self.max_bytes // 10:
+            self._written = 0
+            self.evict()
+    
+    def evict(self):
+        """Delete least recently used entries until the cache fits its size cap."""
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+                total += stat.st_size
+        
+        if total <= self.max_bytes:
+            return
+        
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+        logger.info(f"Evicted scan cache down to {total} bytes")
+
+
+def create_scan_cache(namespace: str, cache_dir: Optional[str] = None) -> Optional[ScanCache]:
+    """
+    Create the scan cache configured by SCAN_CACHE_DIR and SCAN_CACHE_MAX_MB.
+    
+    Args:
+        namespace: Version of the scanners and their config
+        cache_dir: Cache directory (defaults to the SCAN_CACHE_DIR environment
+            variable, else ./.cache/scan)
+        
+    Returns:
+        ScanCache instance, or None if SCAN_CACHE_MAX_MB is 0 or the cache
+        directory cannot be created
+    """
+    max_mb = int(os.getenv('SCAN_CACHE_MAX_MB', DEFAULT_MAX_MB))
+    if max_mb <= 0:
+        return None
+    
+    try:
+        return ScanCache(
+            cache_dir or os.getenv('SCAN_CACHE_DIR') or DEFAULT_CACHE_DIR,
+            max_mb * 1024 * 1024,
+            namespace
+        )
+    except OSError as e:
+        logger.warning(f"Scan cache disabled: {e}")
+        return None
@@ -1,6 +1,6 @@
 import pytest
 from httpx import AsyncClient
-from backend.src.api import app
+from backend.src.api import app, scan_engine
 
 @pytest.mark.asyncio
 async def test_health_check():
@@ -76,3 +76,56 @@ async def test_get_controls():
     assert isinstance(data, dict)
     # Should have control IDs like CC1, CC2, etc.
     assert any(key.startswith('CC') for key in data.keys())
+
+@pytest.mark.asyncio
+async def test_scan_events_replays_failure():
+    """Test a scan that failed before the stream opened reports its error."""
+    job_id = await scan_engine.create_job()
+    await scan_engine.job_store.publish(job_id, {'job_id': job_id, 'status': 'failed', 'error': "clone failed"})
+    
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get(f"/scan/{job_id}/events")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert '"status":"failed"' in response.text
+    assert "clone failed" in response.text
+
+@pytest.mark.asyncio
+async def test_scan_events_unknown_job():
+    """Test streaming events of an unknown scan."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/scan/nonexistent-id/events")
+    
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_issue_creator_cache_is_bounded(monkeypatch):
+    """Test least recently used issue creators are evicted and closed once idle."""
+    from backend.src import api
+    
+    class FakeCreator:
+        def __init__(self, token):
+            self.token = token
+            self.closed = False
+        
+        async def aclose(self):
+            self.closed = True
+    
+    monkeypatch.setattr(api, "GitHubIssueCreator", FakeCreator)
+    monkeypatch.setattr(api, "ISSUE_CREATOR_CACHE_SIZE", 2)
+    monkeypatch.setattr(api, "_issue_creators", api.OrderedDict())
+    
+    async with api.use_issue_creator("busy") as busy:
+        for token in ("a", "b"):
+            async with api.use_issue_creator(token):
+                pass
+        # Evicted while still in use: closed only when its request ends
+        assert "busy" not in [creator.token for creator in api._issue_creators.values()]
+        assert not busy.closed
+    assert busy.closed
+    
+    async with api.use_issue_creator("c"):
+        pass
+    assert [creator.token for creator in api._issue_creators.values()] == ["b", "c"]
+    assert not api._issue_creator_users
@@ -0,0 +1,56 @@
+import subprocess
+import pytest
+from pathlib import Path
+from backend.src.integrations.github_loader import GitHubLoader
+
+def _git(path, *args):
+    subprocess.run(
+        ['git', '-C', str(path), '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+        check=True, capture_output=True
+    )
+
+@pytest.fixture
+def make_remote(tmp_path):
+    """Create local repositories with one commit to clone from."""
+    def make(name):
+        path = tmp_path / "remotes" / name / "repo"
+        path.mkdir(parents=True)
+        _git(path, 'init', '--quiet')
+        (path / "app.py").write_text(f"print('{name}')\n")
+        _git(path, 'add', 'app.py')
+        _git(path, 'commit', '--quiet', '-m', 'init')
+        return path.as_uri()
+    return make
+
+def test_clone_repository_reuses_cached_clone(make_remote, tmp_path):
+    """Test a second clone of the same commit reuses the cached checkout."""
+    loader = GitHubLoader(cache_dir=str(tmp_path / "cache"))
+    remote = make_remote("first")
+
+    first = loader.clone_repository(remote)
+    loader.release(first)
+    second = loader.clone_repository(remote)
+    loader.release(second)
+
+    assert first == second
+    assert '@' in Path(first).name
+    assert (Path(first) / "app.py").exists()
+
+def test_clone_eviction_skips_clones_in_use(make_remote, tmp_path):
+    """Test eviction deletes only idle clones, least recently used first."""
+    loader = GitHubLoader(cache_dir=str(tmp_path / "cache"), max_cached_repos=1)
+
+    in_use = loader.clone_repository(make_remote("scanning"))
+    idle = loader.clone_repository(make_remote("idle"))
+    loader.release(idle)
+    # Over the cap, but the other clone is still being scanned
+    assert Path(in_use).exists() and Path(idle).exists()
+
+    latest = loader.clone_repository(make_remote("latest"))
+    assert Path(in_use).exists()
+    assert not Path(idle).exists()
+
+    loader.release(in_use)
+    loader.release(latest)
+    loader.release(loader.clone_repository(make_remote("last")))
+    assert not Path(in_use).exists()
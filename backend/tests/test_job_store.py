@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from backend.src.utils.job_store import MemoryJobStore
+
+@pytest.mark.asyncio
+async def test_memory_job_store_streams_until_terminal_event():
+    """Test subscribers receive every event up to the terminal one."""
+    store = MemoryJobStore()
+    await store.create("job")
+    events = await store.events("job")
+
+    await store.publish("job", {'job_id': "job", 'status': 'scanning'})
+    await store.publish("job", {'job_id': "job", 'status': 'completed'})
+
+    received = [event['status'] async for event in events]
+    assert received == ['scanning', 'completed']
+
+@pytest.mark.asyncio
+async def test_memory_job_store_replays_final_event_to_late_subscribers():
+    """Test a job that failed before anyone subscribed still reports its error."""
+    store = MemoryJobStore()
+    await store.create("job")
+    await store.publish("job", {'job_id': "job", 'status': 'failed', 'error': "clone failed"})
+
+    events = await store.events("job")
+    assert events is not None
+    received = [event async for event in events]
+    assert received == [{'job_id': "job", 'status': 'failed', 'error': "clone failed"}]
+
+@pytest.mark.asyncio
+async def test_memory_job_store_unknown_and_expired_jobs():
+    """Test unknown jobs and finished jobs past their TTL have no events."""
+    store = MemoryJobStore()
+    assert await store.events("missing") is None
+
+    store.JOB_TTL = 0
+    await store.create("job")
+    await store.publish("job", {'job_id': "job", 'status': 'completed'})
+    await asyncio.sleep(0)
+    assert await store.events("job") is None
+    assert not store._finished
@@ -0,0 +1,72 @@
+import os
+import pytest
+from backend.src.scanners.combined_scanner import CombinedScanner
+from backend.src.scanners.static_scanner import StaticScanner
+from backend.src.utils.scan_cache import ScanCache
+
+VULNERABLE_CODE = """
+import hashlib
+
+def hash_password(password):
+    return hashlib.md5(password.encode()).hexdigest()
+"""
+
+@pytest.fixture
+def scanner_factory(tmp_path, monkeypatch):
+    monkeypatch.setenv('SCAN_CACHE_DIR', str(tmp_path / "cache"))
+    monkeypatch.delenv('SCAN_CACHE_MAX_MB', raising=False)
+    return lambda: CombinedScanner({'static': StaticScanner()}, use_cache=True)
+
+def test_scan_cache_hit_restores_file(scanner_factory, tmp_path):
+    """Test cached findings name the file of the scan that reads them."""
+    first_root = tmp_path / "first"
+    second_root = tmp_path / "second"
+    for root in (first_root, second_root):
+        root.mkdir()
+        (root / "app.py").write_text(VULNERABLE_CODE)
+
+    first = scanner_factory().scan_directory(str(first_root))['static']
+    assert first
+    assert all(finding['file'] == str(first_root / "app.py") for finding in first)
+
+    scanner = scanner_factory()
+    # Scanning again must come from the cache
+    scanner.scanners['static'].scan_file = lambda *args: pytest.fail("cache miss")
+    second = scanner.scan_directory(str(second_root))['static']
+
+    assert [finding['line'] for finding in second] == [finding['line'] for finding in first]
+    assert all(finding['file'] == str(second_root / "app.py") for finding in second)
+
+def test_scan_cache_namespace_change_misses(tmp_path):
+    """Test entries are not read under another scanner version."""
+    cache_dir = str(tmp_path / "cache")
+    key = ScanCache.key("app.py", VULNERABLE_CODE)
+    ScanCache(cache_dir, 1024 * 1024, "v1").put(key, {'static': [{'line': 5}]})
+
+    assert ScanCache(cache_dir, 1024 * 1024, "v1").get(key) == {'static': [{'line': 5}]}
+    assert ScanCache(cache_dir, 1024 * 1024, "v2").get(key) is None
+
+def test_scan_cache_skips_clean_files(scanner_factory, tmp_path):
+    """Test files without findings are not persisted."""
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "clean.py").write_text("def add(a, b):\n    return a + b\n")
+
+    scanner = scanner_factory()
+    assert scanner.scan_directory(str(root))['static'] == []
+    assert not any(files for _, _, files in os.walk(scanner.cache.cache_dir))
+
+def test_scan_cache_evict_respects_max_bytes(tmp_path):
+    """Test eviction deletes the least recently used entries down to the size cap."""
+    cache = ScanCache(str(tmp_path / "cache"), 10 ** 9, "v1")
+    keys = [ScanCache.key(f"file{i}.py", "x") for i in range(10)]
+    for i, key in enumerate(keys):
+        cache.put(key, {'static': [{'message': "m" * 100}]})
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+    entry_size = os.path.getsize(cache._path(keys[0]))
+
+    cache.max_bytes = entry_size * 4
+    cache.evict()
+
+    remaining = [key for key in keys if cache._path(key).exists()]
+    assert remaining == keys[-4:]
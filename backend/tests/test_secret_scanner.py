@@ -63,3 +63,24 @@ def test_secret_scanner_empty_file(secret_scanner, tmp_path):
     
     # Should return empty list or no critical findings
     assert isinstance(findings, list)
+
+def test_secret_scanner_skips_exponential_patterns(tmp_path):
+    """Test that patterns which can backtrack exponentially are not run."""
+    config_file = tmp_path / "controls.yaml"
+    config_file.write_text(
+        "patterns:\n"
+        "  secrets:\n"
+        "    - name: nested_quantifier\n"
+        "      pattern: '(a+)+b'\n"
+        "      severity: high\n"
+        "      control: CC6\n"
+        "    - name: password\n"
+        "      pattern: 'password'\n"
+        "      severity: high\n"
+        "      control: CC6\n"
+    )
+    scanner = SecretScanner(str(config_file))
+    
+    findings = scanner.scan_file(tmp_path / "test.py", "a" * 40 + "\npassword\n")
+    
+    assert [f['type'] for f in findings] == ['password']
@@ -2,8 +2,9 @@ import pytest
 from pathlib import Path
 from backend.src.scanners.static_scanner import StaticScanner
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def static_scanner():
+    # Compiled once for the module; tests only read from the scanner
     return StaticScanner()
 
 @pytest.fixture
@@ -74,6 +75,20 @@ def greet(name):
     # Should have no or very few findings
     assert len(findings) == 0
 
+def test_static_scanner_ignores_parameterized_sql(static_scanner, tmp_path):
+    """Test that parameterized queries in Python are not flagged as SQL injection."""
+    code = """
+def get_user(cursor, username):
+    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
+    return cursor.fetchone() + (1,)
+"""
+    test_file = tmp_path / "queries.py"
+    test_file.write_text(code)
+    
+    findings = static_scanner.scan_file(test_file, code)
+    
+    assert not [f for f in findings if f['type'] == 'sql_injection_risk']
+
 def test_false_positive_filtering(static_scanner, tmp_path):
     """Test that second-pass validation filters false positives."""
     # Code that might trigger patterns but isn't actually vulnerable
@@ -102,3 +117,19 @@ def test_security():
         )
         # Should filter out false positives
         assert len(validated) <= len(initial_findings)
+
+def test_validate_batch_ignores_invalid_finding_ids(tmp_path):
+    """Test only in-range integer IDs confirmed by the model are kept, each once."""
+    class FakeModel:
+        def generate_content(self, prompt):
+            class Response:
+                text = '{"valid_findings": {"1": [1, 1, -1, true, 5, "0"]}}'
+            return Response()
+    
+    scanner = StaticScanner()
+    scanner.model = FakeModel()
+    findings = [{'line': 1}, {'line': 2}, {'line': 3}]
+    
+    validated = scanner._validate_batch([("key", findings, "section", str(tmp_path / "app.py"))])
+    
+    assert validated == {"key": [{'line': 2}]}
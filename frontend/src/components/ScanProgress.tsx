@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react';
 import { useRouter } from 'next/router';
-import { getReport } from '@/lib/api';
+import { getReport, subscribeToScan, ScanEvent } from '@/lib/api';
 
 interface ScanProgressProps {
   jobId: string;
@@ -13,77 +13,59 @@ export default function ScanProgress({ jobId }: ScanProgressProps) {
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
-    let intervalId: NodeJS.Timeout;
-    let timeoutId: NodeJS.Timeout;
-    let attempt = 0;
-    const maxAttempts = 60; // 2 minutes max (polling every 2 seconds)
+    const stages: { [key: string]: [string, number] } = {
+      cloning: ['Cloning repository...', 10],
+      scanning: ['Running scanners...', 30],
+      analyzing: ['Running AI analysis...', 60],
+      scoring: ['Calculating scores...', 80],
+      reporting: ['Generating report...', 90],
+    };
+    let redirectId: NodeJS.Timeout;
 
-    const checkStatus = async () => {
-      try {
-        attempt++;
-        setProgress(Math.min((attempt / maxAttempts) * 100, 95));
+    const complete = () => {
+      setStatus('Scan complete! Redirecting...');
+      setProgress(100);
+      redirectId = setTimeout(() => {
+        router.push(`/report/${jobId}`);
+      }, 1000);
+    };
+
+    const source = subscribeToScan(jobId);
+
+    source.onmessage = (message) => {
+      const event: ScanEvent = JSON.parse(message.data);
+
+      if (event.status === 'completed') {
+        source.close();
+        complete();
+      } else if (event.status === 'failed') {
+        source.close();
+        setError(event.error || 'An error occurred during scanning');
+      } else if (stages[event.status]) {
+        const [label, percent] = stages[event.status];
+        setStatus(label);
+        setProgress(percent);
+      }
+    };
 
+    source.onerror = async () => {
+      // Stream dropped or job unknown; check once whether the report exists
+      source.close();
+      try {
         const report = await getReport(jobId);
-        
         if (report && report.id) {
-          // Report is ready
-          setStatus('Scan complete! Redirecting...');
-          setProgress(100);
-          
-          clearInterval(intervalId);
-          clearTimeout(timeoutId);
-          
-          // Redirect to report page
-          setTimeout(() => {
-            router.push(`/report/${jobId}`);
-          }, 1000);
-        } else {
-          // Still processing
-          const messages = [
-            'Cloning repository...',
-            'Running secret scanner...',
-            'Analyzing code patterns...',
-            'Checking dependencies...',
-            'Scanning infrastructure...',
-            'Running AI analysis...',
-            'Calculating scores...',
-            'Generating report...',
-          ];
-          
-          const messageIndex = Math.floor(attempt / 5) % messages.length;
-          setStatus(messages[messageIndex]);
-        }
-      } catch (err: any) {
-        // 404 means report not ready yet, continue polling
-        if (err.response?.status === 404) {
-          if (attempt >= maxAttempts) {
-            setError('Scan is taking longer than expected. Please check back later.');
-            clearInterval(intervalId);
-          }
-        } else {
-          // Actual error
-          setError(err.message || 'An error occurred during scanning');
-          clearInterval(intervalId);
-          clearTimeout(timeoutId);
+          complete();
+          return;
         }
+      } catch (err) {
+        // Fall through to error below
       }
+      setError('Lost connection to the scan. Please check back later.');
     };
 
-    // Start polling
-    intervalId = setInterval(checkStatus, 2000);
-    
-    // Set timeout
-    timeoutId = setTimeout(() => {
-      clearInterval(intervalId);
-      setError('Scan timed out. Please try again.');
-    }, 120000); // 2 minutes
-
-    // Initial check
-    checkStatus();
-
     return () => {
-      clearInterval(intervalId);
-      clearTimeout(timeoutId);
+      source.close();
+      clearTimeout(redirectId);
     };
   }, [jobId, router]);
 
@@ -123,6 +123,17 @@ export async function scanGithub(repo_url: string, token?: string): Promise<Scan
   return response.json();
 }
 
+export interface ScanEvent {
+  job_id: string;
+  status: 'cloning' | 'scanning' | 'analyzing' | 'scoring' | 'reporting' | 'completed' | 'failed';
+  findings?: number;
+  error?: string;
+}
+
+export function subscribeToScan(jobId: string): EventSource {
+  return new EventSource(`${API_BASE_URL}/scan/${jobId}/events`);
+}
+
 export async function getReport(jobId: string): Promise<Report> {
   const response = await fetch(`${API_BASE_URL}/report/${jobId}`);
 